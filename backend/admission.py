@@ -0,0 +1,206 @@
+"""
+Admission control for the CPU-heavy endpoints.
+
+Each limited route has a WeightedLimiter: `capacity` cost units may run at
+once and up to `max_queued` more may wait, first come first served, for at
+most `max_wait` seconds. A request's cost comes from its route's cost
+function (e.g. upload size for /rank-candidates, so a 300-resume ranking
+weighs more than a single analysis) and is capped at the capacity, so even
+the largest request can run alone.
+
+When the queue is full the request is refused at once with 429; when it
+waits too long it gets 503. Both carry Retry-After, estimated from recent
+service times. Routes without a limiter (login, results, analytics, ...)
+are never queued. Every admitted request holds one worker thread, so at
+startup fit_to_threadpool() scales the capacities down until the limited
+routes together leave RESERVED_THREADS of the thread pool free for them.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+
+import anyio.to_thread
+from starlette.responses import JSONResponse
+
+RESERVED_THREADS = 8  # worker threads kept free for routes without a limiter
+
+
+class Rejected(Exception):
+    def __init__(self, status_code, detail, retry_after):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class WeightedLimiter:
+    """FIFO weighted semaphore with a bounded queue, for use on the event loop."""
+
+    def __init__(self, name, capacity, max_queued, max_wait):
+        self.name = name
+        self.capacity = capacity
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+        self.in_use = 0
+        self.queued = 0
+        self._waiters = deque()
+        self._avg_seconds_per_unit = None
+        self.stats = {"admitted": 0, "queued": 0, "rejected_full": 0, "rejected_timeout": 0}
+
+    def retry_after(self):
+        """Seconds until the current backlog should have drained (at least 1)."""
+        per_unit = self._avg_seconds_per_unit or 1.0
+        backlog = self.in_use + self.queued
+        return max(1, math.ceil(per_unit * backlog / self.capacity))
+
+    async def acquire(self, cost):
+        cost = max(1, min(cost, self.capacity))
+        if not self._waiters and self.in_use + cost <= self.capacity:
+            self.in_use += cost
+            self.stats["admitted"] += 1
+            return cost
+        if self.queued + cost > self.max_queued:
+            self.stats["rejected_full"] += 1
+            raise Rejected(429, f"{self.name} is at capacity; try again later.", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = [cost, waiter]
+        self._waiters.append(entry)
+        self.queued += cost
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            granted = waiter.done() and not waiter.cancelled()
+            if granted and isinstance(e, asyncio.TimeoutError):
+                # Granted just as the wait ran out
+                self.stats["admitted"] += 1
+                return cost
+            if granted:
+                self.release(cost, None)
+            else:
+                waiter.cancel()
+                self._waiters.remove(entry)
+                self.queued -= cost
+                self._wake()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.stats["rejected_timeout"] += 1
+            raise Rejected(503, f"{self.name} is overloaded; try again later.", self.retry_after())
+        self.stats["admitted"] += 1
+        return cost
+
+    def release(self, cost, elapsed):
+        self.in_use -= cost
+        if elapsed is not None:
+            sample = elapsed / cost
+            avg = self._avg_seconds_per_unit
+            self._avg_seconds_per_unit = sample if avg is None else 0.8 * avg + 0.2 * sample
+        self._wake()
+
+    def _wake(self):
+        # Strict FIFO: a large request at the head is not overtaken by smaller ones behind it
+        while self._waiters and self.in_use + self._waiters[0][0] <= self.capacity:
+            cost, waiter = self._waiters.popleft()
+            self.queued -= cost
+            self.in_use += cost
+            waiter.set_result(None)
+
+    def status(self):
+        return {
+            "capacity": self.capacity, "in_use": self.in_use, "queued": self.queued,
+            "max_queued": self.max_queued, "retry_after": self.retry_after(), **self.stats,
+        }
+
+
+def _content_length(scope):
+    for name, value in scope.get("headers", ()):
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return 0
+    return 0
+
+
+def cost_by_upload_size(unit_bytes):
+    """One unit per started `unit_bytes` of request body."""
+    return lambda scope: 1 + _content_length(scope) // unit_bytes
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def default_limiters():
+    """Route path -> (limiter, cost function), sized from the CPU count unless overridden."""
+    cpus = os.cpu_count() or 2
+    heavy = _env_int("RESUME_ANALYZER_HEAVY_CONCURRENCY", max(2, cpus))
+    max_wait = float(os.environ.get("RESUME_ANALYZER_QUEUE_WAIT", 10.0))
+    return {
+        "/analyze-resume": (WeightedLimiter("/analyze-resume", heavy, 4 * heavy, max_wait), lambda scope: 1),
+        # Roughly one unit per resume at typical upload sizes
+        "/rank-candidates": (
+            WeightedLimiter("/rank-candidates", 4 * heavy, 16 * heavy, max_wait), cost_by_upload_size(256 * 1024)
+        ),
+        "/search-candidates": (WeightedLimiter("/search-candidates", heavy, 4 * heavy, max_wait), lambda scope: 1),
+        # One resume parse plus cheap per-JD scoring
+        "/compare-jobs": (
+            WeightedLimiter("/compare-jobs", 2 * heavy, 8 * heavy, max_wait), cost_by_upload_size(256 * 1024)
+        ),
+    }
+
+
+def fit_to_threadpool(limiters, total_tokens=None, reserved=None):
+    """
+    Shrinks the limiters' capacities (proportionally, at least 1 each) so that
+    the limited routes can hold at most total_tokens - reserved worker threads
+    at once. Defaults to the size of anyio's default thread limiter, which
+    Starlette runs sync routes on; must then be called on the event loop.
+    """
+    if total_tokens is None:
+        total_tokens = anyio.to_thread.current_default_thread_limiter().total_tokens
+    if reserved is None:
+        reserved = _env_int("RESUME_ANALYZER_RESERVED_THREADS", RESERVED_THREADS)
+    budget = max(len(limiters), int(total_tokens) - reserved)
+    total = sum(limiter.capacity for limiter, _ in limiters.values())
+    if total <= budget:
+        return limiters
+    for limiter, _ in limiters.values():
+        limiter.capacity = max(1, math.floor(limiter.capacity * budget / total))
+    print(f"Admission capacities scaled to fit {total_tokens} worker threads ({reserved} reserved): "
+          + ", ".join(f"{path} {limiter.capacity}" for path, (limiter, _) in limiters.items()))
+    return limiters
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying the per-route limiters; other routes pass straight through."""
+
+    def __init__(self, app, limiters):
+        self.app = app
+        self.limiters = limiters
+
+    async def __call__(self, scope, receive, send):
+        entry = self.limiters.get(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if entry is None:
+            await self.app(scope, receive, send)
+            return
+        limiter, cost_of = entry
+        try:
+            cost = await limiter.acquire(cost_of(scope))
+        except Rejected as e:
+            response = JSONResponse(
+                {"detail": e.detail}, status_code=e.status_code, headers={"Retry-After": str(e.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(cost, time.monotonic() - started)
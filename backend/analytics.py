@@ -0,0 +1,172 @@
+import json
+import threading
+
+from database import get_db_connection, APP_ID
+
+TABLE_PREFIX = f"{APP_ID}_"
+
+SCORE_BIN_WIDTH = 10
+# Upper bounds (exclusive) of the experience buckets, in years; the last bucket is open-ended
+EXPERIENCE_BOUNDS = [1, 2, 3, 5, 8, 10]
+
+
+def _experience_bucket(years):
+    for i, bound in enumerate(EXPERIENCE_BOUNDS):
+        if years < bound:
+            return i
+    return len(EXPERIENCE_BOUNDS)
+
+
+def _experience_labels():
+    labels, lower = [], 0
+    for bound in EXPERIENCE_BOUNDS:
+        labels.append(f"{lower}-{bound}")
+        lower = bound
+    labels.append(f"{lower}+")
+    return labels
+
+
+def _score_bin(ats_score):
+    return max(min(int(ats_score // SCORE_BIN_WIDTH), 100 // SCORE_BIN_WIDTH - 1), 0)
+
+
+def _add_counts(deltas, jd_id, contribution, sign):
+    """Adds a candidate's (ats_score, experience bucket, matched, missing) to per-bucket count deltas."""
+    ats_score, bucket, matched_skills, missing_skills = contribution
+    keys = [("candidates", ""), ("score", str(_score_bin(ats_score))), ("experience", str(bucket))]
+    keys += [("matched", skill) for skill in matched_skills]
+    keys += [("missing", skill) for skill in missing_skills]
+    for metric, key in keys:
+        delta = deltas.setdefault((jd_id, metric, key), [0, 0.0])
+        delta[0] += sign
+        if metric == "candidates":
+            delta[1] += sign * ats_score
+
+
+class AnalyticsStore:
+    """
+    Per-JD dashboard aggregates, updated incrementally as each candidate is
+    scored: score histogram, per-skill match/miss counts and an experience
+    distribution.
+
+    Counts live in the jd_analytics_counts table, one row per (JD, bucket), and
+    are only ever changed by SQL increments, so workers sharing the database
+    never overwrite each other's contributions. jd_analytics_members keeps each
+    candidate's last contribution per JD, so a candidate re-ranked against the
+    same JD replaces it instead of adding another. Scored candidates are queued
+    in memory and applied by flush(), which the result writer calls after each batch.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def record(self, jd_id, resume_id, ats_score, matched_skills, missing_skills, years_of_experience):
+        """Queues one scored candidate for its JD's aggregate, replacing its previous score for that JD."""
+        if jd_id is None:
+            return
+        contribution = (
+            ats_score, _experience_bucket(years_of_experience or 0), sorted(matched_skills), sorted(missing_skills)
+        )
+        with self._lock:
+            self._pending.append((jd_id, resume_id, contribution))
+
+    def flush(self):
+        """Applies the queued candidates to the stored counts in one transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending = self._pending
+            self._pending = []
+
+        conn = get_db_connection()
+        try:
+            with conn:
+                # Take the write lock up front: previous contributions must not change under us
+                conn.execute("BEGIN IMMEDIATE")
+                deltas = {}
+                for jd_id, resume_id, contribution in pending:
+                    if resume_id is not None:
+                        previous = conn.execute(f"""
+                        SELECT ats_score, experience_bucket, matched, missing
+                        FROM {TABLE_PREFIX}jd_analytics_members WHERE jd_id = ? AND resume_id = ?
+                        """, (jd_id, resume_id)).fetchone()
+                        if previous is not None:
+                            _add_counts(deltas, jd_id, (
+                                previous['ats_score'], previous['experience_bucket'],
+                                json.loads(previous['matched']), json.loads(previous['missing'])
+                            ), -1)
+                        ats_score, bucket, matched_skills, missing_skills = contribution
+                        conn.execute(f"""
+                        INSERT INTO {TABLE_PREFIX}jd_analytics_members
+                            (jd_id, resume_id, ats_score, experience_bucket, matched, missing)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(jd_id, resume_id) DO UPDATE SET
+                            ats_score = excluded.ats_score, experience_bucket = excluded.experience_bucket,
+                            matched = excluded.matched, missing = excluded.missing
+                        """, (jd_id, resume_id, ats_score, bucket,
+                              json.dumps(matched_skills, separators=(",", ":")),
+                              json.dumps(missing_skills, separators=(",", ":"))))
+                    _add_counts(deltas, jd_id, contribution, 1)
+
+                conn.executemany(f"""
+                INSERT INTO {TABLE_PREFIX}jd_analytics_counts (jd_id, metric, bucket, n, total) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(jd_id, metric, bucket) DO UPDATE SET n = n + excluded.n, total = total + excluded.total
+                """, [(jd_id, metric, key, n, total) for (jd_id, metric, key), (n, total) in deltas.items()])
+                conn.executemany(
+                    f"DELETE FROM {TABLE_PREFIX}jd_analytics_counts WHERE jd_id = ? AND n = 0",
+                    [(jd_id,) for jd_id in {jd_id for jd_id, _, _ in pending}]
+                )
+        except Exception as e:
+            # Requeue so the next flush retries them; nothing was applied
+            print(f"Analytics flush failed: {e}")
+            with self._lock:
+                self._pending = pending + self._pending
+        finally:
+            conn.close()
+
+    def summary(self, jd_id):
+        """Dashboard-ready view of a JD's aggregate, or None if no candidate was scored against it."""
+        # Candidates this worker scored but hasn't applied yet
+        self.flush()
+        conn = get_db_connection()
+        try:
+            rows = conn.execute(
+                f"SELECT metric, bucket, n, total FROM {TABLE_PREFIX}jd_analytics_counts WHERE jd_id = ?", (jd_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        score_hist = [0] * (100 // SCORE_BIN_WIDTH)
+        experience_hist = [0] * (len(EXPERIENCE_BOUNDS) + 1)
+        skills = {}
+        count, score_sum = 0, 0.0
+        for row in rows:
+            metric, key, n = row['metric'], row['bucket'], row['n']
+            if metric == "candidates":
+                count, score_sum = n, row['total']
+            elif metric == "score":
+                score_hist[int(key)] = n
+            elif metric == "experience":
+                experience_hist[int(key)] = n
+            else:
+                skills.setdefault(key, [0, 0])[0 if metric == "matched" else 1] = n
+        if count == 0:
+            return None
+
+        return {
+            "jd_id": jd_id,
+            "candidates": count,
+            "average_score": round(score_sum / count, 2),
+            "score_histogram": [
+                {"range": f"{i * SCORE_BIN_WIDTH}-{(i + 1) * SCORE_BIN_WIDTH}", "count": n}
+                for i, n in enumerate(score_hist)
+            ],
+            "skills": sorted(
+                ({"skill": skill, "matched": counts[0], "missing": counts[1]} for skill, counts in skills.items()),
+                key=lambda s: (-s["missing"], s["skill"])
+            ),
+            "experience_distribution": [
+                {"range": label, "count": n} for label, n in zip(_experience_labels(), experience_hist)
+            ],
+        }
@@ -0,0 +1,287 @@
+"""
+Offline batch ranking of resumes against one or more job descriptions.
+
+Runs the same pipeline as /rank-candidates (extract -> parse -> score) without
+going through HTTP, spread across all cores. Progress is appended to a JSONL
+checkpoint so an interrupted run can be resumed.
+
+Usage:
+    python batch_rank.py --jd jd.txt resumes/ --output ranked.csv
+    python batch_rank.py --jd a.pdf --jd b.txt @file_list.txt --output ranked.jsonl --checkpoint run.ckpt
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".txt": "text/plain",
+}
+
+STAGES = ("read", "extract", "parse", "score")
+
+OUTPUT_FIELDS = [
+    "rank", "jd_name", "candidate_name", "path", "ats_score",
+    "skill_match", "keyword_density", "experience_match", "resume_quality",
+    "matched_skills", "missing_skills",
+]
+
+# Per-worker state, populated by _init_worker
+_worker_jds = []
+
+
+def content_type_for(path):
+    """Maps a file extension to the content type extract_text_from_bytes expects."""
+    return CONTENT_TYPES.get(Path(path).suffix.lower())
+
+
+def collect_inputs(inputs, recursive=True):
+    """Expands directories, plain files and @list files into a sorted list of resume paths."""
+    paths = set()
+    for item in inputs:
+        if item.startswith("@"):
+            with open(item[1:], encoding="utf-8") as f:
+                candidates = [line.strip() for line in f if line.strip()]
+        else:
+            candidates = [item]
+
+        for candidate in candidates:
+            p = Path(candidate)
+            if p.is_dir():
+                walker = p.rglob("*") if recursive else p.glob("*")
+                paths.update(str(f) for f in walker if f.is_file() and content_type_for(f))
+            elif p.is_file() and content_type_for(p):
+                paths.add(str(p))
+            else:
+                print(f"Skipping unsupported or missing input: {candidate}", file=sys.stderr)
+    return sorted(paths)
+
+
+def load_jds(jd_paths):
+    """
+    Reads and extracts the text of each JD file. Returns a list of (key, name, text).
+
+    The key is the resolved path plus a hash of the file's contents, so JDs with
+    the same filename in different directories stay apart and an edited JD
+    doesn't match checkpoint entries scored against its old version.
+    """
+    from utils import extract_text_from_bytes
+
+    jds = []
+    seen = set()
+    for jd_path in jd_paths:
+        content_type = content_type_for(jd_path)
+        if not content_type:
+            raise SystemExit(f"Unsupported JD file type: {jd_path}")
+        jd_bytes = Path(jd_path).read_bytes()
+        key = f"{Path(jd_path).resolve()}#{hashlib.sha256(jd_bytes).hexdigest()[:16]}"
+        if key in seen:
+            continue
+        seen.add(key)
+        jd_text = extract_text_from_bytes(jd_bytes, content_type)
+        if (not jd_text) or (not jd_text.strip()) or ("Error" in jd_text):
+            raise SystemExit(f"JD Error ({jd_path}): {jd_text}")
+        jds.append((key, str(jd_path), jd_text))
+    return jds
+
+
+def load_checkpoint(checkpoint_path):
+    """Loads previously completed records, keyed by resume path."""
+    done = {}
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A partially written last line from an interrupted run
+                    continue
+                done[entry["path"]] = entry
+    return done
+
+
+def _init_worker(jds):
+    """Parses every JD once per worker process."""
+    from utils import parse_jd
+
+    global _worker_jds
+    _worker_jds = [(key, name, text, parse_jd(text)) for key, name, text in jds]
+
+
+def process_resume(path):
+    """
+    Scores a single resume against every loaded JD. Returns a checkpoint entry whose
+    results are (jd_key, jd_name, encoded MatchResult) triples, which pickle far smaller than
+    the equivalent dicts; the parent expands them with expand_entry().
+    """
+    from utils import extract_text_from_bytes, parse_resume, calculate_ats_score
+    from records import MatchResult, encode
+
+    timings = dict.fromkeys(STAGES, 0.0)
+    # "permanent" marks errors a re-run would hit again (the document itself is unusable)
+    entry = {"path": path, "error": None, "permanent": False, "results": [], "timings": timings}
+
+    try:
+        t0 = time.perf_counter()
+        resume_bytes = Path(path).read_bytes()
+        t1 = time.perf_counter()
+        resume_text = extract_text_from_bytes(resume_bytes, content_type_for(path))
+        t2 = time.perf_counter()
+        timings["read"] = t1 - t0
+        timings["extract"] = t2 - t1
+
+        if (not resume_text) or (not resume_text.strip()) or ("Error" in resume_text):
+            entry["error"] = resume_text or "Error: Empty document."
+            entry["permanent"] = True
+            return entry
+
+        parsed_resume = parse_resume(resume_text)
+        t3 = time.perf_counter()
+        timings["parse"] = t3 - t2
+
+        for jd_key, jd_name, jd_text, parsed_jd in _worker_jds:
+            ats_score, match_details, required_skills = calculate_ats_score(
+                resume_text, jd_text, parsed_resume, parsed_jd
+            )
+            record = MatchResult.from_score(ats_score, match_details, parsed_jd["required_skills"], Path(path).name)
+            entry["results"].append((jd_key, jd_name, encode(record)))
+        timings["score"] = time.perf_counter() - t3
+    except Exception as e:
+        entry["error"] = f"Error: {e}"
+
+    return entry
+
+
+def expand_entry(entry):
+    """Turns a worker entry's encoded results into output rows."""
+    from records import decode
+
+    rows = []
+    try:
+        for jd_key, jd_name, data in entry["results"]:
+            rows.append({"jd_key": jd_key, "jd_name": jd_name, "path": entry["path"], **decode(data).to_candidate_row()})
+    except ValueError as e:
+        # e.g. the worker picked up a hot-reloaded taxonomy; its skill ids would be misread here
+        entry["error"] = f"Error: {e}"
+        rows = []
+    entry["results"] = rows
+    return entry
+
+
+def rank_results(entries):
+    """Flattens checkpoint entries and ranks candidates per JD by ATS score."""
+    by_jd = {}
+    for entry in entries:
+        for result in entry["results"]:
+            by_jd.setdefault(result["jd_key"], []).append(result)
+
+    ranked = []
+    for jd_key in sorted(by_jd, key=lambda key: (by_jd[key][0]["jd_name"], key)):
+        rows = sorted(by_jd[jd_key], key=lambda r: (-r["ats_score"], r["path"]))
+        for rank, row in enumerate(rows, 1):
+            ranked.append({"rank": rank, **row})
+    return ranked
+
+
+def write_output(rows, output_path):
+    """Writes ranked rows as CSV or JSONL depending on the output file extension."""
+    if output_path.lower().endswith(".jsonl"):
+        with open(output_path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+    else:
+        with open(output_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def print_stats(entries, processed, skipped, elapsed, workers):
+    """Prints throughput and per-stage timing for the files processed in this run."""
+    failed = sum(1 for e in entries if e["error"])
+    stage_totals = dict.fromkeys(STAGES, 0.0)
+    for entry in entries:
+        for stage in STAGES:
+            stage_totals[stage] += entry["timings"].get(stage, 0.0)
+
+    print("=" * 60)
+    print("BATCH RANKING STATISTICS")
+    print("=" * 60)
+    print(f"Processed: {processed}  (failed: {failed}, resumed from checkpoint: {skipped})")
+    print(f"Workers:   {workers}")
+    print(f"Wall time: {elapsed:.2f}s")
+    if elapsed > 0:
+        print(f"Throughput: {processed / elapsed:.2f} files/s")
+    if processed:
+        print("Per-stage time (CPU seconds summed across workers, mean ms/file):")
+        for stage in STAGES:
+            print(f"  - {stage:<8} {stage_totals[stage]:10.2f}s  {stage_totals[stage] / processed * 1000:8.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank a directory of resumes against job descriptions.")
+    parser.add_argument("inputs", nargs="+", help="Resume files, directories, or @file containing one path per line")
+    parser.add_argument("--jd", action="append", required=True, help="Job description file (repeatable)")
+    parser.add_argument("--output", "-o", required=True, help="Output path (.csv or .jsonl)")
+    parser.add_argument("--checkpoint", help="JSONL checkpoint file; completed resumes are skipped on re-run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=8, help="Resumes handed to a worker at a time")
+    parser.add_argument("--no-recursive", action="store_true", help="Do not descend into subdirectories")
+    args = parser.parse_args(argv)
+
+    paths = collect_inputs(args.inputs, recursive=not args.no_recursive)
+    path_set = set(paths)
+    jds = load_jds(args.jd)
+    jd_keys = {key for key, _, _ in jds}
+
+    done = load_checkpoint(args.checkpoint)
+    # Only reuse checkpoint entries that were scored against the same JD files and contents;
+    # failures are retried unless the document itself couldn't be read
+    done = {
+        path: entry for path, entry in done.items()
+        if path in path_set and (
+            entry.get("permanent") if entry["error"]
+            else {r.get("jd_key") for r in entry["results"]} == jd_keys
+        )
+    }
+    pending = [p for p in paths if p not in done]
+    print(f"Found {len(paths)} resumes, {len(done)} already in checkpoint, {len(pending)} to process.")
+
+    new_entries = []
+    checkpoint_file = open(args.checkpoint, "a", encoding="utf-8") if args.checkpoint else None
+    start = time.perf_counter()
+    try:
+        with Pool(processes=max(args.workers, 1), initializer=_init_worker, initargs=(jds,)) as pool:
+            for i, entry in enumerate(pool.imap_unordered(process_resume, pending, chunksize=max(args.chunksize, 1)), 1):
+                entry = expand_entry(entry)
+                new_entries.append(entry)
+                if entry["error"]:
+                    print(f"Error processing {entry['path']}: {entry['error']}", file=sys.stderr)
+                if checkpoint_file:
+                    checkpoint_file.write(json.dumps(entry) + "\n")
+                    checkpoint_file.flush()
+                if i % 100 == 0:
+                    rate = i / (time.perf_counter() - start)
+                    print(f"  {i}/{len(pending)} ({rate:.1f} files/s)")
+    finally:
+        if checkpoint_file:
+            checkpoint_file.close()
+    elapsed = time.perf_counter() - start
+
+    all_entries = list(done.values()) + new_entries
+    ranked = rank_results(all_entries)
+    write_output(ranked, args.output)
+    print(f"Wrote {len(ranked)} ranked rows to {args.output}")
+
+    print_stats(new_entries, len(new_entries), len(done), elapsed, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+
+from starlette.concurrency import run_in_threadpool
+
+
+def content_key(*parts):
+    """Builds a stable hash key from bytes/str parts (length-prefixed so parts can't run together)."""
+    h = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            part = b""
+        elif isinstance(part, str):
+            part = part.encode("utf-8")
+        h.update(len(part).to_bytes(8, "big"))
+        h.update(part)
+    return h.hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical computations into one.
+
+    Callers with the same key await a single shared run of the (blocking)
+    function in the threadpool. Successful results are kept for `ttl` seconds
+    so near-simultaneous repeats are served from memory. Failures are not cached.
+    """
+
+    def __init__(self, ttl=30.0, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._inflight = {}
+        self._cache = OrderedDict()
+        self.stats = {"computed": 0, "coalesced": 0, "cache_hits": 0}
+
+    async def run(self, key, func, *args):
+        cached = self._cache.get(key)
+        if cached is not None:
+            expires_at, result = cached
+            if expires_at > time.monotonic():
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return result
+            del self._cache[key]
+
+        future = self._inflight.get(key)
+        if future is None:
+            self.stats["computed"] += 1
+            future = asyncio.ensure_future(run_in_threadpool(func, *args))
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._finish(key, f))
+        else:
+            self.stats["coalesced"] += 1
+
+        # Shield so one client disconnecting doesn't cancel the work others are waiting on
+        return await asyncio.shield(future)
+
+    def _finish(self, key, future):
+        self._inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None or self.ttl <= 0:
+            return
+
+        self._cache[key] = (time.monotonic() + self.ttl, future.result())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def clear(self):
+        self._cache.clear()
@@ -1,18 +1,28 @@
 import sqlite3
+import json
+import hashlib
+import zlib
 import bcrypt
 
 DB_PATH = "resume_analyzer.db"
 APP_ID = "resume_analyzer_app"
+# Stored in PRAGMA user_version once setup_database has run; bump it whenever
+# setup_database changes so existing databases get the new tables and columns
+SCHEMA_VERSION = 3
 
-def get_db_connection():
+def get_db_connection(check_same_thread=True):
     """Establishes a connection to the SQLite database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     return conn
 
 def setup_database():
     """Creates the necessary tables if they don't exist."""
     conn = get_db_connection()
+    # Already at this schema: skip the DDL so worker startup is a single read
+    if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+        conn.close()
+        return
     cursor = conn.cursor()
     
     TABLE_PREFIX = f"{APP_ID}_"
@@ -61,9 +71,170 @@ def setup_database():
     )
     """)
     
+    # Columns added after the initial schema; older databases are migrated in place
+    _ensure_column(cursor, f"{TABLE_PREFIX}resumes", "filename", "TEXT")
+    # Duplicate-detection fingerprint (see dedupe.py)
+    _ensure_column(cursor, f"{TABLE_PREFIX}resumes", "content_hash", "TEXT")
+    _ensure_column(cursor, f"{TABLE_PREFIX}resumes", "simhash", "INTEGER")
+    _ensure_column(cursor, f"{TABLE_PREFIX}results", "candidate_name", "TEXT")
+    _ensure_column(cursor, f"{TABLE_PREFIX}results", "created_at", "TIMESTAMP")
+    # Unweighted component scores, so pools can be re-ranked without re-parsing
+    for column in ("skill_score", "keyword_score", "quality_score", "resume_years", "required_years"):
+        _ensure_column(cursor, f"{TABLE_PREFIX}results", column, "REAL")
+    
+    # Text and parsed JSON live in the blobs table (compressed, one copy per distinct
+    # payload); the text/parsed_json columns are only read for rows stored before that
+    for table in ("resumes", "job_descriptions"):
+        _ensure_column(cursor, f"{TABLE_PREFIX}{table}", "text_blob", "TEXT")
+        _ensure_column(cursor, f"{TABLE_PREFIX}{table}", "parsed_blob", "TEXT")
+    
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}blobs (
+        hash TEXT PRIMARY KEY, -- sha256 of the uncompressed payload
+        codec TEXT NOT NULL, -- 'zlib' or 'raw'
+        size INTEGER NOT NULL, -- uncompressed bytes
+        data BLOB NOT NULL
+    )
+    """)
+    
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE_PREFIX}resumes_hash_idx ON {TABLE_PREFIX}resumes (content_hash)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE_PREFIX}resumes_text_blob_idx ON {TABLE_PREFIX}resumes (text_blob)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE_PREFIX}resumes_user_idx ON {TABLE_PREFIX}resumes (user_id)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE_PREFIX}resumes_upload_idx ON {TABLE_PREFIX}resumes (upload_date)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE_PREFIX}jds_text_blob_idx ON {TABLE_PREFIX}job_descriptions (text_blob)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE_PREFIX}jds_upload_idx ON {TABLE_PREFIX}job_descriptions (upload_date)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE_PREFIX}results_created_idx ON {TABLE_PREFIX}results (created_at)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE_PREFIX}results_jd_idx ON {TABLE_PREFIX}results (jd_id, result_id)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE_PREFIX}results_resume_idx ON {TABLE_PREFIX}results (resume_id, result_id)")
+    
+    # Corpus-wide document frequencies for keyword scoring (see keyword_model.py)
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}idf_terms (
+        term TEXT PRIMARY KEY,
+        df INTEGER NOT NULL
+    )
+    """)
+    
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}idf_documents (
+        doc_hash TEXT PRIMARY KEY,
+        added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    
+    # Per-JD dashboard aggregates (see analytics.py), changed only by increments
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}jd_analytics_counts (
+        jd_id INTEGER NOT NULL,
+        metric TEXT NOT NULL, -- 'candidates', 'score', 'experience', 'matched' or 'missing'
+        bucket TEXT NOT NULL, -- histogram bin or skill name; '' for 'candidates'
+        n INTEGER NOT NULL,
+        total REAL NOT NULL DEFAULT 0, -- sum of ATS scores, for 'candidates'
+        PRIMARY KEY (jd_id, metric, bucket)
+    )
+    """)
+    
+    # Each candidate's last contribution to a JD's counts, so a re-rank can subtract it
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}jd_analytics_members (
+        jd_id INTEGER NOT NULL,
+        resume_id INTEGER NOT NULL,
+        ats_score REAL NOT NULL,
+        experience_bucket INTEGER NOT NULL,
+        matched TEXT NOT NULL, -- JSON list of skill names
+        missing TEXT NOT NULL,
+        PRIMARY KEY (jd_id, resume_id)
+    )
+    """)
+    _migrate_jd_analytics(cursor)
+    
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}scoring_profiles (
+        jd_id INTEGER PRIMARY KEY,
+        profile TEXT NOT NULL
+    )
+    """)
+    # Bumped on every save; its sum is the store-wide revision (see scoring_profiles.py)
+    _ensure_column(cursor, f"{TABLE_PREFIX}scoring_profiles", "revision", "INTEGER NOT NULL DEFAULT 0")
+    
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
     conn.close()
 
+def _ensure_column(cursor, table, column, column_type):
+    """Adds a column to an existing table if it is missing."""
+    columns = {row['name'] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+def _migrate_jd_analytics(cursor):
+    """Moves the per-JD JSON aggregates of older databases into the counts and members tables."""
+    TABLE_PREFIX = f"{APP_ID}_"
+    legacy = f"{TABLE_PREFIX}jd_analytics"
+    if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (legacy,)).fetchone() is None:
+        return
+    counts, members = [], []
+    for row in cursor.execute(f"SELECT jd_id, payload FROM {legacy}").fetchall():
+        jd_id, aggregate = row['jd_id'], json.loads(row['payload'])
+        counts.append((jd_id, "candidates", "", aggregate["count"], aggregate["score_sum"]))
+        for metric, hist in (("score", aggregate["score_hist"]), ("experience", aggregate["experience_hist"])):
+            counts += [(jd_id, metric, str(i), n, 0) for i, n in enumerate(hist)]
+        for skill, (matched, missing) in aggregate["skills"].items():
+            counts += [(jd_id, "matched", skill, matched, 0), (jd_id, "missing", skill, missing, 0)]
+        for resume_id, (ats_score, bucket, matched, missing) in aggregate.get("members", {}).items():
+            members.append((jd_id, int(resume_id), ats_score, bucket, json.dumps(matched), json.dumps(missing)))
+    cursor.executemany(f"""
+    INSERT OR IGNORE INTO {TABLE_PREFIX}jd_analytics_counts (jd_id, metric, bucket, n, total) VALUES (?, ?, ?, ?, ?)
+    """, [c for c in counts if c[3]])
+    cursor.executemany(f"""
+    INSERT OR IGNORE INTO {TABLE_PREFIX}jd_analytics_members
+        (jd_id, resume_id, ats_score, experience_bucket, matched, missing) VALUES (?, ?, ?, ?, ?, ?)
+    """, members)
+    cursor.execute(f"DROP TABLE {legacy}")
+
+# Payloads smaller than this are stored uncompressed; zlib can't win much on them
+MIN_COMPRESS_BYTES = 256
+
+def encode_blob(payload):
+    """Returns (codec, data) for a bytes payload."""
+    if len(payload) >= MIN_COMPRESS_BYTES:
+        compressed = zlib.compress(payload, 6)
+        if len(compressed) < len(payload):
+            return 'zlib', compressed
+    return 'raw', payload
+
+def decode_blob(codec, data):
+    if codec == 'zlib':
+        return zlib.decompress(data)
+    if codec == 'raw':
+        return bytes(data)
+    raise ValueError(f"Unknown blob codec {codec!r}")
+
+def put_blob(conn, text):
+    """Stores a text payload once, keyed by its sha256. Returns the hash. Runs in the caller's transaction."""
+    payload = text.encode('utf-8')
+    digest = hashlib.sha256(payload).hexdigest()
+    TABLE_PREFIX = f"{APP_ID}_"
+    if conn.execute(f"SELECT 1 FROM {TABLE_PREFIX}blobs WHERE hash = ?", (digest,)).fetchone() is None:
+        codec, data = encode_blob(payload)
+        conn.execute(
+            f"INSERT OR IGNORE INTO {TABLE_PREFIX}blobs (hash, codec, size, data) VALUES (?, ?, ?, ?)",
+            (digest, codec, len(payload), data)
+        )
+    return digest
+
+def get_blobs(conn, hashes):
+    """Returns {hash: text} for the given blob hashes."""
+    hashes = [h for h in set(hashes) if h]
+    if not hashes:
+        return {}
+    TABLE_PREFIX = f"{APP_ID}_"
+    placeholders = ",".join("?" * len(hashes))
+    rows = conn.execute(
+        f"SELECT hash, codec, data FROM {TABLE_PREFIX}blobs WHERE hash IN ({placeholders})", hashes
+    ).fetchall()
+    return {row['hash']: decode_blob(row['codec'], row['data']).decode('utf-8') for row in rows}
+
 def hash_password(password):
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
@@ -111,3 +282,282 @@ def authenticate_user_db(email, password):
                 'user_role': user_record['role']
             }
     return {'authenticated': False}
+
+def save_resume_db(text, parsed_resume, filename=None, user_id=None, content_hash=None, simhash=None):
+    """Stores a resume, its parsed fields and its duplicate-detection fingerprint. Returns the new resume_id."""
+    conn = get_db_connection()
+    TABLE_PREFIX = f"{APP_ID}_"
+    try:
+        with conn:
+            text_blob = put_blob(conn, text)
+            parsed_blob = put_blob(conn, json.dumps(parsed_resume))
+            cursor = conn.execute(f"""
+            INSERT INTO {TABLE_PREFIX}resumes (user_id, text_blob, parsed_blob, filename, content_hash, simhash)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """, (user_id, text_blob, parsed_blob, filename, content_hash, simhash))
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+def get_resumes_db(resume_ids):
+    """Fetches stored resumes by id. Returns a dict of resume_id -> record."""
+    if not resume_ids:
+        return {}
+    conn = get_db_connection()
+    TABLE_PREFIX = f"{APP_ID}_"
+    placeholders = ",".join("?" * len(resume_ids))
+    try:
+        rows = conn.execute(f"""
+        SELECT resume_id, user_id, text, parsed_json, text_blob, parsed_blob, filename, upload_date
+        FROM {TABLE_PREFIX}resumes WHERE resume_id IN ({placeholders})
+        """, list(resume_ids)).fetchall()
+        blobs = get_blobs(conn, [row['text_blob'] for row in rows] + [row['parsed_blob'] for row in rows])
+    finally:
+        conn.close()
+    records = {}
+    for row in rows:
+        # Rows stored before blob storage keep their payloads inline
+        parsed_json = blobs.get(row['parsed_blob']) if row['parsed_blob'] else row['parsed_json']
+        records[row['resume_id']] = {
+            'resume_id': row['resume_id'],
+            'user_id': row['user_id'],
+            'text': blobs.get(row['text_blob']) if row['text_blob'] else row['text'],
+            'parsed_resume': json.loads(parsed_json) if parsed_json else {},
+            'filename': row['filename'],
+            'upload_date': row['upload_date'],
+        }
+    return records
+
+def iter_resume_texts_db(batch_size=500):
+    """Yields (resume_id, text) for every stored resume, in id order."""
+    conn = get_db_connection()
+    TABLE_PREFIX = f"{APP_ID}_"
+    try:
+        cursor = conn.execute(f"""
+        SELECT r.resume_id, r.text, b.codec, b.data
+        FROM {TABLE_PREFIX}resumes r LEFT JOIN {TABLE_PREFIX}blobs b ON b.hash = r.text_blob
+        ORDER BY r.resume_id
+        """)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                if row['codec'] is not None:
+                    yield row['resume_id'], decode_blob(row['codec'], row['data']).decode('utf-8')
+                else:
+                    yield row['resume_id'], row['text']
+    finally:
+        conn.close()
+
+def iter_resume_fingerprints_db(include_missing=False):
+    """Yields (resume_id, content_hash, simhash) for stored resumes, in id order."""
+    conn = get_db_connection()
+    TABLE_PREFIX = f"{APP_ID}_"
+    where = "" if include_missing else "WHERE simhash IS NOT NULL"
+    try:
+        for row in conn.execute(f"""
+        SELECT resume_id, content_hash, simhash FROM {TABLE_PREFIX}resumes {where} ORDER BY resume_id
+        """):
+            yield row['resume_id'], row['content_hash'], row['simhash']
+    finally:
+        conn.close()
+
+def set_resume_fingerprints_db(rows):
+    """Updates fingerprints from (content_hash, simhash, resume_id) rows in one transaction."""
+    conn = get_db_connection()
+    TABLE_PREFIX = f"{APP_ID}_"
+    try:
+        with conn:
+            conn.executemany(
+                f"UPDATE {TABLE_PREFIX}resumes SET content_hash = ?, simhash = ? WHERE resume_id = ?", rows
+            )
+    finally:
+        conn.close()
+
+def save_jd_db(text, parsed_jd, recruiter_id=None):
+    """Stores a job description, reusing the existing row for identical text. Returns the jd_id."""
+    conn = get_db_connection()
+    TABLE_PREFIX = f"{APP_ID}_"
+    text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    try:
+        row = conn.execute(
+            f"SELECT jd_id FROM {TABLE_PREFIX}job_descriptions WHERE text_blob = ? LIMIT 1", (text_hash,)
+        ).fetchone() or conn.execute(
+            # Rows stored before blob storage (until 'python storage.py compress' moves them)
+            f"SELECT jd_id FROM {TABLE_PREFIX}job_descriptions WHERE text_blob IS NULL AND text = ? LIMIT 1", (text,)
+        ).fetchone()
+        if row:
+            return row['jd_id']
+        with conn:
+            put_blob(conn, text)
+            parsed_blob = put_blob(conn, json.dumps(parsed_jd))
+            cursor = conn.execute(f"""
+            INSERT INTO {TABLE_PREFIX}job_descriptions (recruiter_id, text_blob, parsed_blob)
+            VALUES (?, ?, ?)
+            """, (recruiter_id, text_hash, parsed_blob))
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+def get_jd_db(jd_id):
+    """Fetches a stored job description, or None."""
+    conn = get_db_connection()
+    TABLE_PREFIX = f"{APP_ID}_"
+    try:
+        row = conn.execute(f"""
+        SELECT jd_id, text, parsed_json, text_blob, parsed_blob, upload_date
+        FROM {TABLE_PREFIX}job_descriptions WHERE jd_id = ?
+        """, (jd_id,)).fetchone()
+        if row is None:
+            return None
+        blobs = get_blobs(conn, [row['text_blob'], row['parsed_blob']])
+    finally:
+        conn.close()
+    parsed_json = blobs.get(row['parsed_blob']) if row['parsed_blob'] else row['parsed_json']
+    return {
+        'jd_id': row['jd_id'],
+        'text': blobs.get(row['text_blob']) if row['text_blob'] else row['text'],
+        'parsed_jd': json.loads(parsed_json) if parsed_json else {},
+        'upload_date': row['upload_date'],
+    }
+
+def save_results_db(rows):
+    """
+    Inserts scoring results in a single transaction. Each row is
+    (resume_id, jd_id, candidate_name, ats_score, match_details, suggestions, created_at,
+     skill_score, keyword_score, quality_score, resume_years, required_years).
+    """
+    conn = get_db_connection()
+    TABLE_PREFIX = f"{APP_ID}_"
+    try:
+        with conn:
+            conn.executemany(f"""
+            INSERT INTO {TABLE_PREFIX}results
+                (resume_id, jd_id, candidate_name, ats_score, match_details, suggestions, created_at,
+                 skill_score, keyword_score, quality_score, resume_years, required_years)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+    finally:
+        conn.close()
+
+def get_results_db(jd_id=None, resume_id=None, limit=50, before_id=None):
+    """Returns one page of stored results, newest first. Page with before_id = last result_id seen."""
+    conn = get_db_connection()
+    TABLE_PREFIX = f"{APP_ID}_"
+    clauses, params = [], []
+    if jd_id is not None:
+        clauses.append("jd_id = ?")
+        params.append(jd_id)
+    if resume_id is not None:
+        clauses.append("resume_id = ?")
+        params.append(resume_id)
+    if before_id is not None:
+        clauses.append("result_id < ?")
+        params.append(before_id)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    try:
+        rows = conn.execute(f"""
+        SELECT result_id, resume_id, jd_id, candidate_name, ats_score, match_details, suggestions, created_at
+        FROM {TABLE_PREFIX}results {where}
+        ORDER BY result_id DESC LIMIT ?
+        """, params + [limit]).fetchall()
+    finally:
+        conn.close()
+    return [
+        {
+            'result_id': row['result_id'],
+            'resume_id': row['resume_id'],
+            'jd_id': row['jd_id'],
+            'candidate_name': row['candidate_name'],
+            'ats_score': row['ats_score'],
+            'match_details': json.loads(row['match_details']) if row['match_details'] else {},
+            'suggestions': json.loads(row['suggestions']) if row['suggestions'] else [],
+            'created_at': row['created_at'],
+        }
+        for row in rows
+    ]
+
+def iter_ranked_results_db(jd_id, batch_size=500):
+    """
+    Yields a JD's results best first (latest result per candidate), fetching
+    `batch_size` rows at a time. SQLite does the sorting, so memory stays flat
+    however large the pool. The connection may be advanced from different
+    threads (one at a time), as StreamingResponse does with sync iterators.
+    """
+    conn = get_db_connection(check_same_thread=False)
+    TABLE_PREFIX = f"{APP_ID}_"
+    try:
+        cursor = conn.execute(f"""
+        SELECT result_id, resume_id, candidate_name, ats_score, match_details, created_at
+        FROM {TABLE_PREFIX}results
+        WHERE result_id IN (
+            SELECT MAX(result_id) FROM {TABLE_PREFIX}results
+            WHERE jd_id = ?
+            GROUP BY COALESCE(resume_id, candidate_name)
+        )
+        ORDER BY ats_score DESC, result_id
+        """, (jd_id,))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield {
+                    'result_id': row['result_id'],
+                    'resume_id': row['resume_id'],
+                    'candidate_name': row['candidate_name'],
+                    'ats_score': row['ats_score'],
+                    'match_details': json.loads(row['match_details']) if row['match_details'] else {},
+                    'created_at': row['created_at'],
+                }
+    finally:
+        conn.close()
+
+def update_result_scores_db(scores):
+    """Overwrites stored ATS scores from (result_id, ats_score) pairs, e.g. after a re-rank."""
+    conn = get_db_connection()
+    TABLE_PREFIX = f"{APP_ID}_"
+    try:
+        with conn:
+            conn.executemany(
+                f"UPDATE {TABLE_PREFIX}results SET ats_score = ? WHERE result_id = ?",
+                [(score, result_id) for result_id, score in scores]
+            )
+    finally:
+        conn.close()
+
+def get_result_components_db(jd_id):
+    """
+    Loads the stored component scores of a JD's candidate pool (latest result per
+    candidate) as column lists, ready for a vectorised re-rank.
+    """
+    conn = get_db_connection()
+    TABLE_PREFIX = f"{APP_ID}_"
+    try:
+        rows = conn.execute(f"""
+        SELECT result_id, resume_id, candidate_name,
+               skill_score, keyword_score, quality_score, resume_years, required_years
+        FROM {TABLE_PREFIX}results
+        WHERE result_id IN (
+            SELECT MAX(result_id) FROM {TABLE_PREFIX}results
+            WHERE jd_id = ? AND skill_score IS NOT NULL
+            GROUP BY COALESCE(resume_id, candidate_name)
+        )
+        ORDER BY result_id
+        """, (jd_id,)).fetchall()
+    finally:
+        conn.close()
+    columns = ("result_id", "resume_id", "candidate_name",
+               "skill_score", "keyword_score", "quality_score", "resume_years", "required_years")
+    data = {column: [row[i] for row in rows] for i, column in enumerate(columns)}
+    return {
+        "result_id": data["result_id"],
+        "resume_id": data["resume_id"],
+        "candidate_name": data["candidate_name"],
+        "skill": data["skill_score"],
+        "keyword": data["keyword_score"],
+        "quality": data["quality_score"],
+        "resume_years": data["resume_years"],
+        "required_years": data["required_years"],
+    }
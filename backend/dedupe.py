@@ -0,0 +1,184 @@
+"""
+Exact and near-duplicate detection for resume texts.
+
+A fingerprint is (content_hash, simhash):
+
+  - content_hash: sha256 of the cleaned text, so reformatting, case and
+    punctuation differences don't hide an exact copy
+  - simhash:      64-bit SimHash over word 3-shingles; copies with small edits
+    (a new phone number, one extra bullet) land within a few bits
+
+DuplicateIndex finds a match by content hash first, then by SimHash within
+MAX_DISTANCE bits; find_exact() looks at the content hash alone, for callers
+that may only reuse work done on the very same text. SimHashes are split into four 16-bit bands: two hashes
+within 3 bits agree exactly on at least one band, so only resumes sharing a
+band are compared.
+
+Stored resumes carry their fingerprint in the resumes table; resumes saved
+before fingerprints existed can be backfilled with:
+    python dedupe.py backfill
+"""
+import argparse
+import hashlib
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+from database import iter_resume_fingerprints_db, iter_resume_texts_db, set_resume_fingerprints_db
+from utils import clean_text
+
+SHINGLE_WORDS = 3
+MAX_DISTANCE = 3
+BANDS = 4
+BAND_BITS = 64 // BANDS
+_BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def fingerprint(text):
+    """Returns (content_hash, simhash) for a resume text; simhash is an unsigned 64-bit int."""
+    words = clean_text(text).split()
+    content_hash = hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()
+    if len(words) < SHINGLE_WORDS:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)]
+    hashes = np.frombuffer(
+        b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles), dtype="<u8"
+    )
+    # Per bit position, count shingles with the bit set versus clear
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    simhash = int(np.packbits(votes > 0, bitorder="little").view("<u8")[0])
+    return content_hash, simhash
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def to_signed(simhash):
+    """SQLite integers are signed 64-bit."""
+    return simhash - (1 << 64) if simhash >= 1 << 63 else simhash
+
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+class DuplicateIndex:
+    """Maps fingerprints to keys (batch positions or resume ids) and finds the closest copy."""
+
+    def __init__(self, max_distance=MAX_DISTANCE):
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._by_hash = {}
+        self._simhashes = {}
+        self._bands = [defaultdict(list) for _ in range(BANDS)]
+
+    def __len__(self):
+        return len(self._simhashes)
+
+    def add(self, key, content_hash, simhash):
+        with self._lock:
+            self._by_hash.setdefault(content_hash, []).append(key)
+            self._simhashes[key] = simhash
+            for band in range(BANDS):
+                self._bands[band][(simhash >> (band * BAND_BITS)) & _BAND_MASK].append(key)
+
+    def find(self, content_hash, simhash):
+        """Returns (key, distance) of an exact (distance 0) or near duplicate, or None."""
+        with self._lock:
+            keys = self._by_hash.get(content_hash)
+            if keys:
+                return keys[0], 0
+            best = None
+            for band in range(BANDS):
+                for key in self._bands[band].get((simhash >> (band * BAND_BITS)) & _BAND_MASK, ()):
+                    distance = hamming(simhash, self._simhashes[key])
+                    if distance <= self.max_distance and (best is None or distance < best[1]):
+                        best = (key, distance)
+            return best
+
+    def find_exact(self, content_hash, exclude=()):
+        """Returns the first key with exactly this content hash that isn't in `exclude`, or None."""
+        keys = self.find_all_exact(content_hash, exclude)
+        return keys[0] if keys else None
+
+    def find_all_exact(self, content_hash, exclude=()):
+        """Returns every key with exactly this content hash that isn't in `exclude`, oldest first."""
+        with self._lock:
+            return [key for key in self._by_hash.get(content_hash, ()) if key not in exclude]
+
+
+class StoredDuplicateIndex(DuplicateIndex):
+    """DuplicateIndex over stored resumes, loaded from the database on first use."""
+
+    def __init__(self, max_distance=MAX_DISTANCE):
+        super().__init__(max_distance)
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def load(self):
+        with self._load_lock:
+            if self._loaded:
+                return
+            for resume_id, content_hash, simhash in iter_resume_fingerprints_db():
+                super().add(resume_id, content_hash, to_unsigned(simhash))
+            self._loaded = True
+
+    def add(self, key, content_hash, simhash):
+        self.load()
+        super().add(key, content_hash, simhash)
+
+    def find(self, content_hash, simhash):
+        self.load()
+        return super().find(content_hash, simhash)
+
+    def find_all_exact(self, content_hash, exclude=()):
+        self.load()
+        return super().find_all_exact(content_hash, exclude)
+
+
+def backfill(batch_size=500):
+    """Fingerprints stored resumes that don't have one yet. Returns how many were updated."""
+    missing = {resume_id for resume_id, _, simhash in iter_resume_fingerprints_db(include_missing=True) if simhash is None}
+    rows = []
+    for resume_id, text in iter_resume_texts_db(batch_size):
+        if resume_id in missing and text:
+            content_hash, simhash = fingerprint(text)
+            rows.append((content_hash, to_signed(simhash), resume_id))
+    # Written after the read cursor is closed; SQLite won't commit while it holds its lock
+    for start in range(0, len(rows), batch_size):
+        set_resume_fingerprints_db(rows[start:start + batch_size])
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resume duplicate-detection maintenance.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backfill", help="Fingerprint stored resumes saved before fingerprints existed")
+    sub.add_parser("stats", help="Count exact and near-duplicate groups among stored resumes")
+    args = parser.parse_args(argv)
+
+    if args.command == "backfill":
+        print(f"Fingerprinted {backfill()} resume(s)")
+        return
+
+    index = DuplicateIndex()
+    total = exact = near = 0
+    for resume_id, content_hash, simhash in iter_resume_fingerprints_db():
+        total += 1
+        match = index.find(content_hash, to_unsigned(simhash))
+        if match is None:
+            index.add(resume_id, content_hash, to_unsigned(simhash))
+        elif match[1] == 0:
+            exact += 1
+        else:
+            near += 1
+    print(f"Fingerprinted resumes: {total}")
+    print(f"Exact copies: {exact}, near duplicates: {near}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Streaming CSV/JSONL encoders for result exports.
+
+Each encoder takes an iterator of row dicts and yields text chunks of
+`chunk_rows` rows, so a StreamingResponse can start sending immediately and
+only one chunk is held in memory at a time.
+"""
+import csv
+import io
+import json
+import zlib
+
+EXPORT_COLUMNS = [
+    "rank", "candidate_name", "resume_id", "ats_score",
+    "skill_match", "keyword_density", "experience_match", "resume_quality",
+    "matched_skills", "missing_skills", "created_at",
+]
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+}
+
+
+def export_rows(results, required_skills):
+    """Turns stored results (as from iter_ranked_results_db) into ranked export rows."""
+    required = set(required_skills)
+    for rank, result in enumerate(results, 1):
+        details = result["match_details"]
+        matched = details.get("Matched Skills", [])
+        yield {
+            "rank": rank,
+            "candidate_name": result["candidate_name"],
+            "resume_id": result["resume_id"],
+            "ats_score": result["ats_score"],
+            "skill_match": details.get("Skill Match"),
+            "keyword_density": details.get("Keyword Density"),
+            "experience_match": details.get("Experience Match"),
+            "resume_quality": details.get("Resume Quality"),
+            "matched_skills": ", ".join(matched),
+            "missing_skills": ", ".join(sorted(required.difference(matched))),
+            "created_at": result["created_at"],
+        }
+
+
+def csv_chunks(rows, chunk_rows=500):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for i, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if i % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def jsonl_chunks(rows, chunk_rows=500):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row))
+        if len(lines) >= chunk_rows:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip-compresses a stream of text chunks incrementally."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encode(rows, fmt, compress=False):
+    """Returns the byte/text chunk iterator for `fmt` ('csv' or 'jsonl')."""
+    chunks = csv_chunks(rows) if fmt == "csv" else jsonl_chunks(rows)
+    return gzip_chunks(chunks) if compress else chunks
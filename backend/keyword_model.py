@@ -0,0 +1,254 @@
+"""
+Persistent corpus-wide IDF model for the keyword component of the ATS score.
+
+Instead of fitting a TfidfVectorizer on two documents per request, document
+frequencies are accumulated across every resume and JD processed and kept in
+SQLite. Scoring a pair is then a transform with the stored IDF plus a sparse
+dot product.
+
+Maintenance:
+    python keyword_model.py stats
+    python keyword_model.py compact --min-df 2
+"""
+import argparse
+import hashlib
+import math
+import threading
+from collections import Counter
+
+import numpy as np
+
+from database import get_db_connection, APP_ID
+from utils import clean_text
+
+TABLE_PREFIX = f"{APP_ID}_"
+
+
+class KeywordModel:
+    """
+    Document frequencies over every resume/JD seen, with smoothed IDF matching
+    TfidfVectorizer's defaults: idf = ln((1 + n) / (1 + df)) + 1.
+
+    Updates are applied in memory immediately and written to SQLite in batches
+    of `flush_every` documents. Identical documents are only counted once.
+
+    Unlike the per-request vectorizer (max_features=500), the vocabulary is
+    never truncated, so for a pair with more than 500 distinct n-grams the
+    similarity differs from reference_scoring.tfidf_similarity; see
+    test_differential.py.
+    """
+
+    def __init__(self, flush_every=50):
+        self.flush_every = flush_every
+        self._analyzer = None
+        self._lock = threading.Lock()
+        self._df = Counter()
+        self._seen = set()
+        self._pending_df = Counter()
+        self._pending_docs = []
+        self._loaded = False
+
+    @property
+    def n_docs(self):
+        return len(self._seen)
+
+    @property
+    def vocabulary_size(self):
+        return len(self._df)
+
+    def load(self):
+        """Loads stored document frequencies. Called lazily on first use."""
+        with self._lock:
+            if self._loaded:
+                return
+            conn = get_db_connection()
+            try:
+                for row in conn.execute(f"SELECT term, df FROM {TABLE_PREFIX}idf_terms"):
+                    self._df[row['term']] = row['df']
+                for row in conn.execute(f"SELECT doc_hash FROM {TABLE_PREFIX}idf_documents"):
+                    self._seen.add(row['doc_hash'])
+            finally:
+                conn.close()
+            self._loaded = True
+
+    def analyzer(self):
+        """Same analyzer as the per-request vectorizer (stop words removed, 1-3 grams), built on first use."""
+        if self._analyzer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self._analyzer = TfidfVectorizer(stop_words='english', ngram_range=(1, 3)).build_analyzer()
+        return self._analyzer
+
+    def analyze(self, text):
+        """Returns raw term counts for a document."""
+        return Counter(self.analyzer()(clean_text(text)))
+
+    def add_document(self, text, term_counts=None):
+        """Adds a document to the corpus statistics. Returns False if it was already counted."""
+        if not self._loaded:
+            self.load()
+        if term_counts is None:
+            term_counts = self.analyze(text)
+        doc_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        with self._lock:
+            if doc_hash in self._seen:
+                return False
+            self._seen.add(doc_hash)
+            self._pending_docs.append(doc_hash)
+            for term in term_counts:
+                self._df[term] += 1
+                self._pending_df[term] += 1
+            should_flush = len(self._pending_docs) >= self.flush_every
+
+        if should_flush:
+            self.flush()
+        return True
+
+    def idf(self, term):
+        n = self.n_docs
+        return math.log((1 + n) / (1 + self._df.get(term, 0))) + 1
+
+    def transform(self, term_counts):
+        """Turns raw term counts into an L2-normalised TF-IDF vector (as a dict)."""
+        vector = {term: count * self.idf(term) for term, count in term_counts.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        if norm == 0:
+            return {}
+        return {term: w / norm for term, w in vector.items()}
+
+    def similarity(self, text_a, text_b, learn=True):
+        """Cosine similarity of two documents under the corpus IDF, optionally learning from both."""
+        counts_a = self.analyze(text_a)
+        counts_b = self.analyze(text_b)
+        if learn:
+            self.add_document(text_a, counts_a)
+            self.add_document(text_b, counts_b)
+        elif not self._loaded:
+            self.load()
+
+        vec_a = self.transform(counts_a)
+        vec_b = self.transform(counts_b)
+        if len(vec_a) > len(vec_b):
+            vec_a, vec_b = vec_b, vec_a
+        return sum(w * vec_b.get(term, 0.0) for term, w in vec_a.items())
+
+    def similarities(self, text, others, learn=True):
+        """
+        Cosine similarities of one document against many (e.g. a resume against
+        several JDs) in one sparse matrix-vector product. Same values as calling
+        similarity() for each pair after all documents have been learned.
+        """
+        counts = self.analyze(text)
+        other_counts = [self.analyze(other) for other in others]
+        if learn:
+            self.add_document(text, counts)
+            for other, other_count in zip(others, other_counts):
+                self.add_document(other, other_count)
+        elif not self._loaded:
+            self.load()
+
+        vocabulary = {}
+        rows, cols, values = [], [], []
+        for i, other_count in enumerate(other_counts):
+            for term, count in other_count.items():
+                rows.append(i)
+                cols.append(vocabulary.setdefault(term, len(vocabulary)))
+                values.append(count)
+        if not vocabulary:
+            return [0.0] * len(others)
+        query_cols = [vocabulary.setdefault(term, len(vocabulary)) for term in counts]
+
+        from scipy.sparse import csr_matrix
+
+        # One consistent IDF for the whole call, even while other requests learn documents
+        with self._lock:
+            n = len(self._seen)
+            df = self._df
+            idf = np.fromiter((math.log((1 + n) / (1 + df.get(term, 0))) + 1 for term in vocabulary),
+                              dtype=np.float64, count=len(vocabulary))
+        matrix = csr_matrix((np.asarray(values, dtype=np.float64) * idf[cols], (rows, cols)),
+                            shape=(len(others), len(vocabulary)))
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+
+        query = np.zeros(len(vocabulary))
+        query[query_cols] = np.fromiter(counts.values(), dtype=np.float64, count=len(counts)) * idf[query_cols]
+        query_norm = np.sqrt(query @ query)
+        if query_norm == 0:
+            return [0.0] * len(others)
+        dots = matrix @ (query / query_norm)
+        return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0).tolist()
+
+    def flush(self):
+        """Writes pending document-frequency deltas to SQLite in one transaction."""
+        with self._lock:
+            if not self._pending_docs:
+                return
+            pending_df = self._pending_df
+            pending_docs = self._pending_docs
+            self._pending_df = Counter()
+            self._pending_docs = []
+
+        conn = get_db_connection()
+        try:
+            with conn:
+                conn.executemany(f"""
+                INSERT INTO {TABLE_PREFIX}idf_terms (term, df) VALUES (?, ?)
+                ON CONFLICT(term) DO UPDATE SET df = df + excluded.df
+                """, pending_df.items())
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO {TABLE_PREFIX}idf_documents (doc_hash) VALUES (?)",
+                    [(h,) for h in pending_docs]
+                )
+        except Exception as e:
+            # Put the deltas back so the next flush retries them
+            print(f"Keyword model flush failed: {e}")
+            with self._lock:
+                self._pending_df.update(pending_df)
+                self._pending_docs.extend(pending_docs)
+        finally:
+            conn.close()
+
+    def compact(self, min_df=2):
+        """
+        Drops terms seen in fewer than `min_df` documents and vacuums the database.
+        Pruned terms are scored with the maximum IDF, as if never seen.
+        """
+        self.flush()
+        conn = get_db_connection()
+        try:
+            with conn:
+                removed = conn.execute(
+                    f"DELETE FROM {TABLE_PREFIX}idf_terms WHERE df < ?", (min_df,)
+                ).rowcount
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._df = Counter({t: df for t, df in self._df.items() if df >= min_df})
+        return removed
+
+
+def main(argv=None):
+    from database import setup_database
+
+    parser = argparse.ArgumentParser(description="Inspect or compact the corpus IDF model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Show corpus size and vocabulary size")
+    compact_parser = sub.add_parser("compact", help="Prune rare terms and vacuum")
+    compact_parser.add_argument("--min-df", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    setup_database()
+    model = KeywordModel()
+    model.load()
+
+    if args.command == "compact":
+        removed = model.compact(min_df=args.min_df)
+        print(f"Removed {removed} terms with df < {args.min_df}")
+    print(f"Documents: {model.n_docs}")
+    print(f"Vocabulary: {model.vocabulary_size} terms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,39 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Response, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
+import hmac
 import json
+import os
 
-from database import setup_database, register_user_db, authenticate_user_db
-from utils import extract_text_from_bytes, parse_resume, parse_jd, calculate_ats_score, generate_suggestions
+from database import (
+    setup_database, register_user_db, authenticate_user_db,
+    save_resume_db, get_resumes_db, save_jd_db, get_jd_db, get_results_db, get_result_components_db,
+    update_result_scores_db, iter_ranked_results_db,
+)
+from utils import extract_text_from_bytes, parse_resume, parse_jd, calculate_ats_score, generate_suggestions, get_nlp, DEFAULT_SCORING_PROFILE
+from coalesce import SingleFlight, content_key
+from keyword_model import KeywordModel
+from resume_index import ResumeIndex
+from results_writer import ResultWriter
+from analytics import AnalyticsStore
+from scoring_profiles import ProfileStore, validate_profile, rerank
+from records import MatchResult
+from dedupe import DuplicateIndex, StoredDuplicateIndex, fingerprint, to_signed
+import export
+import taxonomy
+from profiler import RequestProfiler, ProfilerMiddleware
+from admission import AdmissionMiddleware, default_limiters, fit_to_threadpool
+from warmup import Warmup, import_modules
 
 app = FastAPI()
 
+# Per-route concurrency and queue limits for the CPU-heavy endpoints; added before
+# CORS so 429/503 responses still carry the CORS headers
+admission_limiters = default_limiters()
+app.add_middleware(AdmissionMiddleware, limiters=admission_limiters)
+
 # CORS setup - allow all for development
 app.add_middleware(
     CORSMiddleware,
@@ -16,11 +41,76 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-JD-Id", "Retry-After"],
 )
 
+# On-demand profiling of live requests (see /admin/profile); a pass-through while idle
+request_profiler = RequestProfiler(app)
+app.add_middleware(ProfilerMiddleware, profiler=request_profiler)
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.environ.get("RESUME_ANALYZER_ADMIN_TOKEN")
+
 # Initialize DB
 setup_database()
 
+# Identical (resume, JD) analyses share one computation; repeats within the TTL are served from memory
+analysis_flight = SingleFlight(ttl=30.0, max_entries=256)
+
+# Corpus-wide IDF for keyword scoring, updated as resumes and JDs arrive
+keyword_model = KeywordModel()
+
+# Similarity index over stored resumes for /search-candidates
+resume_index = ResumeIndex(keyword_model)
+
+# Scoring results are buffered and written to the results table in the background
+result_writer = ResultWriter()
+
+# Per-JD dashboard aggregates, persisted alongside each result batch
+analytics_store = AnalyticsStore()
+result_writer.add_flush_hook(analytics_store.flush)
+
+# Fingerprints of stored resumes, to reuse work for resubmitted copies
+stored_duplicates = StoredDuplicateIndex()
+
+# Per-JD weights and experience curve used by calculate_ats_score and /rerank
+profile_store = ProfileStore()
+
+# Heavy models and libraries load in the background after startup; /ready reports progress.
+# The optional steps are only a head start: a worker without them is degraded but ready
+# (without the spaCy model, resumes are parsed without NER; see utils.get_ner).
+warmup = Warmup([
+    ("taxonomy", taxonomy.current),
+    ("spacy", lambda: get_nlp(download=False)),
+    ("keyword_analyzer", keyword_model.analyzer),
+    ("idf", keyword_model.load),
+    ("libraries", import_modules("scipy.sparse", "sklearn.metrics.pairwise", "pdfminer.high_level", "docx")),
+], optional=("spacy", "libraries"))
+
+MAX_COMPARE_JDS = 25
+EXPORT_FLUSH_TIMEOUT = 5.0  # seconds an export waits for queued results to reach the database
+
+DEFAULT_JD_TEXT = "Highly skilled software engineer with strong Python, Machine Learning, and SQL expertise. Needs 5+ years of experience."
+
+@app.on_event("startup")
+async def fit_admission_to_threadpool():
+    # Async so it runs on the event loop, where the thread limiter is read
+    fit_to_threadpool(admission_limiters)
+
+@app.on_event("startup")
+def start_result_writer():
+    result_writer.start()
+
+@app.on_event("startup")
+def start_warmup():
+    warmup.start()
+
+@app.on_event("shutdown")
+def flush_on_shutdown():
+    keyword_model.flush()
+    result_writer.stop()
+    analytics_store.flush()
+
 # Models
 class UserRegister(BaseModel):
     name: str
@@ -38,6 +128,18 @@ class AnalysisResult(BaseModel):
     suggestions: List[str]
     parsed_resume: dict
 
+class JobMatch(BaseModel):
+    jd_index: int
+    jd_name: str
+    jd_id: Optional[int] = None
+    ats_score: float
+    match_details: dict
+    suggestions: List[str]
+
+class JobComparison(BaseModel):
+    parsed_resume: dict
+    results: List[JobMatch]
+
 class CandidateResult(BaseModel):
     candidate_name: str
     ats_score: float
@@ -47,6 +149,84 @@ class CandidateResult(BaseModel):
     resume_quality: float
     matched_skills: str
     missing_skills: str
+    # Set when this upload is an exact or near copy of another candidate in the
+    # batch (their name) or of a stored resume (its filename); the score is reused
+    duplicate_of: Optional[str] = None
+
+class SearchResult(CandidateResult):
+    resume_id: int
+
+class StoredResult(BaseModel):
+    result_id: int
+    resume_id: Optional[int]
+    jd_id: Optional[int]
+    candidate_name: Optional[str]
+    ats_score: float
+    match_details: dict
+    suggestions: List[str]
+    created_at: Optional[str]
+
+class ResultsPage(BaseModel):
+    results: List[StoredResult]
+    next_before_id: Optional[int]
+
+class ScoringProfile(BaseModel):
+    weights: Optional[Dict[str, float]] = None
+    experience_curve: Optional[List[List[float]]] = None
+
+class ProfileRequest(BaseModel):
+    route: str
+    mode: str = "sample"
+    requests: Optional[int] = None
+    seconds: Optional[float] = None
+    interval_ms: float = 5.0
+
+class RerankedCandidate(BaseModel):
+    result_id: int
+    resume_id: Optional[int]
+    candidate_name: Optional[str]
+    ats_score: float
+    skill_match: float
+    keyword_density: float
+    experience_match: float
+    resume_quality: float
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (RESUME_ANALYZER_ADMIN_TOKEN is not set).")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+def store_resume(resume_text, parsed_resume, filename, resume_fingerprint=None):
+    """Saves a processed resume and adds it to the similarity and duplicate indexes. Failures are logged, not raised."""
+    try:
+        content_hash, simhash = resume_fingerprint or fingerprint(resume_text)
+        resume_id = save_resume_db(
+            resume_text, parsed_resume, filename, content_hash=content_hash, simhash=to_signed(simhash)
+        )
+        resume_index.add(resume_id, resume_text)
+        stored_duplicates.add(resume_id, content_hash, simhash)
+        return resume_id
+    except Exception as e:
+        print(f"Failed to store resume {filename}: {e}")
+        return None
+
+_jd_ids = {}
+
+def store_jd(jd_text, parsed_jd):
+    """Returns the jd_id for a JD, saving it on first sight. Known JDs are resolved from memory."""
+    key = content_key(jd_text)
+    jd_id = _jd_ids.get(key)
+    if jd_id is None:
+        try:
+            jd_id = save_jd_db(jd_text, parsed_jd)
+        except Exception as e:
+            print(f"Failed to store JD: {e}")
+            return None
+        if len(_jd_ids) >= 1024:
+            _jd_ids.clear()
+        _jd_ids[key] = jd_id
+    return jd_id
 
 # Routes
 
@@ -64,28 +244,21 @@ def login(user: UserLogin):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     return result
 
-@app.post("/analyze-resume", response_model=AnalysisResult)
-async def analyze_resume(
-    resume: UploadFile = File(...),
-    jd: Optional[UploadFile] = File(None),
-    jd_text_input: Optional[str] = Form(None)
-):
-    # Read Resume
-    resume_bytes = await resume.read()
-    resume_text = extract_text_from_bytes(resume_bytes, resume.content_type)
-    
+def run_analysis(resume_bytes, resume_content_type, jd_bytes, jd_content_type, jd_text_input, resume_filename=None):
+    """Extracts, parses and scores one resume/JD pair. Blocking; run off the event loop."""
+    resume_text = extract_text_from_bytes(resume_bytes, resume_content_type)
+
     if (not resume_text) or (not resume_text.strip()) or ("Error" in resume_text):
         raise HTTPException(status_code=400, detail=resume_text)
 
     # Read JD
     final_jd_text = ""
-    if jd:
-        jd_bytes = await jd.read()
-        final_jd_text = extract_text_from_bytes(jd_bytes, jd.content_type)
+    if jd_bytes is not None:
+        final_jd_text = extract_text_from_bytes(jd_bytes, jd_content_type)
     elif jd_text_input:
         final_jd_text = jd_text_input
     else:
-        final_jd_text = "Highly skilled software engineer with strong Python, Machine Learning, and SQL expertise. Needs 5+ years of experience."
+        final_jd_text = DEFAULT_JD_TEXT
 
     if (not final_jd_text) or (not final_jd_text.strip()) or ("Error" in final_jd_text):
         raise HTTPException(status_code=400, detail=final_jd_text)
@@ -93,11 +266,18 @@ async def analyze_resume(
     # Analyze
     parsed_resume = parse_resume(resume_text)
     parsed_jd = parse_jd(final_jd_text)
+    jd_id = store_jd(final_jd_text, parsed_jd)
     
     ats_score, match_details, required_skills = calculate_ats_score(
-        resume_text, final_jd_text, parsed_resume, parsed_jd
+        resume_text, final_jd_text, parsed_resume, parsed_jd,
+        keyword_model=keyword_model, profile=profile_store.get(jd_id)
     )
     suggestions = generate_suggestions(set(parsed_jd["required_skills"]), set(match_details["Matched Skills"]))
+    resume_id = store_resume(resume_text, parsed_resume, resume_filename)
+    result_writer.record(
+        resume_id, jd_id, resume_filename,
+        ats_score, match_details, suggestions
+    )
 
     return {
         "ats_score": ats_score,
@@ -106,13 +286,97 @@ async def analyze_resume(
         "parsed_resume": parsed_resume
     }
 
+@app.post("/analyze-resume", response_model=AnalysisResult)
+async def analyze_resume(
+    resume: UploadFile = File(...),
+    jd: Optional[UploadFile] = File(None),
+    jd_text_input: Optional[str] = Form(None)
+):
+    resume_bytes = await resume.read()
+    jd_bytes = await jd.read() if jd else None
+    jd_content_type = jd.content_type if jd else None
+
+    # The taxonomy version and profile revision are part of the key so a hot-reloaded taxonomy or a
+    # saved scoring profile never serves stale results (the JD's profile is only known once its text
+    # is extracted, so any profile save invalidates)
+    key = content_key(
+        taxonomy.current().version, str(profile_store.revision),
+        resume.content_type, resume_bytes,
+        jd_content_type, jd_bytes,
+        None if jd else (jd_text_input or DEFAULT_JD_TEXT),
+    )
+    return await analysis_flight.run(
+        key, run_analysis,
+        resume_bytes, resume.content_type, jd_bytes, jd_content_type, jd_text_input, resume.filename
+    )
+
+def jd_display_name(jd_text, index):
+    """First non-empty line of a pasted JD, for labelling comparisons."""
+    for line in jd_text.splitlines():
+        if line.strip():
+            return line.strip()[:80]
+    return f"JD {index + 1}"
+
+@app.post("/compare-jobs", response_model=JobComparison)
+def compare_jobs(
+    resume: UploadFile = File(...),
+    jds: Optional[List[UploadFile]] = File(None),
+    jd_texts: Optional[List[str]] = Form(None)
+):
+    """Scores one resume against several JDs: the resume is extracted and parsed once, keyword scores are batched."""
+    # Checked before any upload is read or extracted
+    if len(jds or []) + len(jd_texts or []) > MAX_COMPARE_JDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_JDS} JDs can be compared at once.")
+    jd_inputs = [(jd.filename or f"JD {i + 1}", extract_text_from_bytes(jd.file.read(), jd.content_type))
+                 for i, jd in enumerate(jds or [])]
+    offset = len(jd_inputs)
+    jd_inputs += [(jd_display_name(text, offset + i), text) for i, text in enumerate(jd_texts or []) if text.strip()]
+    if not jd_inputs:
+        raise HTTPException(status_code=400, detail="Provide at least one JD file or jd_texts entry.")
+    for name, jd_text in jd_inputs:
+        if (not jd_text) or (not jd_text.strip()) or ("Error" in jd_text):
+            raise HTTPException(status_code=400, detail=f"JD Error ({name}): {jd_text}")
+
+    resume_text = extract_text_from_bytes(resume.file.read(), resume.content_type)
+    if (not resume_text) or (not resume_text.strip()) or ("Error" in resume_text):
+        raise HTTPException(status_code=400, detail=resume_text)
+
+    parsed_resume = parse_resume(resume_text)
+    jd_text_list = [jd_text for _, jd_text in jd_inputs]
+    similarities = keyword_model.similarities(resume_text, jd_text_list)
+    resume_id = store_resume(resume_text, parsed_resume, resume.filename)
+
+    results = []
+    for index, ((name, jd_text), similarity) in enumerate(zip(jd_inputs, similarities)):
+        parsed_jd = parse_jd(jd_text)
+        jd_id = store_jd(jd_text, parsed_jd)
+        ats_score, match_details, required_skills = calculate_ats_score(
+            resume_text, jd_text, parsed_resume, parsed_jd,
+            profile=profile_store.get(jd_id), keyword_similarity=similarity
+        )
+        suggestions = generate_suggestions(set(parsed_jd["required_skills"]), set(match_details["Matched Skills"]))
+        result_writer.record(resume_id, jd_id, resume.filename, ats_score, match_details, suggestions)
+        results.append({
+            "jd_index": index,
+            "jd_name": name,
+            "jd_id": jd_id,
+            "ats_score": ats_score,
+            "match_details": match_details,
+            "suggestions": suggestions,
+        })
+
+    results.sort(key=lambda r: r["ats_score"], reverse=True)
+    return {"parsed_resume": parsed_resume, "results": results}
+
+# Sync (run on the thread pool) so parsing and scoring never block the event loop
 @app.post("/rank-candidates", response_model=List[CandidateResult])
-async def rank_candidates(
+def rank_candidates(
+    response: Response,
     jd: UploadFile = File(...),
     resumes: List[UploadFile] = File(...)
 ):
     # Read JD
-    jd_bytes = await jd.read()
+    jd_bytes = jd.file.read()
     jd_text = extract_text_from_bytes(jd_bytes, jd.content_type)
     
     if "Error" in jd_text:
@@ -120,39 +384,347 @@ async def rank_candidates(
         
     parsed_jd = parse_jd(jd_text)
     required_skills_set = set(parsed_jd["required_skills"])
+    jd_id = store_jd(jd_text, parsed_jd)
+    if jd_id is not None:
+        # Lets the dashboard fetch /analytics/{jd_id} instead of aggregating the full payload
+        response.headers["X-JD-Id"] = str(jd_id)
     
-    results = []
+    profile = profile_store.get(jd_id)
+    # Every upload is its own candidate with its own resume_id. Work is only reused for an
+    # exact copy (same cleaned text): within the batch the first copy's parse and score,
+    # otherwise a stored copy's row and parse. Near-duplicates are parsed, scored and
+    # stored like any other resume and only flagged with duplicate_of.
+    candidates = []
+    seen_files = {}
+    batch_duplicates = DuplicateIndex()
+    used_ids = set()
     
+    # Pass 1: extract, deduplicate and parse every upload
     for resume in resumes:
         try:
-            resume_bytes = await resume.read()
-            resume_text = extract_text_from_bytes(resume_bytes, resume.content_type)
-            
-            if "Error" in resume_text:
-                continue
+            resume_bytes = resume.file.read()
+            file_key = content_key(resume_bytes)
+            original = seen_files.get(file_key)
+            if original is not None:
+                # Byte-identical to an earlier upload; nothing to extract
+                resume_text = candidates[original]["text"]
+                resume_fingerprint = candidates[original]["fingerprint"]
+            else:
+                resume_text = extract_text_from_bytes(resume_bytes, resume.content_type)
                 
-            parsed_resume = parse_resume(resume_text)
+                if "Error" in resume_text:
+                    continue
+                
+                resume_fingerprint = fingerprint(resume_text)
+                original = batch_duplicates.find_exact(resume_fingerprint[0])
             
-            ats_score, match_details, required_skills = calculate_ats_score(
-                resume_text, jd_text, parsed_resume, parsed_jd
-            )
+            duplicate_of = None
+            if original is not None:
+                duplicate_of = candidates[original]["filename"]
+            else:
+                near = batch_duplicates.find(*resume_fingerprint)
+                if near is not None:
+                    duplicate_of = candidates[near[0]]["filename"]
             
-            missing_skills = required_skills_set.difference(set(match_details["Matched Skills"]))
+            # An exact copy of a stored resume is that resume (unless this batch already uses
+            # it): its row and parse are reused, so re-ranking a pool doesn't add rows. The
+            # same upload ranked again is preferred, and is only a duplicate of an older copy
+            resume_id = None
+            parsed_resume = None
+            stored_ids = stored_duplicates.find_all_exact(resume_fingerprint[0], exclude=used_ids)
+            if stored_ids:
+                stored_records = get_resumes_db(stored_ids)
+                same_upload = [i for i in stored_ids
+                               if stored_records.get(i) and stored_records[i]["filename"] == resume.filename]
+                stored_id = (same_upload or stored_ids)[0]
+                stored_record = stored_records.get(stored_id)
+                if stored_record and stored_record["parsed_resume"]:
+                    resume_id = stored_id
+                    used_ids.add(resume_id)
+                    parsed_resume = stored_record["parsed_resume"]
+                    oldest = min(stored_ids)
+                    if oldest != resume_id or stored_record["filename"] != resume.filename:
+                        oldest_record = stored_records.get(oldest)
+                        duplicate_of = duplicate_of or (oldest_record and oldest_record["filename"]) or f"Resume {oldest}"
+            if duplicate_of is None and resume_id is None:
+                near = stored_duplicates.find(*resume_fingerprint)
+                if near is not None:
+                    near_record = get_resumes_db([near[0]]).get(near[0])
+                    duplicate_of = (near_record and near_record["filename"]) or f"Resume {near[0]}"
+            
+            if original is not None:
+                parsed_resume = parsed_resume or candidates[original]["parsed_resume"]
+            elif parsed_resume is None:
+                parsed_resume = parse_resume(resume_text)
             
-            results.append({
-                "candidate_name": resume.filename,
-                "ats_score": ats_score,
-                "skill_match": match_details["Skill Match"],
-                "keyword_density": match_details["Keyword Density"],
-                "experience_match": match_details["Experience Match"],
-                "resume_quality": match_details["Resume Quality"],
-                "matched_skills": ", ".join(match_details["Matched Skills"]),
-                "missing_skills": ", ".join(missing_skills) or "None"
+            seen_files.setdefault(file_key, len(candidates))
+            batch_duplicates.add(len(candidates), *resume_fingerprint)
+            candidates.append({
+                "filename": resume.filename, "text": resume_text, "fingerprint": resume_fingerprint,
+                "parsed_resume": parsed_resume, "resume_id": resume_id, "original": original,
+                "duplicate_of": duplicate_of,
             })
         except Exception as e:
             print(f"Error processing {resume.filename}: {e}")
             continue
+    
+    # The JD and the whole batch are learned before anything is scored, so every candidate
+    # is scored under the same IDF and a score doesn't depend on upload order
+    unique = [c for c in candidates if c["original"] is None]
+    keyword_model.add_document(jd_text)
+    for candidate in unique:
+        keyword_model.add_document(candidate["text"])
+    similarities = keyword_model.similarities(jd_text, [c["text"] for c in unique], learn=False) if unique else []
+    for candidate, similarity in zip(unique, similarities):
+        candidate["similarity"] = similarity
+    
+    # Pass 2: score, store and record
+    results = []
+    for candidate in candidates:
+        try:
+            original = candidate["original"]
+            parsed_resume = candidate["parsed_resume"]
+            if original is not None:
+                ats_score, match_details = candidates[original]["ats_score"], candidates[original]["match_details"]
+            else:
+                ats_score, match_details, _ = calculate_ats_score(
+                    candidate["text"], jd_text, parsed_resume, parsed_jd,
+                    keyword_model=keyword_model, profile=profile, keyword_similarity=candidate["similarity"]
+                )
+            candidate["ats_score"], candidate["match_details"] = ats_score, match_details
+            
+            missing_skills = required_skills_set.difference(set(match_details["Matched Skills"]))
+            resume_id = candidate["resume_id"]
+            if resume_id is None:
+                resume_id = store_resume(candidate["text"], parsed_resume, candidate["filename"], candidate["fingerprint"])
+            result_writer.record(resume_id, jd_id, candidate["filename"], ats_score, match_details)
+            analytics_store.record(
+                jd_id, resume_id, ats_score, match_details["Matched Skills"], missing_skills,
+                parsed_resume.get("years_of_experience", 0)
+            )
+            
+            # Keep only the compact record per candidate; the response rows are built after sorting
+            record = MatchResult.from_score(ats_score, match_details, required_skills_set, candidate["filename"])
+            results.append((record, candidate["duplicate_of"]))
+        except Exception as e:
+            print(f"Error processing {candidate['filename']}: {e}")
+            continue
             
     # Sort by ATS Score
+    results.sort(key=lambda r: r[0].ats_score, reverse=True)
+    return [{**record.to_candidate_row(), "duplicate_of": duplicate_of} for record, duplicate_of in results]
+
+@app.post("/search-candidates", response_model=List[SearchResult])
+def search_candidates(
+    jd: Optional[UploadFile] = File(None),
+    jd_text_input: Optional[str] = Form(None),
+    top_k: int = Form(10)
+):
+    """
+    Finds the stored resumes most similar to a JD via the inverted index, then
+    re-scores the shortlist exactly. Search queries don't update the corpus IDF.
+    """
+    if jd:
+        jd_text = extract_text_from_bytes(jd.file.read(), jd.content_type)
+    elif jd_text_input:
+        jd_text = jd_text_input
+    else:
+        raise HTTPException(status_code=400, detail="Provide a JD file or jd_text_input.")
+
+    if (not jd_text) or (not jd_text.strip()) or ("Error" in jd_text):
+        raise HTTPException(status_code=400, detail=f"JD Error: {jd_text}")
+
+    top_k = max(1, min(top_k, 100))
+    parsed_jd = parse_jd(jd_text)
+    required_skills_set = set(parsed_jd["required_skills"])
+
+    # Shortlist a few times more than requested so exact re-scoring can reorder it
+    shortlist = resume_index.query(jd_text, shortlist_size=top_k * 5)
+    stored = get_resumes_db(shortlist)
+    candidates = [resume_id for resume_id in shortlist if stored.get(resume_id) and stored[resume_id]["text"]]
+    similarities = keyword_model.similarities(
+        jd_text, [stored[resume_id]["text"] for resume_id in candidates], learn=False
+    ) if candidates else []
+
+    results = []
+    for resume_id, keyword_similarity in zip(candidates, similarities):
+        record = stored[resume_id]
+        ats_score, match_details, required_skills = calculate_ats_score(
+            record["text"], jd_text, record["parsed_resume"], parsed_jd, keyword_similarity=keyword_similarity
+        )
+        missing_skills = required_skills_set.difference(set(match_details["Matched Skills"]))
+        results.append({
+            "resume_id": resume_id,
+            "candidate_name": record["filename"] or record["parsed_resume"].get("name", f"Resume {resume_id}"),
+            "ats_score": ats_score,
+            "skill_match": match_details["Skill Match"],
+            "keyword_density": match_details["Keyword Density"],
+            "experience_match": match_details["Experience Match"],
+            "resume_quality": match_details["Resume Quality"],
+            "matched_skills": ", ".join(match_details["Matched Skills"]),
+            "missing_skills": ", ".join(missing_skills) or "None"
+        })
+
     results.sort(key=lambda x: x['ats_score'], reverse=True)
-    return results
+    return results[:top_k]
+
+@app.get("/results", response_model=ResultsPage)
+def list_results(
+    jd_id: Optional[int] = None,
+    resume_id: Optional[int] = None,
+    limit: int = 50,
+    before_id: Optional[int] = None
+):
+    """Stored scoring results, newest first. Pass next_before_id back as before_id for the next page."""
+    limit = max(1, min(limit, 500))
+    results = get_results_db(jd_id=jd_id, resume_id=resume_id, limit=limit, before_id=before_id)
+    next_before_id = results[-1]["result_id"] if len(results) == limit else None
+    return {"results": results, "next_before_id": next_before_id}
+
+@app.get("/analytics/{jd_id}")
+def jd_analytics(jd_id: int):
+    """Score histogram, per-skill match/miss counts and experience distribution for a JD's candidate pool."""
+    summary = analytics_store.summary(jd_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No candidates have been ranked against this JD.")
+    return summary
+
+@app.get("/jobs/{jd_id}/scoring-profile")
+def get_scoring_profile(jd_id: int):
+    return profile_store.get(jd_id) or DEFAULT_SCORING_PROFILE
+
+@app.put("/jobs/{jd_id}/scoring-profile")
+def put_scoring_profile(jd_id: int, profile: ScoringProfile):
+    """Sets the JD's weights/experience curve. Weights are normalised to sum to 1."""
+    try:
+        return profile_store.save(jd_id, profile.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/jobs/{jd_id}/rerank", response_model=List[RerankedCandidate])
+def rerank_candidates(jd_id: int, profile: Optional[ScoringProfile] = None, save: bool = False, limit: Optional[int] = None):
+    """
+    Re-ranks a JD's stored candidate pool from persisted component scores, without
+    re-parsing. Uses the given profile (saved if save=true) or the JD's current one.
+    With save=true the re-weighted scores also replace the stored ones.
+    """
+    try:
+        if profile is not None and save:
+            active = profile_store.save(jd_id, profile.model_dump())
+        elif profile is not None:
+            active = validate_profile(profile.model_dump())
+        else:
+            active = profile_store.get(jd_id) or DEFAULT_SCORING_PROFILE
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if save:
+        # Queued results of this pool must reach the table before their scores are rewritten
+        result_writer.flush(timeout=EXPORT_FLUSH_TIMEOUT)
+    pool = get_result_components_db(jd_id)
+    if not pool["result_id"]:
+        raise HTTPException(status_code=404, detail="No stored results with component scores for this JD.")
+
+    scores, experience, order = rerank(pool, active)
+    if save:
+        # Keep /results and exports in line with the saved profile
+        update_result_scores_db(zip(pool["result_id"], scores.tolist()))
+    if limit:
+        order = order[:limit]
+    return [
+        {
+            "result_id": pool["result_id"][i],
+            "resume_id": pool["resume_id"][i],
+            "candidate_name": pool["candidate_name"][i],
+            "ats_score": float(scores[i]),
+            "skill_match": round(pool["skill"][i], 2),
+            "keyword_density": round(pool["keyword"][i], 2),
+            "experience_match": round(float(experience[i]), 2),
+            "resume_quality": round(pool["quality"][i], 2),
+        }
+        for i in order
+    ]
+
+@app.get("/jobs/{jd_id}/export")
+def export_results(jd_id: int, format: str = "csv", gzip: bool = False):
+    """Streams a JD's stored ranking (latest result per candidate, best first) as CSV or JSONL, optionally gzipped."""
+    if format not in export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(export.FORMATS)}")
+    jd = get_jd_db(jd_id)
+    if jd is None:
+        raise HTTPException(status_code=404, detail="Unknown JD")
+
+    media_type, extension = export.FORMATS[format]
+    filename = f"ranking_jd{jd_id}.{extension}"
+    if gzip:
+        media_type, filename = "application/gzip", filename + ".gz"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    # Results are written in the background; include everything ranked up to this request
+    if not result_writer.flush(timeout=EXPORT_FLUSH_TIMEOUT):
+        print(f"Export of JD {jd_id} started with {result_writer.pending} result(s) still unwritten")
+        headers["X-Results-Pending"] = str(result_writer.pending)
+    rows = export.export_rows(iter_ranked_results_db(jd_id), jd["parsed_jd"].get("required_skills", []))
+    return StreamingResponse(
+        export.encode(rows, format, compress=gzip),
+        media_type=media_type,
+        headers=headers,
+    )
+
+@app.get("/ready")
+def ready():
+    """
+    200 once the required models are loaded (optional ones may be degraded), 503 with
+    per-step progress while warming up or when a required step failed.
+    """
+    report = warmup.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+@app.get("/taxonomy")
+def taxonomy_info():
+    """Version and size of the active skill taxonomy."""
+    active = taxonomy.current()
+    return {"version": active.version, "skills": len(active.skills), "aliases": len(active.aliases)}
+
+@app.post("/admin/profile", dependencies=[Depends(require_admin)])
+def start_profile(request: ProfileRequest):
+    """Profiles the next `requests` requests to `route` and/or the next `seconds` seconds."""
+    try:
+        session = request_profiler.start(
+            request.route, request.mode, request.requests, request.seconds, request.interval_ms / 1000
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return session.status()
+
+@app.get("/admin/profile", dependencies=[Depends(require_admin)])
+def profile_status():
+    session = request_profiler.session or request_profiler.last_session
+    if session is None:
+        raise HTTPException(status_code=404, detail="No profiling session")
+    return session.status()
+
+@app.delete("/admin/profile", dependencies=[Depends(require_admin)])
+def stop_profile():
+    session = request_profiler.stop()
+    if session is None:
+        raise HTTPException(status_code=404, detail="No profiling session")
+    return session.status()
+
+@app.get("/admin/profile/result", dependencies=[Depends(require_admin)])
+def profile_result(format: str = "collapsed"):
+    """collapsed (flamegraph.pl / speedscope input) or text for sample sessions; pstats or text for cProfile."""
+    try:
+        content, media_type = request_profiler.result(format)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"Content-Disposition": 'attachment; filename="profile.pstats"'} if format == "pstats" else None
+    return Response(content=content, media_type=media_type, headers=headers)
+
+@app.get("/admin/admission", dependencies=[Depends(require_admin)])
+def admission_status():
+    """Current load, queue depth and rejection counts per limited route."""
+    return {path: limiter.status() for path, (limiter, _) in admission_limiters.items()}
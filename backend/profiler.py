@@ -0,0 +1,323 @@
+"""
+On-demand profiling of live requests to one route.
+
+An admin starts a session on a route for the next N requests and/or T seconds:
+
+  - mode "cprofile": the route's endpoint runs under the session's single
+    cProfile profiler, which accumulates the stats of every profiled request.
+    Only one request holds it at a time (Python 3.12+ allows a single active
+    profiler per process); overlapping requests, or any request whose profiler
+    fails to start, run unprofiled and are counted as skipped.
+  - mode "sample":   a background thread samples the stacks of all threads
+    every `interval` seconds while a profiled request is in flight, keeping
+    stacks that pass through backend code, as collapsed stacks for flamegraphs.
+
+Nothing is installed while no session is active: the middleware is a single
+attribute check and the endpoint wrapper only exists for the session's lifetime.
+cProfile only sees the thread it is enabled on: sync endpoints run whole on one
+worker thread, and async ones on the event loop, where the profile also picks
+up whatever other coroutines run while the endpoint awaits. Work an async
+endpoint hands to the thread pool (run_analysis behind /analyze-resume) is
+only visible to the sampler.
+"""
+import contextvars
+import cProfile
+import functools
+import inspect
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from starlette.routing import Match
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+MODES = ("cprofile", "sample")
+MAX_REQUESTS = 1000
+MAX_SECONDS = 600.0
+# Leaf frames of threads parked on a lock or selector (e.g. the result writer waiting for rows)
+IDLE_FRAMES = {"threading.py:wait", "selectors.py:select", "queue.py:get"}
+
+# Set by the middleware on requests admitted to the session; visible in the endpoint's worker thread
+_profiled = contextvars.ContextVar("profiled_request", default=None)
+
+
+class ProfileSession:
+    def __init__(self, route, mode, max_requests, seconds, interval):
+        self.route = route
+        self.mode = mode
+        self.max_requests = max_requests
+        self.seconds = seconds
+        self.interval = interval
+        self.started_at = time.time()
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.finished_at = None
+        self.admitted = 0
+        self.completed = 0
+        self.inflight = 0
+        self.profile = cProfile.Profile() if mode == "cprofile" else None
+        self.profiled = 0
+        self.samples = Counter()
+        self.sample_count = 0
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()  # held by the request running under the profiler
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def admit(self):
+        with self._lock:
+            if self.done.is_set() or self.expired():
+                return False
+            if self.max_requests and self.admitted >= self.max_requests:
+                return False
+            self.admitted += 1
+            self.inflight += 1
+            return True
+
+    def release(self):
+        """Returns True once the session's last request has completed."""
+        with self._lock:
+            self.inflight -= 1
+            self.completed += 1
+            return bool(self.max_requests) and self.completed >= self.max_requests
+
+    def enable_profile(self):
+        """Starts the profiler for the calling request. False if another request holds it or it fails to start."""
+        if not self._profile_lock.acquire(blocking=False):
+            return False
+        try:
+            self.profile.enable()
+        except Exception as e:
+            # e.g. "Another profiling tool is already active"; never fail the request over it
+            self._profile_lock.release()
+            print(f"Profiler could not start for {self.route.path}: {e}")
+            return False
+        return True
+
+    def disable_profile(self):
+        try:
+            self.profile.disable()
+            self.profiled += 1
+        finally:
+            self._profile_lock.release()
+
+    def stats(self):
+        """The accumulated pstats.Stats, or None if no request ran under the profiler."""
+        with self._profile_lock:
+            if not self.profiled:
+                return None
+            return pstats.Stats(self.profile)
+
+    def status(self):
+        return {
+            "route": self.route.path,
+            "mode": self.mode,
+            "active": not self.done.is_set(),
+            "max_requests": self.max_requests,
+            "seconds": self.seconds,
+            "requests_profiled": self.profiled if self.profile is not None else self.completed,
+            "requests_skipped": self.completed - self.profiled if self.profile is not None else 0,
+            "in_flight": self.inflight,
+            "samples": self.sample_count,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class RequestProfiler:
+    """Holds at most one profiling session; the last finished one is kept for its results."""
+
+    def __init__(self, app):
+        self.app = app
+        self.session = None       # the active session, checked by the middleware
+        self.last_session = None
+        self._lock = threading.Lock()
+        self._original_call = None
+
+    def _find_route(self, path):
+        for route in self.app.routes:
+            if getattr(route, "path", None) == path and hasattr(route, "dependant"):
+                return route
+        raise ValueError(f"No route with path {path!r}")
+
+    def start(self, route_path, mode="sample", max_requests=None, seconds=None, interval=0.005):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of: {', '.join(MODES)}")
+        if not max_requests and not seconds:
+            raise ValueError("Give a number of requests, a duration, or both.")
+        if max_requests is not None and not 0 < max_requests <= MAX_REQUESTS:
+            raise ValueError(f"requests must be between 1 and {MAX_REQUESTS}")
+        if seconds is not None and not 0 < seconds <= MAX_SECONDS:
+            raise ValueError(f"seconds must be between 0 and {MAX_SECONDS:g}")
+        if not 0.001 <= interval <= 1.0:
+            raise ValueError("interval must be between 1 ms and 1 s")
+        route = self._find_route(route_path)
+
+        with self._lock:
+            if self.session is not None:
+                raise RuntimeError(f"A profiling session is already running on {self.session.route.path}")
+            session = ProfileSession(route, mode, max_requests, seconds, interval)
+            if mode == "cprofile":
+                self._install_wrapper(session)
+            threading.Thread(target=self._watch, args=(session,), name="profiler", daemon=True).start()
+            self.session = session
+        print(f"Profiling {route_path} ({mode}, requests={max_requests}, seconds={seconds})")
+        return session
+
+    def stop(self):
+        """Ends the active session early. Returns the session whose results are now available."""
+        with self._lock:
+            session = self.session
+        if session is not None:
+            self._finish(session)
+        return self.last_session
+
+    def _finish(self, session):
+        with self._lock:
+            if session.done.is_set():
+                return
+            session.done.set()
+            session.finished_at = time.time()
+            if self._original_call is not None:
+                session.route.dependant.call = self._original_call
+                self._original_call = None
+            if self.session is session:
+                self.session = None
+            self.last_session = session
+        print(f"Profiling of {session.route.path} finished after {session.completed} request(s)")
+
+    def _install_wrapper(self, session):
+        original = session.route.dependant.call
+
+        def start_profile():
+            return _profiled.get() is session and session.enable_profile()
+
+        if inspect.iscoroutinefunction(original):
+            @functools.wraps(original)
+            async def profiled_call(*args, **kwargs):
+                profiling = start_profile()
+                try:
+                    return await original(*args, **kwargs)
+                finally:
+                    if profiling:
+                        session.disable_profile()
+        else:
+            @functools.wraps(original)
+            def profiled_call(*args, **kwargs):
+                profiling = start_profile()
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    if profiling:
+                        session.disable_profile()
+
+        self._original_call = original
+        session.route.dependant.call = profiled_call
+
+    def _watch(self, session):
+        """Ends the session at its deadline; in sample mode, also takes the samples."""
+        own_id = threading.get_ident()
+        while not session.done.wait(session.interval if session.mode == "sample" else 0.25):
+            if session.expired():
+                self._finish(session)
+                break
+            if session.mode == "sample" and session.inflight > 0:
+                self._sample(session, own_id)
+
+    def _sample(self, session, own_id):
+        session.sample_count += 1
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            leaf = _frame_name(frame)
+            if leaf in IDLE_FRAMES:
+                continue
+            # Keep the stack from the outermost backend frame down; idle workers and
+            # the event loop between requests have no backend frames at all
+            stack = []
+            outermost = None
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                if frame.f_code.co_filename.startswith(BACKEND_DIR) and frame.f_code.co_filename != __file__:
+                    outermost = len(stack)
+                frame = frame.f_back
+            if outermost is not None:
+                session.samples[";".join(reversed(stack[:outermost]))] += 1
+
+    def result(self, fmt="collapsed"):
+        """Returns (content, media_type) for the last finished session."""
+        session = self.last_session
+        if session is None:
+            raise LookupError("No finished profiling session")
+        if session.mode == "sample":
+            if fmt == "collapsed":
+                lines = (f"{stack} {count}" for stack, count in session.samples.most_common())
+                return "\n".join(lines) + "\n", "text/plain"
+            if fmt == "text":
+                return _sample_summary(session), "text/plain"
+            raise ValueError("Sample sessions support the 'collapsed' and 'text' formats")
+        session_stats = session.stats()
+        if session_stats is None:
+            raise LookupError("The session did not profile any request")
+        if fmt == "pstats":
+            # Same layout as Stats.dump_stats, loadable with pstats.Stats(path)
+            return marshal.dumps(session_stats.stats), "application/octet-stream"
+        if fmt == "text":
+            out = io.StringIO()
+            stats = pstats.Stats(stream=out)
+            stats.add(session_stats)
+            stats.sort_stats("cumulative").print_stats(50)
+            return out.getvalue(), "text/plain"
+        raise ValueError("cProfile sessions support the 'pstats' and 'text' formats")
+
+
+def _frame_name(frame):
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+
+def _sample_summary(session):
+    """Top functions by inclusive and self samples."""
+    inclusive = Counter()
+    own = Counter()
+    total = sum(session.samples.values())
+    for stack, count in session.samples.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for name in set(frames):
+            inclusive[name] += count
+    lines = [f"{session.route.path}: {session.completed} request(s), {total} stack samples every {session.interval * 1000:g} ms", ""]
+    lines.append(f"{'inclusive':>9} {'self':>7}  function")
+    for name, count in inclusive.most_common(40):
+        lines.append(f"{count / total:9.1%} {own[name] / total:7.1%}  {name}" if total else name)
+    return "\n".join(lines) + "\n"
+
+
+class ProfilerMiddleware:
+    """ASGI middleware admitting requests to the active session; a pass-through when none is running."""
+
+    def __init__(self, app, profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        session = self.profiler.session
+        if session is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        match, _ = session.route.matches(scope)
+        if match != Match.FULL or not session.admit():
+            await self.app(scope, receive, send)
+            return
+        token = _profiled.set(session)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _profiled.reset(token)
+            if session.release():
+                self.profiler._finish(session)
@@ -0,0 +1,267 @@
+"""
+Compact typed match results.
+
+calculate_ats_score returns free-form dicts; MatchResult holds the same data
+with skills as interned integer ids, and encode()/decode() give a small
+versioned binary form for passing results between processes (see
+batch_rank.py). Every encoded record carries the taxonomy version its skill
+ids refer to; decode() rejects records from another version.
+to_match_details()/to_candidate_row() convert back to the dict shapes the API returns.
+"""
+import struct
+import threading
+from dataclasses import dataclass, field
+from typing import Tuple
+
+import taxonomy
+
+CODEC_VERSION = 2
+TAG_MATCH_RESULT = 3
+
+# In memory, skills are process-wide interned ids that never change meaning.
+# Encoded records use the active taxonomy's skill-id table instead, resolved
+# at encode/decode time so a hot reload is picked up; skills outside it are
+# written out by name.
+_skill_names = []
+_skill_ids = {}
+_UNKNOWN_SKILL = 0xFFFF
+_intern_lock = threading.Lock()
+# (taxonomy version, {skill name: taxonomy skill id}) for the last taxonomy encoded against
+_canonical = (None, {})
+
+
+def _canonical_ids(compiled):
+    global _canonical
+    version, ids = _canonical
+    if version != compiled.version:
+        ids = {name: i for i, name in enumerate(compiled.skill_ids)}
+        _canonical = (compiled.version, ids)
+    return ids
+
+
+def skill_id(name):
+    """Interns a skill name, returning its integer id."""
+    sid = _skill_ids.get(name)
+    if sid is None:
+        with _intern_lock:
+            sid = _skill_ids.get(name)
+            if sid is None:
+                sid = len(_skill_names)
+                _skill_names.append(name)
+                _skill_ids[name] = sid
+    return sid
+
+
+def skill_name(sid):
+    return _skill_names[sid]
+
+
+def skill_ids(names):
+    return tuple(skill_id(n) for n in names)
+
+
+def skill_names(ids):
+    return [_skill_names[i] for i in ids]
+
+
+@dataclass(slots=True)
+class MatchResult:
+    ats_score: float
+    skill_match: float
+    keyword_density: float
+    experience_match: float
+    resume_quality: float
+    matched_skills: Tuple[int, ...] = ()
+    missing_skills: Tuple[int, ...] = ()
+    total_required: int = 0
+    resume_years: float = 0.0
+    required_years: float = 0.0
+    # Unrounded component scores (see utils.combine_components)
+    raw_skill: float = 0.0
+    raw_keyword: float = 0.0
+    raw_quality: float = 0.0
+    candidate_name: str = field(default="")
+
+    @classmethod
+    def from_score(cls, ats_score, match_details, required_skills, candidate_name=""):
+        """Builds a record from calculate_ats_score's return values."""
+        matched = match_details["Matched Skills"]
+        components = match_details.get("Components") or {}
+        missing = set(required_skills).difference(matched)
+        return cls(
+            ats_score=ats_score,
+            skill_match=match_details["Skill Match"],
+            keyword_density=match_details["Keyword Density"],
+            experience_match=match_details["Experience Match"],
+            resume_quality=match_details["Resume Quality"],
+            matched_skills=skill_ids(matched),
+            missing_skills=skill_ids(sorted(missing)),
+            total_required=match_details["Total Required Skills"],
+            resume_years=float(components.get("resume_years", 0.0)),
+            required_years=float(components.get("required_years", 0.0)),
+            raw_skill=float(components.get("skill", match_details["Skill Match"])),
+            raw_keyword=float(components.get("keyword", match_details["Keyword Density"])),
+            raw_quality=float(components.get("quality", match_details["Resume Quality"])),
+            candidate_name=candidate_name,
+        )
+
+    def to_match_details(self):
+        matched = skill_names(self.matched_skills)
+        return {
+            "Skill Match": self.skill_match,
+            "Keyword Density": self.keyword_density,
+            "Experience Match": self.experience_match,
+            "Resume Quality": self.resume_quality,
+            "Matched Skills": matched,
+            "Total Matched Skills": len(matched),
+            "Total Required Skills": self.total_required,
+            "Resume Experience": f"{self.resume_years} years",
+            "Required Experience": f"{int(self.required_years)}+ years",
+            "Components": {
+                "skill": self.raw_skill, "keyword": self.raw_keyword, "quality": self.raw_quality,
+                "resume_years": self.resume_years, "required_years": self.required_years,
+            },
+        }
+
+    def to_candidate_row(self):
+        """The CandidateResult shape returned by /rank-candidates."""
+        return {
+            "candidate_name": self.candidate_name,
+            "ats_score": self.ats_score,
+            "skill_match": self.skill_match,
+            "keyword_density": self.keyword_density,
+            "experience_match": self.experience_match,
+            "resume_quality": self.resume_quality,
+            "matched_skills": ", ".join(skill_names(self.matched_skills)),
+            "missing_skills": ", ".join(skill_names(self.missing_skills)) or "None",
+        }
+
+
+# ---------------------------------------------------------------------------
+# Binary codec
+# ---------------------------------------------------------------------------
+
+_HEADER = struct.Struct("<BB")
+_F64 = struct.Struct("<d")
+_U16 = struct.Struct("<H")
+
+
+class _Writer:
+    __slots__ = ("buf", "taxonomy")
+
+    def __init__(self, compiled=None):
+        self.buf = bytearray()
+        self.taxonomy = compiled
+
+    def varint(self, n):
+        while n >= 0x80:
+            self.buf.append((n & 0x7F) | 0x80)
+            n >>= 7
+        self.buf.append(n)
+
+    def str(self, s):
+        data = s.encode("utf-8")
+        self.varint(len(data))
+        self.buf += data
+
+    def f64(self, x):
+        self.buf += _F64.pack(x)
+
+    def header(self, tag):
+        self.buf += _HEADER.pack(CODEC_VERSION, tag)
+        self.str(self.taxonomy.version)
+
+    def skills(self, ids):
+        canonical = _canonical_ids(self.taxonomy)
+        self.varint(len(ids))
+        for sid in ids:
+            name = _skill_names[sid]
+            cid = canonical.get(name)
+            if cid is not None and cid < _UNKNOWN_SKILL:
+                self.buf += _U16.pack(cid)
+            else:
+                self.buf += _U16.pack(_UNKNOWN_SKILL)
+                self.str(name)
+
+
+class _Reader:
+    __slots__ = ("data", "pos", "taxonomy")
+
+    def __init__(self, data, pos=0, compiled=None):
+        self.data = data
+        self.pos = pos
+        self.taxonomy = compiled
+
+    def varint(self):
+        shift = result = 0
+        while True:
+            b = self.data[self.pos]
+            self.pos += 1
+            result |= (b & 0x7F) << shift
+            if b < 0x80:
+                return result
+            shift += 7
+
+    def str(self):
+        n = self.varint()
+        s = bytes(self.data[self.pos:self.pos + n]).decode("utf-8")
+        self.pos += n
+        return s
+
+    def f64(self):
+        (x,) = _F64.unpack_from(self.data, self.pos)
+        self.pos += 8
+        return x
+
+    def skills(self):
+        ids = []
+        for _ in range(self.varint()):
+            (sid,) = _U16.unpack_from(self.data, self.pos)
+            self.pos += 2
+            ids.append(skill_id(self.str() if sid == _UNKNOWN_SKILL else self.taxonomy.skill_ids[sid]))
+        return tuple(ids)
+
+
+def encode(record):
+    """Serializes a MatchResult to bytes."""
+    w = _Writer(taxonomy.current())
+    if isinstance(record, MatchResult):
+        w.header(TAG_MATCH_RESULT)
+        for x in (record.ats_score, record.skill_match, record.keyword_density, record.experience_match,
+                  record.resume_quality, record.resume_years, record.required_years,
+                  record.raw_skill, record.raw_keyword, record.raw_quality):
+            w.f64(x)
+        w.skills(record.matched_skills)
+        w.skills(record.missing_skills)
+        w.varint(record.total_required)
+        w.str(record.candidate_name)
+    else:
+        raise TypeError(f"Cannot encode {type(record).__name__}")
+    return bytes(w.buf)
+
+
+def decode(data):
+    """Inverse of encode()."""
+    version, tag = _HEADER.unpack_from(data, 0)
+    if version != CODEC_VERSION:
+        raise ValueError(f"Unsupported record codec version {version}")
+    compiled = taxonomy.current()
+    r = _Reader(memoryview(data), _HEADER.size, compiled)
+    taxonomy_version = r.str()
+    if taxonomy_version != compiled.version:
+        # Taxonomy skill ids are only meaningful within one taxonomy version
+        raise ValueError(
+            f"Record was encoded with taxonomy {taxonomy_version}, this process has {compiled.version}"
+        )
+    if tag == TAG_MATCH_RESULT:
+        (ats_score, skill_match, keyword_density, experience_match, resume_quality,
+         resume_years, required_years, raw_skill, raw_keyword, raw_quality) = (r.f64() for _ in range(10))
+        return MatchResult(
+            ats_score=ats_score, skill_match=skill_match, keyword_density=keyword_density,
+            experience_match=experience_match, resume_quality=resume_quality,
+            resume_years=resume_years, required_years=required_years,
+            raw_skill=raw_skill, raw_keyword=raw_keyword, raw_quality=raw_quality,
+            matched_skills=r.skills(), missing_skills=r.skills(),
+            total_required=r.varint(), candidate_name=r.str(),
+        )
+    raise ValueError(f"Unknown record tag {tag}")
@@ -0,0 +1,174 @@
+"""
+Frozen reference implementations of the scoring primitives.
+
+These are the original, straightforward versions of extract_skills,
+normalize_skill, extract_years_of_experience and calculate_ats_score (regex
+scan per skill, linear synonym lookup, a TfidfVectorizer fitted on just the
+resume and JD). The live versions in utils.py / taxonomy.py / keyword_model.py
+are optimized; test_differential.py checks that they still agree with these.
+
+Do not optimize or "fix" anything here: a behaviour change belongs in utils.py,
+together with a deliberate update of this file and a note in the commit.
+The taxonomy data (skills and synonyms) is taken from taxonomy.current() unless
+given, so only the algorithms are frozen, not the skill list.
+"""
+import re
+from datetime import datetime
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+import taxonomy
+
+
+def _taxonomy_data(skill_db, synonyms):
+    if skill_db is None or synonyms is None:
+        current = taxonomy.current()
+        skill_db = current.skills if skill_db is None else skill_db
+        synonyms = current.synonyms if synonyms is None else synonyms
+    return skill_db, synonyms
+
+
+def clean_text(text):
+    text = text.lower()
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^a-z0-9\+\#\.\s]', '', text)
+    return text
+
+
+def normalize_skill(skill, synonyms=None):
+    _, synonyms = _taxonomy_data(None, synonyms)
+    skill_lower = skill.lower().strip()
+    for canonical, aliases in synonyms.items():
+        if skill_lower in aliases:
+            return canonical
+    return skill_lower
+
+
+def extract_skills(text, skill_db=None, synonyms=None):
+    skill_db, synonyms = _taxonomy_data(skill_db, synonyms)
+    cleaned_text = clean_text(text)
+    found_skills = set()
+
+    for skill in skill_db:
+        skill_escaped = re.escape(skill)
+        if re.search(r'(?:^|\s)' + skill_escaped + r'(?:$|\s|,|\.)', cleaned_text):
+            found_skills.add(normalize_skill(skill, synonyms))
+
+    skill_context_pattern = r'(?:experience with|proficient in|skilled in|knowledge of|expertise in|familiar with|working with|using)\s+([a-z0-9\+\#\.]+(?:\s+[a-z0-9\+\#\.]+)?)'
+    for match in re.findall(skill_context_pattern, cleaned_text):
+        match_clean = match.strip()
+        if match_clean in skill_db:
+            found_skills.add(normalize_skill(match_clean, synonyms))
+
+    return list(found_skills)
+
+
+def extract_years_of_experience(text):
+    date_pattern = r'(?:(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s*(\d{4})|(\d{1,2})[/-](\d{4}))\s*(?:-|to|–|—)\s*(?:(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s*(\d{4})|(\d{1,2})[/-](\d{4})|(present|current|now|ongoing))'
+
+    experiences = []
+    for match in re.findall(date_pattern, text.lower()):
+        try:
+            start_date = None
+            end_date = datetime.now()
+            if match[0] and match[1]:
+                start_date = datetime.strptime(f"{match[0][:3]} {match[1]}", "%b %Y")
+            elif match[2] and match[3]:
+                start_date = datetime.strptime(f"{match[2]}/{match[3]}", "%m/%Y")
+
+            if match[8] in ['present', 'current', 'now', 'ongoing']:
+                end_date = datetime.now()
+            elif match[4] and match[5]:
+                end_date = datetime.strptime(f"{match[4][:3]} {match[5]}", "%b %Y")
+            elif match[6] and match[7]:
+                end_date = datetime.strptime(f"{match[6]}/{match[7]}", "%m/%Y")
+
+            if start_date and end_date and end_date >= start_date:
+                months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
+                if months > 0:
+                    experiences.append(months)
+        except Exception:
+            continue
+
+    total_months = sum(experiences)
+    exp_mentions = re.findall(r'(\d+)\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience|exp)', text.lower())
+    if exp_mentions:
+        return round(max(max(int(y) for y in exp_mentions), total_months / 12), 1)
+    return round(total_months / 12, 1)
+
+
+def tfidf_similarity(resume_text, jd_text, max_features=500):
+    """Cosine similarity from a TfidfVectorizer fitted on the two documents alone."""
+    vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 3), min_df=1, max_features=max_features)
+    tfidf_matrix = vectorizer.fit_transform([clean_text(resume_text), clean_text(jd_text)])
+    return cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+
+
+def calculate_ats_score(resume_text, jd_text, parsed_resume, parsed_jd, skill_db=None, synonyms=None):
+    """The original fixed-weight scorer. Returns (score, match_details, required_skills) like utils."""
+    skill_db, synonyms = _taxonomy_data(skill_db, synonyms)
+    resume_skills = set(parsed_resume.get("skills", []))
+    required = {normalize_skill(s, synonyms) for s in parsed_jd.get("required_skills", [])}
+    resume_normalized = {normalize_skill(s, synonyms) for s in resume_skills}
+
+    if not required:
+        skill_match_percent = 100.0
+        matched = resume_normalized
+    else:
+        matched = resume_normalized & required
+        relevant_extra = len([s for s in resume_normalized - required if s in skill_db])
+        bonus = min(relevant_extra * 0.02, 0.10)
+        skill_match_percent = min((len(matched) / len(required) + bonus) * 100, 100.0)
+
+    try:
+        keyword_density_score = tfidf_similarity(resume_text, jd_text) * 100
+        resume_word_count = len(resume_text.split())
+        if resume_word_count < 100:
+            keyword_density_score *= 0.7
+        elif resume_word_count < 200:
+            keyword_density_score *= 0.85
+    except Exception:
+        keyword_density_score = 0.0
+
+    resume_exp = parsed_resume.get("years_of_experience", 0)
+    required_exp = parsed_jd.get("min_years_required", 0)
+    if required_exp == 0:
+        experience_match_percent = 100.0
+    else:
+        exp_ratio = resume_exp / required_exp
+        if exp_ratio >= 1.0:
+            experience_match_percent = 100.0
+        elif exp_ratio >= 0.75:
+            experience_match_percent = 85.0 + (exp_ratio - 0.75) * 60
+        elif exp_ratio >= 0.5:
+            experience_match_percent = 60.0 + (exp_ratio - 0.5) * 100
+        else:
+            experience_match_percent = exp_ratio * 120
+        experience_match_percent = min(experience_match_percent, 100.0)
+
+    quality_score = 0.0
+    if parsed_resume.get("email") and parsed_resume["email"] != "N/A":
+        quality_score += 20
+    if parsed_resume.get("phone") and parsed_resume["phone"] != "N/A":
+        quality_score += 20
+    if parsed_resume.get("education"):
+        quality_score += 20
+    if len(resume_skills) >= 3:
+        quality_score += 20
+    if resume_exp > 0:
+        quality_score += 20
+
+    overall_ats_score = round(
+        skill_match_percent * 0.40 + keyword_density_score * 0.35
+        + experience_match_percent * 0.15 + quality_score * 0.10,
+        2
+    )
+    match_details = {
+        "Skill Match": round(skill_match_percent, 2),
+        "Keyword Density": round(keyword_density_score, 2),
+        "Experience Match": round(experience_match_percent, 2),
+        "Resume Quality": round(quality_score, 2),
+        "Matched Skills": list(matched),
+    }
+    return max(0, min(overall_ats_score, 100)), match_details, list(required)
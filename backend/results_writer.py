@@ -0,0 +1,201 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from database import save_results_db, DB_PATH
+
+# Rows that could not be written (bad data, schema mismatch), one JSON object per line
+DEAD_LETTER_PATH = os.path.splitext(DB_PATH)[0] + ".deadletter.jsonl"
+MAX_BACKOFF_SECONDS = 5.0
+
+
+def _is_transient(error):
+    """Lock contention is worth retrying; any other error will fail the same way again."""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ("locked" in message or "busy" in message)
+
+
+class ResultWriter:
+    """
+    Buffers scoring results in memory and writes them to the results table
+    from a background thread, so endpoints never wait on SQLite.
+
+    A batch is flushed when it reaches `batch_size` rows or `flush_interval`
+    seconds after its first row, using one executemany per transaction. The
+    buffer is bounded: when the database falls behind and the buffer fills,
+    producers wait up to `enqueue_timeout` seconds and the row is then dropped
+    (and counted) rather than stalling requests indefinitely.
+
+    A write hitting a locked database (e.g. during a vacuum) holds its rows and
+    retries with capped backoff until the lock clears; new results queue up
+    behind it. Only during shutdown does a lock give up, after `max_retries`
+    attempts. Any other error is permanent for that batch: its rows are retried
+    one by one and those that fail for a non-transient reason are appended to
+    `dead_letter_path`, so one bad row never blocks the rows behind it.
+
+    Readers that need everything recorded so far in the table (e.g. exports)
+    call flush() first.
+    """
+
+    def __init__(self, batch_size=200, flush_interval=1.0, max_buffer=10000, enqueue_timeout=0.05,
+                 max_retries=5, dead_letter_path=DEAD_LETTER_PATH):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+        self.dead_letter_path = dead_letter_path
+        self._queue = queue.Queue(maxsize=max_buffer)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._flush_hooks = []
+        self.stats = {"written": 0, "dropped": 0, "batches": 0, "failed_attempts": 0, "dead_lettered": 0}
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=10.0):
+        """Flushes everything buffered and stops the background thread."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def add_flush_hook(self, hook):
+        """Registers a callable run on the writer thread after each batch is written."""
+        self._flush_hooks.append(hook)
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self, timeout=10.0):
+        """
+        Blocks until every result queued before the call is written (or dead-lettered)
+        and the flush hooks have run. Returns False if that took longer than `timeout`.
+        """
+        if self._thread is None:
+            self.start()
+        # Ends the batch being collected; set by the writer thread once the rows ahead of it are written
+        marker = threading.Event()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.wait(timeout)
+
+    def record(self, resume_id, jd_id, candidate_name, ats_score, match_details, suggestions=None):
+        """Queues one result for writing. Returns False if it had to be dropped."""
+        if self._thread is None:
+            self.start()
+        components = match_details.get("Components") or {}
+        row = (
+            resume_id, jd_id, candidate_name, ats_score,
+            json.dumps(match_details), json.dumps(suggestions or []),
+            datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            components.get("skill"), components.get("keyword"), components.get("quality"),
+            components.get("resume_years"), components.get("required_years"),
+        )
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+            return True
+        except queue.Full:
+            self.stats["dropped"] += 1
+            print(f"Result buffer full; dropped result for {candidate_name}")
+            return False
+
+    def _next_batch(self):
+        """
+        Blocks for the first row, then collects more until the batch is full or the interval
+        expires. Returns (rows, flush markers); a flush marker ends the batch early.
+        """
+        try:
+            item = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return [], []
+        if isinstance(item, threading.Event):
+            return [], [item]
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stopping.is_set():
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                return batch, [item]
+            batch.append(item)
+        return batch, []
+
+    def _save(self, rows):
+        """save_results_db, retried with backoff while the database is locked. Raises any other error."""
+        backoff = 0.1
+        attempt = 0
+        while True:
+            try:
+                save_results_db(rows)
+                return
+            except Exception as e:
+                self.stats["failed_attempts"] += 1
+                attempt += 1
+                if not _is_transient(e) or (self._stopping.is_set() and attempt > self.max_retries):
+                    raise
+                print(f"Result flush hit a locked database ({len(rows)} rows); retrying in {backoff:.1f}s")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+
+    def _write(self, batch):
+        try:
+            self._save(batch)
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+        except Exception as e:
+            print(f"Result flush failed ({len(batch)} rows): {e}")
+            if _is_transient(e):
+                # Shutting down with the database still locked; keep the rows for replay
+                for row in batch:
+                    self._dead_letter(row, e)
+            else:
+                self._write_rows(batch)
+
+    def _write_rows(self, batch):
+        """Writes a failed batch row by row, dead-lettering the rows that still fail."""
+        for row in batch:
+            try:
+                self._save([row])
+                self.stats["written"] += 1
+            except Exception as e:
+                self._dead_letter(row, e)
+
+    def _dead_letter(self, row, error):
+        self.stats["dead_lettered"] += 1
+        print(f"Dead-lettered result for {row[2]}: {error}")
+        entry = {"error": str(error), "failed_at": datetime.now(timezone.utc).isoformat(), "row": list(row)}
+        try:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+        except OSError as e:
+            print(f"Could not write dead letter to {self.dead_letter_path}: {e}")
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch, markers = self._next_batch()
+            if batch:
+                self._write(batch)
+                for hook in self._flush_hooks:
+                    try:
+                        hook()
+                    except Exception as e:
+                        print(f"Result writer flush hook failed: {e}")
+            for marker in markers:
+                marker.set()
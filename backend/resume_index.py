@@ -0,0 +1,188 @@
+"""
+Approximate nearest-neighbour index over stored resumes.
+
+Each resume is reduced to a sketch of its TF-IDF vector (same representation
+as the keyword score): the SKETCH_TERMS heaviest terms, with terms hashed to
+32-bit ids. Sketches go into an impact-ordered inverted index. A query walks
+at most MAX_POSTINGS_PER_TERM of the heaviest postings for each of its terms
+and accumulates dot products, so cost is bounded by the query size rather than
+the number of stored resumes. The resulting shortlist is re-scored exactly.
+
+Resume/JD keyword similarities are typically small (0.05-0.3), which is why
+this uses an inverted index rather than random-projection LSH: signatures
+can't separate neighbours at that range without scanning most buckets.
+
+The index is an append-only file next to the database; a file in another
+format is replaced by a rebuild from the database on load, or by hand with:
+    python resume_index.py rebuild
+"""
+import argparse
+import hashlib
+import os
+import struct
+import threading
+from collections import defaultdict
+
+from database import DB_PATH, iter_resume_texts_db
+
+SKETCH_TERMS = 64
+MAX_POSTINGS_PER_TERM = 1000
+INDEX_MAGIC = b"RIDX1"
+HEADER = struct.Struct("<qH")   # resume_id, number of terms
+POSTING = struct.Struct("<If")  # term hash, weight
+INDEX_PATH = os.path.splitext(DB_PATH)[0] + ".idx"
+
+
+def term_hash(term):
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def sketch(vector, size=SKETCH_TERMS):
+    """Keeps the `size` heaviest terms of a {term: weight} vector, keyed by term hash."""
+    top = sorted(vector.items(), key=lambda kv: kv[1], reverse=True)[:size]
+    return {term_hash(term): weight for term, weight in top}
+
+
+class ResumeIndex:
+    """Impact-ordered inverted index over hashed TF-IDF sketches, persisted to an append-only file."""
+
+    def __init__(self, keyword_model, path=INDEX_PATH):
+        self.keyword_model = keyword_model
+        self.path = path
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        # term hash -> sorted list of (-weight, resume_id), heaviest first
+        self._postings = defaultdict(list)
+        self._indexed = set()
+        self._loaded = False
+
+    def __len__(self):
+        return len(self._indexed)
+
+    def load(self):
+        """Reads the index file, if present. Called lazily on first use."""
+        with self._load_lock:
+            if self._loaded:
+                return
+            if not self._read_file():
+                # Never append to a file in another format; start over from the stored resumes
+                print(f"Warning: {self.path} is not a compatible resume index; rebuilding it.")
+                self.rebuild(iter_resume_texts_db())
+            self._loaded = True
+
+    def _read_file(self):
+        """Loads the postings in the index file. Returns False if the file has another format."""
+        if not os.path.exists(self.path):
+            return True
+        with open(self.path, "rb") as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                return False
+            data = f.read()
+
+        records = []
+        offset = 0
+        while offset + HEADER.size <= len(data):
+            resume_id, n_terms = HEADER.unpack_from(data, offset)
+            end = offset + HEADER.size + n_terms * POSTING.size
+            if end > len(data):
+                # Trailing partial record from an interrupted write
+                break
+            records.append((resume_id, dict(POSTING.iter_unpack(data[offset + HEADER.size:end]))))
+            offset = end
+        with self._lock:
+            self._insert_many(records)
+        return True
+
+    def _insert_many(self, records):
+        """Appends every posting, then sorts each list it touched once (heaviest first)."""
+        touched = set()
+        for resume_id, terms in records:
+            self._indexed.add(resume_id)
+            for h, weight in terms.items():
+                self._postings[h].append((-weight, resume_id))
+                touched.add(h)
+        for h in touched:
+            self._postings[h].sort()
+
+    @staticmethod
+    def _encode(resume_id, terms):
+        return HEADER.pack(resume_id, len(terms)) + b"".join(POSTING.pack(h, w) for h, w in terms.items())
+
+    def _sketch_text(self, text):
+        return sketch(self.keyword_model.transform(self.keyword_model.analyze(text)))
+
+    def add(self, resume_id, text):
+        """Indexes a stored resume and appends it to the index file."""
+        if not self._loaded:
+            self.load()
+        terms = self._sketch_text(text)
+        with self._lock:
+            if resume_id in self._indexed:
+                return
+            self._insert_many([(resume_id, terms)])
+            new_file = not os.path.exists(self.path)
+            with open(self.path, "ab") as f:
+                if new_file:
+                    f.write(INDEX_MAGIC)
+                f.write(self._encode(resume_id, terms))
+
+    def query(self, text, shortlist_size=50):
+        """Returns up to `shortlist_size` resume ids most likely similar to `text`, nearest first."""
+        if not self._loaded:
+            self.load()
+        vector = self.keyword_model.transform(self.keyword_model.analyze(text))
+        query_terms = [(term_hash(term), weight) for term, weight in vector.items()]
+
+        scores = defaultdict(float)
+        with self._lock:
+            for h, q_weight in query_terms:
+                postings = self._postings.get(h)
+                if not postings:
+                    continue
+                for neg_weight, resume_id in postings[:MAX_POSTINGS_PER_TERM]:
+                    scores[resume_id] -= q_weight * neg_weight
+
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        return [resume_id for resume_id, _ in ranked[:shortlist_size]]
+
+    def rebuild(self, resumes):
+        """Rebuilds the index from (resume_id, text) pairs, replacing the file atomically."""
+        self.keyword_model.load()
+        tmp_path = self.path + ".tmp"
+        sketches = {}
+        with open(tmp_path, "wb") as f:
+            f.write(INDEX_MAGIC)
+            for resume_id, text in resumes:
+                terms = self._sketch_text(text or "")
+                sketches[resume_id] = terms
+                f.write(self._encode(resume_id, terms))
+        os.replace(tmp_path, self.path)
+
+        with self._lock:
+            self._postings = defaultdict(list)
+            self._indexed = set()
+            self._insert_many(sketches.items())
+            self._loaded = True
+
+
+def main(argv=None):
+    from database import setup_database
+    from keyword_model import KeywordModel
+
+    parser = argparse.ArgumentParser(description="Maintain the resume similarity index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="Rebuild the index from every stored resume")
+    sub.add_parser("stats", help="Show the number of indexed resumes")
+    args = parser.parse_args(argv)
+
+    setup_database()
+    index = ResumeIndex(KeywordModel())
+    if args.command == "rebuild":
+        index.rebuild(iter_resume_texts_db())
+    else:
+        index.load()
+    print(f"Indexed resumes: {len(index)} ({index.path})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import json
+
+import numpy as np
+
+from database import get_db_connection, APP_ID
+from utils import DEFAULT_SCORING_PROFILE
+
+TABLE_PREFIX = f"{APP_ID}_"
+
+COMPONENT_NAMES = ("skill", "keyword", "experience", "quality")
+
+
+def validate_profile(profile):
+    """
+    Checks and normalises a scoring profile. Weights must be non-negative and are
+    rescaled to sum to 1; the experience curve must have increasing ratios and
+    match percentages within 0-100. Raises ValueError with a readable message.
+    """
+    weights = profile.get("weights") or DEFAULT_SCORING_PROFILE["weights"]
+    unknown = set(weights) - set(COMPONENT_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown weight(s): {', '.join(sorted(unknown))}")
+    weights = {name: float(weights.get(name, 0.0)) for name in COMPONENT_NAMES}
+    if any(w < 0 for w in weights.values()):
+        raise ValueError("Weights must be non-negative.")
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("At least one weight must be positive.")
+    weights = {name: w / total for name, w in weights.items()}
+
+    curve = profile.get("experience_curve") or DEFAULT_SCORING_PROFILE["experience_curve"]
+    curve = [[float(x), float(y)] for x, y in curve]
+    if len(curve) < 2:
+        raise ValueError("experience_curve needs at least two points.")
+    if any(x1 <= x0 for (x0, _), (x1, _) in zip(curve, curve[1:])):
+        raise ValueError("experience_curve ratios must be strictly increasing.")
+    if any(not 0 <= y <= 100 for _, y in curve) or curve[0][0] < 0:
+        raise ValueError("experience_curve needs ratios >= 0 and match percentages within 0-100.")
+
+    return {"weights": weights, "experience_curve": curve}
+
+
+def rerank(components, profile):
+    """
+    Recomputes overall scores for a pool in one vectorised pass.
+
+    `components` maps skill/keyword/quality/resume_years/required_years to
+    equal-length sequences (as returned by get_result_components_db). Returns
+    (scores, experience_match, order) where `order` sorts the pool best first.
+    Matches combine_components up to floating-point rounding in the last decimal.
+    """
+    weights = profile["weights"]
+    xs, ys = zip(*profile["experience_curve"])
+
+    skill = np.asarray(components["skill"], dtype=np.float64)
+    keyword = np.asarray(components["keyword"], dtype=np.float64)
+    quality = np.asarray(components["quality"], dtype=np.float64)
+    resume_years = np.asarray(components["resume_years"], dtype=np.float64)
+    required_years = np.asarray(components["required_years"], dtype=np.float64)
+
+    # No requirement means a full experience match; the inf ratio lands past the last breakpoint
+    ratio = np.divide(resume_years, required_years, out=np.full(len(skill), np.inf), where=required_years > 0)
+    experience = np.where(ratio >= xs[-1], 100.0, np.interp(ratio, xs, ys))
+    experience = np.minimum(experience, 100.0)
+
+    scores = (
+        skill * weights["skill"]
+        + keyword * weights["keyword"]
+        + experience * weights["experience"]
+        + quality * weights["quality"]
+    )
+    scores = np.clip(np.round(scores, 2), 0, 100)
+    order = np.argsort(-scores, kind="stable")
+    return scores, experience, order
+
+
+class ProfileStore:
+    """
+    Per-JD scoring profiles in the scoring_profiles table. Every save bumps the
+    row's revision in the database, so all workers see the same profiles and
+    the same store-wide revision without caching anything in process.
+    """
+
+    def get(self, jd_id):
+        """Returns the JD's profile, or None to use the default."""
+        if jd_id is None:
+            return None
+        conn = get_db_connection()
+        try:
+            row = conn.execute(
+                f"SELECT profile FROM {TABLE_PREFIX}scoring_profiles WHERE jd_id = ?", (jd_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row['profile']) if row else None
+
+    @property
+    def revision(self):
+        """Grows with every save on any worker; part of cache keys for results scored with a profile."""
+        conn = get_db_connection()
+        try:
+            return conn.execute(
+                f"SELECT COUNT(*) + COALESCE(SUM(revision), 0) FROM {TABLE_PREFIX}scoring_profiles"
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def save(self, jd_id, profile):
+        profile = validate_profile(profile)
+        conn = get_db_connection()
+        try:
+            with conn:
+                conn.execute(f"""
+                INSERT INTO {TABLE_PREFIX}scoring_profiles (jd_id, profile) VALUES (?, ?)
+                ON CONFLICT(jd_id) DO UPDATE SET profile = excluded.profile, revision = revision + 1
+                """, (jd_id, json.dumps(profile)))
+        finally:
+            conn.close()
+        return profile
@@ -0,0 +1,112 @@
+"""
+Splits resume text into sections using header heuristics.
+
+A header is a short line (optionally followed by ':' and inline content, as in
+"Skills: Python, SQL") whose words match one of SECTION_HEADERS. Because the
+same words are common bullet items ("Leadership", "Tools"), a matching line
+only counts when it is written as a header: with a colon, in all caps, or as a
+plain line that isn't itself a bullet and doesn't sit inside a bulleted block
+(bullet lines directly above and below it). Text before the first header is
+the Contact block; headers that aren't recognised (Certifications, Interests,
+...) start an "other" section so their content doesn't leak into the previous
+one.
+"""
+import re
+
+SECTION_NAMES = ("contact", "summary", "skills", "experience", "education", "projects")
+
+SECTION_HEADERS = {
+    "summary": (
+        "summary", "professional summary", "career summary", "profile", "professional profile",
+        "objective", "career objective", "about", "about me", "overview",
+    ),
+    "skills": (
+        "skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+        "technologies", "tech stack", "tools", "tools and technologies", "skills and tools",
+        "technical proficiencies", "areas of expertise", "expertise",
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "relevant experience",
+        "employment", "employment history", "work history", "career history", "professional background",
+        "internships", "internship experience",
+    ),
+    "education": (
+        "education", "academic background", "academics", "educational background", "education and training",
+        "academic qualifications", "qualifications", "education and certifications",
+    ),
+    "projects": (
+        "projects", "personal projects", "academic projects", "key projects", "selected projects",
+        "side projects", "project experience",
+    ),
+    "other": (
+        "certifications", "certificates", "licenses", "awards", "honors", "honors and awards", "achievements",
+        "publications", "languages", "interests", "hobbies", "volunteer", "volunteering",
+        "volunteer experience", "references", "activities", "extracurricular activities", "leadership",
+    ),
+}
+
+_HEADER_LOOKUP = {alias: name for name, aliases in SECTION_HEADERS.items() for alias in aliases}
+_MAX_HEADER_WORDS = max(len(alias.split()) for alias in _HEADER_LOOKUP)
+_HEADER_LINE = re.compile(r"^[\s#*•\-]*([A-Za-z&/ ]{2,60}?)\s*(?:([:|–—-])\s*(.*))?$")
+_BULLET = re.compile(r"^\s*(?:[•*▪●◦·–\-]|\d{1,2}[.)])\s+|^\s*[•▪●◦·]")
+
+
+def _is_bullet(line):
+    return _BULLET.match(line) is not None
+
+
+def _header_of(line, in_bullets=False):
+    """
+    Returns (section, inline content) if the line is a section header, else None.
+    `in_bullets` says the line sits between two bullet lines.
+    """
+    m = _HEADER_LINE.match(line)
+    if not m:
+        return None
+    title = m.group(1)
+    words = title.lower().replace("&", " and ").replace("/", " and ").split()
+    if not words or len(words) > _MAX_HEADER_WORDS:
+        return None
+    section = _HEADER_LOOKUP.get(" ".join(words))
+    if section is None:
+        return None
+    marked = m.group(2) == ":" or title.isupper()
+    if not marked and (in_bullets or _is_bullet(line)):
+        return None
+    return section, (m.group(3) or "").strip()
+
+
+def segment_resume(text):
+    """
+    Returns {section: text} for the sections found, in SECTION_NAMES order plus
+    "other". Repeated headers (e.g. two Experience blocks) are concatenated.
+    Returns {} when no header is recognised, so callers can fall back to the
+    whole text.
+    """
+    blocks = {}
+    current = "contact"
+    found_header = False
+    lines = text.splitlines()
+    for i, line in enumerate(lines):
+        in_bullets = 0 < i < len(lines) - 1 and _is_bullet(lines[i - 1]) and _is_bullet(lines[i + 1])
+        header = _header_of(line, in_bullets)
+        if header is not None:
+            current, rest = header
+            found_header = True
+            if rest:
+                blocks.setdefault(current, []).append(rest)
+            continue
+        if line.strip():
+            blocks.setdefault(current, []).append(line)
+    if not found_header:
+        return {}
+    return {
+        name: "\n".join(blocks[name])
+        for name in SECTION_NAMES + ("other",)
+        if name in blocks
+    }
+
+
+def section_text(sections, *names):
+    """Joins the named sections that are present."""
+    return "\n".join(sections[name] for name in names if name in sections)
@@ -0,0 +1,157 @@
+"""
+Cold-start report for the API worker, checked against a time budget.
+
+Starts a fresh interpreter with `-X importtime`, imports main, runs the app's
+startup handlers and serves one GET /ready, then (with --warmup) waits for the
+background warmup to finish. Prints where the import time went and exits
+non-zero when the time to the first response exceeds the budget or when
+importing main pulled in one of the heavy libraries that should only load in
+the warmup (see warmup.py).
+
+    python startup_report.py                  # budget from RESUME_ANALYZER_STARTUP_BUDGET or 0.75 s
+    python startup_report.py --budget 0.5 --warmup --top 15
+
+Run it from the directory the server runs in; the database path is relative.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGET = 0.75
+HEAVY_MODULES = ("spacy", "sklearn", "scipy", "pdfminer", "docx")
+MARKER = "STARTUP_REPORT "
+
+# Runs in the child interpreter; talks ASGI to the app directly so the probe imports nothing extra
+PROBE = """
+import asyncio, json, sys, time
+preloaded = set(sys.modules)
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+heavy = [name for name in HEAVY_MODULES if name in sys.modules and name not in preloaded]
+
+async def lifespan(app, messages, replies):
+    async def receive():
+        return await messages.get()
+    async def send(message):
+        await replies.put(message)
+    await app({"type": "lifespan", "asgi": {"version": "3.0"}}, receive, send)
+
+async def first_request(app):
+    sent = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        sent.append(message)
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": "/ready", "raw_path": b"/ready", "root_path": "", "query_string": b"",
+             "headers": [], "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80)}
+    await app(scope, receive, send)
+    return sent[0]["status"]
+
+async def probe():
+    messages, replies = asyncio.Queue(), asyncio.Queue()
+    task = asyncio.ensure_future(lifespan(main.app, messages, replies))
+    await messages.put({"type": "lifespan.startup"})
+    await replies.get()
+    started_up = time.perf_counter()
+    status = await first_request(main.app)
+    responded = time.perf_counter()
+    result = {
+        "import_seconds": imported - started, "startup_seconds": started_up - imported,
+        "first_request_seconds": responded - started_up, "first_status": status, "heavy_at_import": heavy,
+    }
+    if WAIT_FOR_WARMUP:
+        while main.warmup.finished_at is None:
+            await asyncio.sleep(0.01)
+        result["ready_seconds"] = time.perf_counter() - started
+        result["warmup"] = main.warmup.report()
+    await messages.put({"type": "lifespan.shutdown"})
+    await replies.get()
+    await task
+    return result
+
+print(MARKER + json.dumps(asyncio.run(probe())), flush=True)
+"""
+
+
+def run_probe(wait_for_warmup):
+    code = f"HEAVY_MODULES = {HEAVY_MODULES!r}\nWAIT_FOR_WARMUP = {wait_for_warmup!r}\nMARKER = {MARKER!r}\n" + PROBE
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [BACKEND_DIR, env.get("PYTHONPATH")]))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=env)
+    reports = [line[len(MARKER):] for line in proc.stdout.splitlines() if line.startswith(MARKER)]
+    if proc.returncode != 0 or not reports:
+        raise RuntimeError(f"Startup probe failed:\n{proc.stderr[-4000:]}")
+    return json.loads(reports[-1]), parse_importtime(proc.stderr)
+
+
+def parse_importtime(stderr):
+    """
+    Returns [(depth, module, self_us, cumulative_us)] for the modules first
+    imported by `import main`, main itself last (importtime lists children
+    before their parent; modules already imported by site don't appear).
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        entries.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+        if depth == 0:
+            if name.strip() == "main":
+                return entries
+            entries = []
+    return entries
+
+
+def main_children(entries):
+    """Modules imported directly by main, slowest first."""
+    return sorted(((cumulative, name) for depth, name, _, cumulative in entries if depth == 1), reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure worker cold start against a budget.")
+    parser.add_argument("--budget", type=float,
+                        default=float(os.environ.get("RESUME_ANALYZER_STARTUP_BUDGET", DEFAULT_BUDGET)),
+                        help="Seconds allowed from interpreter start to the first response")
+    parser.add_argument("--top", type=int, default=10, help="Number of modules to list")
+    parser.add_argument("--warmup", action="store_true", help="Also wait for and report the background warmup")
+    parser.add_argument("--json", action="store_true", help="Print the raw measurements as JSON")
+    args = parser.parse_args(argv)
+
+    result, entries = run_probe(args.warmup)
+    cold_start = result["import_seconds"] + result["startup_seconds"] + result["first_request_seconds"]
+    over_budget = cold_start > args.budget
+    if args.json:
+        result["cold_start_seconds"] = cold_start
+        result["budget_seconds"] = args.budget
+        print(json.dumps(result, indent=2))
+        return 1 if over_budget or result["heavy_at_import"] else 0
+
+    print(f"Cold start: import {result['import_seconds']:.3f}s + startup {result['startup_seconds']:.3f}s "
+          f"+ first request {result['first_request_seconds']:.3f}s = {cold_start:.3f}s "
+          f"(budget {args.budget:g}s) {'OVER BUDGET' if over_budget else 'OK'}")
+    heavy = result["heavy_at_import"]
+    print(f"Heavy libraries imported by main: {', '.join(heavy) if heavy else 'none'}")
+
+    print("\nImported by main (cumulative):")
+    for cumulative, name in main_children(entries)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    print("\nSlowest modules (self):")
+    for _, name, self_us, _ in sorted(entries, key=lambda e: e[2], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    if args.warmup:
+        print(f"\nReady after {result['ready_seconds']:.2f}s:")
+        for name, step in result["warmup"]["steps"].items():
+            print(f"  {name:<18} {step['state']:<8} {step['seconds']}s {step.get('error') or ''}")
+    return 1 if over_budget or heavy else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
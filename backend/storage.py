@@ -0,0 +1,162 @@
+"""
+Maintenance for blob storage of resume and JD payloads (see database.put_blob).
+
+    python storage.py stats                  # sizes and deduplication ratio
+    python storage.py compress               # move pre-blob rows into compressed blobs
+    python storage.py retention --days 365   # delete old resumes/results and orphaned blobs
+    python storage.py vacuum                 # reclaim free pages and refresh planner statistics
+
+Deleting rows or compressing leaves free pages behind; run vacuum afterwards
+to shrink the file. After retention, rebuild the search index with
+'python resume_index.py rebuild'.
+"""
+import argparse
+import os
+
+from database import get_db_connection, setup_database, put_blob, APP_ID, DB_PATH
+
+TABLE_PREFIX = f"{APP_ID}_"
+PAYLOAD_TABLES = ("resumes", "job_descriptions")
+ID_COLUMNS = {"resumes": "resume_id", "job_descriptions": "jd_id"}
+
+
+def stats():
+    conn = get_db_connection()
+    try:
+        blobs = conn.execute(
+            f"SELECT COUNT(*) AS n, COALESCE(SUM(size), 0) AS raw, COALESCE(SUM(LENGTH(data)), 0) AS stored "
+            f"FROM {TABLE_PREFIX}blobs"
+        ).fetchone()
+        referenced = 0
+        legacy = 0
+        for table in PAYLOAD_TABLES:
+            for column in ("text_blob", "parsed_blob"):
+                referenced += conn.execute(f"""
+                SELECT COALESCE(SUM(b.size), 0) FROM {TABLE_PREFIX}{table} t
+                JOIN {TABLE_PREFIX}blobs b ON b.hash = t.{column}
+                """).fetchone()[0]
+            legacy += conn.execute(f"""
+            SELECT COALESCE(SUM(COALESCE(LENGTH(CAST(text AS BLOB)), 0) + COALESCE(LENGTH(CAST(parsed_json AS BLOB)), 0)), 0)
+            FROM {TABLE_PREFIX}{table}
+            """).fetchone()[0]
+    finally:
+        conn.close()
+    return {
+        "blobs": blobs['n'],
+        "payload_bytes": referenced,
+        "unique_bytes": blobs['raw'],
+        "stored_bytes": blobs['stored'],
+        "legacy_inline_bytes": legacy,
+        "file_bytes": os.path.getsize(DB_PATH) if os.path.exists(DB_PATH) else 0,
+    }
+
+
+def compress(batch_size=500):
+    """Moves inline text/parsed_json of older rows into blobs. Returns the number of rows moved."""
+    moved = 0
+    conn = get_db_connection()
+    try:
+        for table in PAYLOAD_TABLES:
+            id_column = ID_COLUMNS[table]
+            while True:
+                rows = conn.execute(f"""
+                SELECT {id_column} AS id, text, parsed_json FROM {TABLE_PREFIX}{table}
+                WHERE text_blob IS NULL AND (text IS NOT NULL OR parsed_json IS NOT NULL)
+                LIMIT ?
+                """, (batch_size,)).fetchall()
+                if not rows:
+                    break
+                with conn:
+                    for row in rows:
+                        conn.execute(f"""
+                        UPDATE {TABLE_PREFIX}{table}
+                        SET text_blob = ?, parsed_blob = ?, text = NULL, parsed_json = NULL
+                        WHERE {id_column} = ?
+                        """, (
+                            put_blob(conn, row['text'] or ""),
+                            put_blob(conn, row['parsed_json']) if row['parsed_json'] else None,
+                            row['id'],
+                        ))
+                moved += len(rows)
+    finally:
+        conn.close()
+    return moved
+
+
+def delete_orphaned_blobs(conn):
+    return conn.execute(f"""
+    DELETE FROM {TABLE_PREFIX}blobs WHERE hash NOT IN (
+        SELECT text_blob FROM {TABLE_PREFIX}resumes WHERE text_blob IS NOT NULL
+        UNION SELECT parsed_blob FROM {TABLE_PREFIX}resumes WHERE parsed_blob IS NOT NULL
+        UNION SELECT text_blob FROM {TABLE_PREFIX}job_descriptions WHERE text_blob IS NOT NULL
+        UNION SELECT parsed_blob FROM {TABLE_PREFIX}job_descriptions WHERE parsed_blob IS NOT NULL
+    )
+    """).rowcount
+
+
+def retention(days):
+    """
+    Deletes resumes uploaded and results created more than `days` days ago, then
+    any blob no longer referenced. Job descriptions are kept (profiles and
+    analytics refer to them). Returns counts per kind.
+    """
+    cutoff = f"-{int(days)} days"
+    conn = get_db_connection()
+    try:
+        with conn:
+            results = conn.execute(
+                f"DELETE FROM {TABLE_PREFIX}results WHERE created_at < datetime('now', ?)", (cutoff,)
+            ).rowcount
+            resumes = conn.execute(
+                f"DELETE FROM {TABLE_PREFIX}resumes WHERE upload_date < datetime('now', ?)", (cutoff,)
+            ).rowcount
+            blobs = delete_orphaned_blobs(conn)
+    finally:
+        conn.close()
+    return {"results": results, "resumes": resumes, "blobs": blobs}
+
+
+def vacuum():
+    conn = get_db_connection()
+    try:
+        conn.execute("VACUUM")
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain compressed resume/JD storage.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Show payload, stored and file sizes")
+    sub.add_parser("compress", help="Move rows stored before blob storage into compressed blobs")
+    retention_parser = sub.add_parser("retention", help="Delete old resumes and results, then orphaned blobs")
+    retention_parser.add_argument("--days", type=int, required=True)
+    sub.add_parser("vacuum", help="VACUUM and ANALYZE the database")
+    args = parser.parse_args(argv)
+
+    setup_database()
+    if args.command == "compress":
+        print(f"Moved {compress()} row(s) into blob storage; run 'python storage.py vacuum' to shrink the file")
+    elif args.command == "retention":
+        if args.days < 1:
+            parser.error("--days must be at least 1")
+        deleted = retention(args.days)
+        print(f"Deleted {deleted['resumes']} resume(s), {deleted['results']} result(s), {deleted['blobs']} blob(s)")
+        if deleted['resumes']:
+            print("Run 'python resume_index.py rebuild' and 'python storage.py vacuum' to drop them from the index and file")
+    elif args.command == "vacuum":
+        before = os.path.getsize(DB_PATH)
+        vacuum()
+        print(f"Vacuumed {DB_PATH}: {before} -> {os.path.getsize(DB_PATH)} bytes")
+
+    info = stats()
+    ratio = info['payload_bytes'] / info['stored_bytes'] if info['stored_bytes'] else 0
+    print(f"Blobs: {info['blobs']} ({info['stored_bytes']} bytes stored, {info['unique_bytes']} uncompressed)")
+    print(f"Payload referenced by rows: {info['payload_bytes']} bytes ({ratio:.1f}x smaller on disk)")
+    print(f"Inline payload in older rows: {info['legacy_inline_bytes']} bytes")
+    print(f"Database file: {info['file_bytes']} bytes")
+
+
+if __name__ == "__main__":
+    main()
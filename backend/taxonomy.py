@@ -0,0 +1,233 @@
+"""
+Skill taxonomy: loading, compilation and hot reload.
+
+The source of truth is taxonomy/skills.json (a version label, the skill list
+and the synonym map). The compiled version is the label plus a hash of the
+file, so any edit yields a new version even if the label is left unchanged. `python taxonomy.py build` compiles it into
+taxonomy/skills.snapshot, holding everything extract_skills/normalize_skill
+need ready-made:
+
+  - phrases:  skill phrase -> canonical skill, matched token-by-token against
+              cleaned text (the matcher; one dict lookup per candidate phrase)
+  - aliases:  synonym -> canonical skill
+  - skill_ids: canonical skills in a stable order
+
+Workers load the snapshot (compiling and writing it first if it is missing or
+older than the JSON) and check the mtimes of both files every
+RELOAD_CHECK_SECONDS; a rebuilt snapshot, or an edited JSON (which is compiled
+into a new snapshot first), is swapped in atomically without a restart.
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+
+TAXONOMY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomy")
+SOURCE_PATH = os.path.join(TAXONOMY_DIR, "skills.json")
+SNAPSHOT_PATH = os.path.join(TAXONOMY_DIR, "skills.snapshot")
+SNAPSHOT_FORMAT = 2
+RELOAD_CHECK_SECONDS = 5.0
+
+
+class CompiledTaxonomy:
+    """Immutable, ready-to-match form of the taxonomy."""
+
+    __slots__ = ("version", "skills", "synonyms", "aliases", "phrases", "max_words", "skill_ids")
+
+    def __init__(self, version, skills, synonyms, aliases, phrases, max_words, skill_ids):
+        self.version = version
+        self.skills = skills
+        self.synonyms = synonyms
+        self.aliases = aliases
+        self.phrases = phrases
+        self.max_words = max_words
+        self.skill_ids = skill_ids
+
+    def normalize(self, skill):
+        skill_lower = skill.lower().strip()
+        return self.aliases.get(skill_lower, skill_lower)
+
+    def match(self, cleaned_text):
+        """
+        Returns canonical skills occurring in text already passed through clean_text.
+
+        A skill matches where it starts at a token boundary and is followed by
+        end of text, a space or a '.', so for the last word of a phrase every
+        prefix of the token ending right before a '.' is tried as well. Words of
+        a phrase must be separated by exactly one space: splitting on " " leaves
+        an empty token wherever clean_text removed punctuation between two
+        spaces (e.g. "apache | spark"), and a phrase never spans one.
+        """
+        tokens = cleaned_text.split(" ")
+        phrases = self.phrases
+        found = set()
+        for i in range(len(tokens)):
+            if not tokens[i]:
+                continue
+            head = ""
+            for n in range(min(self.max_words, len(tokens) - i)):
+                token = tokens[i + n]
+                if not token:
+                    break
+                start = len(head)
+                candidate = head + token
+                canonical = phrases.get(candidate)
+                if canonical is not None:
+                    found.add(canonical)
+                dot = token.find(".")
+                while dot != -1:
+                    canonical = phrases.get(candidate[:start + dot])
+                    if canonical is not None:
+                        found.add(canonical)
+                    dot = token.find(".", dot + 1)
+                head = candidate + " "
+        return found
+
+
+def compile_taxonomy(raw):
+    """Compiles the raw bytes of skills.json."""
+    data = json.loads(raw)
+    skills = frozenset(data["skills"])
+    synonyms = {canonical: list(aliases) for canonical, aliases in data["synonyms"].items()}
+
+    # First canonical listing an alias wins, as in the original lookup order
+    aliases = {}
+    for canonical, names in synonyms.items():
+        for name in names:
+            aliases.setdefault(name, canonical)
+
+    def normalize(skill):
+        skill_lower = skill.lower().strip()
+        return aliases.get(skill_lower, skill_lower)
+
+    phrases = {skill: normalize(skill) for skill in skills}
+    max_words = max((len(skill.split(" ")) for skill in skills), default=1)
+    skill_ids = tuple(sorted({normalize(s) for s in skills} | set(synonyms)))
+    return CompiledTaxonomy(
+        version=f"{data['version']}+{hashlib.sha256(raw).hexdigest()[:12]}", skills=skills, synonyms=synonyms, aliases=aliases,
+        phrases=phrases, max_words=max_words, skill_ids=skill_ids,
+    )
+
+
+def build_snapshot(source=SOURCE_PATH, snapshot=SNAPSHOT_PATH):
+    """Compiles the JSON taxonomy and writes the snapshot atomically. Returns the compiled taxonomy."""
+    with open(source, "rb") as f:
+        compiled = compile_taxonomy(f.read())
+    payload = {name: getattr(compiled, name) for name in CompiledTaxonomy.__slots__}
+    tmp = f"{snapshot}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump((SNAPSHOT_FORMAT, payload), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, snapshot)
+    return compiled
+
+
+def load_snapshot(snapshot=SNAPSHOT_PATH):
+    with open(snapshot, "rb") as f:
+        fmt, payload = pickle.load(f)
+    if fmt != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported taxonomy snapshot format {fmt}")
+    return CompiledTaxonomy(**payload)
+
+
+class TaxonomyHolder:
+    """Holds the active taxonomy and swaps in a newer snapshot when one appears."""
+
+    def __init__(self, source=SOURCE_PATH, snapshot=SNAPSHOT_PATH):
+        self.source = source
+        self.snapshot = snapshot
+        self._lock = threading.Lock()
+        self._current = None
+        self._mtime = None
+        self._source_mtime = None
+        self._next_check = 0.0
+
+    @staticmethod
+    def _mtime_of(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _snapshot_mtime(self):
+        return self._mtime_of(self.snapshot)
+
+    def _changed(self):
+        return (self._snapshot_mtime() != self._mtime
+                or self._mtime_of(self.source) != self._source_mtime)
+
+    def _load(self):
+        mtime = self._snapshot_mtime()
+        # None when deployed with just the snapshot
+        source_mtime = self._mtime_of(self.source)
+        stale = mtime is None or (source_mtime is not None and source_mtime > mtime)
+        if stale:
+            compiled = build_snapshot(self.source, self.snapshot)
+        else:
+            try:
+                compiled = load_snapshot(self.snapshot)
+            except Exception as e:
+                print(f"Taxonomy snapshot unreadable ({e}); rebuilding from {self.source}")
+                compiled = build_snapshot(self.source, self.snapshot)
+        self._mtime = self._snapshot_mtime()
+        self._source_mtime = source_mtime
+        return compiled
+
+    def current(self):
+        now = time.monotonic()
+        if self._current is not None and now < self._next_check:
+            return self._current
+        with self._lock:
+            if self._current is None:
+                self._current = self._load()
+            elif now >= self._next_check and self._changed():
+                try:
+                    previous = self._current.version
+                    self._current = self._load()
+                    print(f"Taxonomy reloaded: {previous} -> {self._current.version}")
+                except Exception as e:
+                    print(f"Taxonomy reload failed, keeping {self._current.version}: {e}")
+            self._next_check = now + RELOAD_CHECK_SECONDS
+            return self._current
+
+    def reload(self):
+        """Forces a reload on the next access."""
+        with self._lock:
+            self._mtime = None
+            self._source_mtime = None
+            self._next_check = 0.0
+
+
+_holder = TaxonomyHolder()
+
+
+def current():
+    """The active compiled taxonomy."""
+    return _holder.current()
+
+
+def reload():
+    _holder.reload()
+    return _holder.current()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect the compiled skill taxonomy.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help=f"Compile {os.path.relpath(SOURCE_PATH)} into the snapshot")
+    sub.add_parser("info", help="Show the active taxonomy version")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        compiled = build_snapshot()
+        print(f"Built {SNAPSHOT_PATH} (version {compiled.version})")
+    else:
+        compiled = current()
+    print(f"Version: {compiled.version}")
+    print(f"Skills: {len(compiled.skills)}, aliases: {len(compiled.aliases)}, max phrase words: {compiled.max_words}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Differential tests: the optimized scoring paths against reference_scoring.py.
+
+Every input goes through both the live code and the frozen reference, and the
+results must agree: identical skill sets and years, ATS scores and their
+components within SCORE_TOLERANCE (0.01 points: both sides round to two
+decimals, so at most one unit in the last place). Inputs come from
+
+  - a seeded random generator mixing taxonomy phrases, synonyms, punctuation,
+    date ranges and filler (property-based; a failing text is shrunk to the
+    fewest tokens that still disagree before it is reported)
+  - a fixed corpus of known edge cases, plus any .txt files in the directory
+    named by RESUME_ANALYZER_DIFF_CORPUS (e.g. exported real resumes)
+
+One deviation is deliberate: the reference TF-IDF keeps only the pair's 500
+most frequent n-grams (REFERENCE_MAX_FEATURES), KeywordModel keeps its whole
+vocabulary. Pairs within the cap must match the frozen reference; larger pairs
+are checked against the same computation without the cap.
+
+Run with `python -m pytest test_differential.py` or `python test_differential.py`.
+RESUME_ANALYZER_DIFF_SEED and RESUME_ANALYZER_DIFF_CASES change the random
+inputs; the seed is part of every failure message.
+"""
+import glob
+import math
+import os
+import random
+import sys
+
+import reference_scoring as reference
+import taxonomy
+from keyword_model import KeywordModel
+from utils import calculate_ats_score, extract_skills, extract_years_of_experience, normalize_skill
+
+SEED = int(os.environ.get("RESUME_ANALYZER_DIFF_SEED", 20240601))
+CASES = int(os.environ.get("RESUME_ANALYZER_DIFF_CASES", 300))
+CORPUS_DIR = os.environ.get("RESUME_ANALYZER_DIFF_CORPUS")
+SCORE_TOLERANCE = 0.01
+SIMILARITY_TOLERANCE = 1e-9
+REFERENCE_MAX_FEATURES = 500
+
+FILLER = (
+    "led team built designed the a of and for with in at on to google golang going android "
+    "javascripts pythonic reactive cloud data platform services senior engineer developer "
+    "university college school project delivered improved performance by 30% naïve café"
+).split()
+TRICKY = [
+    "c++", "c#", ".net", "node.js", "react.js", "vue.js", "k8s", "ml/ai", "c++/java", "r&d", "go-to",
+    "(aws)", "python,", "sql;", "java.", "node.js.", "c++.", "e.g.", "i.e.", "ci/cd", "asp.net", "3.5",
+]
+CONTEXT = ["experience with", "proficient in", "skilled in", "knowledge of", "expertise in",
+           "familiar with", "working with", "using"]
+MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec",
+          "January", "Sept.", "March", "Dec."]
+SEPARATORS = [" ", " ", " ", ", ", ". ", "\n", " | ", " - ", " / ", "  ", "\t"]
+
+CORPUS = [
+    "I have 5 years of experience in Python, JavaScript, React.js, and Node.js. Also worked with AWS and Docker.",
+    "Proficient in C++, C#, and GoLang. Experienced with PostgreSQL and Kubernetes (k8s).",
+    "Strong expertise in Machine Learning, Deep Learning, TensorFlow, and scikit-learn (sklearn).",
+    "Worked at Google on Go services. Going forward: go, golang, Go.",
+    "Skills: C++/Java, .NET, ASP.NET, node.js. react.js, vue.js; SQL, NoSQL.",
+    "Apache | Spark, Machine - Learning, Data  Science, spring / boot",
+    "Software Engineer at Google | Jan 2020 - Present\nData Analyst at Microsoft | June 2018 - Dec 2019",
+    "Senior Developer (01/2015 - 12/2018)\nLead Engineer 2019/01 to 13/2020\n10+ years of experience",
+    "Sept. 2017 – March 2019; Dec 2019 — current; 3 yrs exp; 2 years experience",
+    "",
+    "   \n\t ",
+    "the and of a to in",
+]
+
+_taxonomy = taxonomy.current()
+_PHRASES = sorted(_taxonomy.skills | {alias for aliases in _taxonomy.synonyms.values() for alias in aliases})
+
+
+def _date(rng):
+    if rng.random() < 0.6:
+        return f"{rng.choice(MONTHS)} {rng.randint(1995, 2026)}"
+    return f"{rng.randint(0, 13):02d}{rng.choice('/-')}{rng.randint(1995, 2026)}"
+
+
+def _fragment(rng):
+    roll = rng.random()
+    if roll < 0.35:
+        phrase = rng.choice(_PHRASES)
+        return phrase.upper() if rng.random() < 0.2 else phrase.title() if rng.random() < 0.2 else phrase
+    if roll < 0.45:
+        return rng.choice(TRICKY)
+    if roll < 0.52:
+        return f"{rng.choice(CONTEXT)} {rng.choice(_PHRASES)}"
+    if roll < 0.60:
+        end = rng.choice(["present", "Current", "now", "ongoing", _date(rng), _date(rng)])
+        return f"{_date(rng)} {rng.choice(['-', 'to', '–', '—', ' - '])} {end}"
+    if roll < 0.64:
+        return f"{rng.randint(0, 25)}{rng.choice(['+', ''])} {rng.choice(['years', 'year', 'yrs', 'yr'])} " \
+               f"{rng.choice(['of ', ''])}{rng.choice(['experience', 'exp'])}"
+    return rng.choice(FILLER)
+
+
+def random_text(rng, max_fragments=60, min_fragments=0):
+    parts = []
+    for _ in range(rng.randint(min_fragments, max_fragments)):
+        parts.append(_fragment(rng))
+        parts.append(rng.choice(SEPARATORS))
+    return "".join(parts)
+
+
+def random_texts(count=CASES, seed=SEED):
+    rng = random.Random(seed)
+    return [random_text(rng) for _ in range(count)]
+
+
+def corpus_texts():
+    texts = list(CORPUS)
+    if CORPUS_DIR:
+        for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.txt"))):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                texts.append(f.read())
+    return texts
+
+
+def shrink(text, disagrees):
+    """Drops whitespace-separated tokens while `disagrees(text)` stays true."""
+    tokens = text.split()
+    i = 0
+    while i < len(tokens):
+        candidate = tokens[:i] + tokens[i + 1:]
+        if disagrees(" ".join(candidate)):
+            tokens = candidate
+        else:
+            i += 1
+    return " ".join(tokens)
+
+
+def check_all(texts, disagrees, what):
+    for i, text in enumerate(texts):
+        if disagrees(text):
+            raise AssertionError(
+                f"{what} differs from the reference (seed {SEED}, input {i}); "
+                f"minimal input: {shrink(text, disagrees)!r}"
+            )
+
+
+def _skills_differ(text):
+    return sorted(extract_skills(text)) != sorted(reference.extract_skills(text))
+
+
+def _years_differ(text):
+    return extract_years_of_experience(text) != reference.extract_years_of_experience(text)
+
+
+def _in_memory_model():
+    model = KeywordModel(flush_every=10 ** 9)
+    model._loaded = True  # scores from the documents given here only; never reads or writes the database
+    return model
+
+
+def _parsed(text):
+    # Both scorers get the same parsed input, so only the scoring itself is compared
+    return {
+        "skills": extract_skills(text),
+        "years_of_experience": extract_years_of_experience(text),
+        "email": "a@b.co" if "@" in text else "N/A",
+        "phone": "5551234567" if any(c.isdigit() for c in text) else "N/A",
+        "education": ["State University"] if "university" in text.lower() else [],
+    }
+
+
+def _parsed_jd(text, rng):
+    return {"required_skills": extract_skills(text), "min_years_required": rng.choice([0, 0, 1, 2, 3, 5, 8])}
+
+
+def _pairs(rng, count):
+    texts = corpus_texts() + random_texts(count)
+    return [(rng.choice(texts), rng.choice(texts)) for _ in range(count)]
+
+
+def _vocabulary_size(resume_text, jd_text):
+    """Distinct n-grams the reference vectorizer sees in the pair (0 for only stop words)."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 3))
+    try:
+        vectorizer.fit([reference.clean_text(resume_text), reference.clean_text(jd_text)])
+    except ValueError:
+        return 0
+    return len(vectorizer.vocabulary_)
+
+
+def test_normalize_skill_matches_reference():
+    rng = random.Random(SEED)
+    names = _PHRASES + list(_taxonomy.synonyms) + FILLER + TRICKY
+    variants = names + [f"  {n.upper()} " for n in names] + [rng.choice(names).title() for _ in range(CASES)]
+    for name in variants:
+        assert normalize_skill(name) == reference.normalize_skill(name), name
+
+
+def test_extract_skills_matches_reference_on_corpus():
+    check_all(corpus_texts(), _skills_differ, "extract_skills")
+
+
+def test_extract_skills_matches_reference_on_random_text():
+    check_all(random_texts(), _skills_differ, "extract_skills")
+
+
+def test_every_taxonomy_phrase_is_found_alone_and_in_context():
+    texts = []
+    for phrase in _PHRASES:
+        texts += [phrase, f"{phrase}.", f"{phrase}, x", f"x {phrase}. y", f"using {phrase}", f"x{phrase}"]
+    check_all(texts, _skills_differ, "extract_skills")
+
+
+def test_years_of_experience_matches_reference():
+    check_all(corpus_texts() + random_texts(), _years_differ, "extract_years_of_experience")
+
+
+def test_keyword_model_matches_two_document_tfidf():
+    # With only the two documents in its corpus, the IDF model must reproduce the
+    # per-request TF-IDF: the frozen (capped) reference within the cap, the uncapped one past it
+    rng = random.Random(SEED + 1)
+    long_texts = [random_text(rng, max_fragments=400, min_fragments=250) for _ in range(max(2, CASES // 20))]
+    pairs = _pairs(rng, CASES) + [(rng.choice(long_texts), rng.choice(long_texts)) for _ in range(len(long_texts))]
+    over_cap = 0
+    for resume_text, jd_text in pairs:
+        max_features = REFERENCE_MAX_FEATURES
+        if _vocabulary_size(resume_text, jd_text) > REFERENCE_MAX_FEATURES:
+            max_features = None
+            over_cap += 1
+        try:
+            expected = reference.tfidf_similarity(resume_text, jd_text, max_features=max_features)
+        except ValueError:  # only stop words: empty vocabulary
+            expected = 0.0
+        actual = _in_memory_model().similarity(resume_text, jd_text)
+        assert math.isclose(actual, expected, abs_tol=SIMILARITY_TOLERANCE), (resume_text, jd_text, actual, expected)
+    assert 0 < over_cap < len(pairs), "inputs should cover both sides of the feature cap"
+
+
+def test_batched_similarities_match_pairwise():
+    rng = random.Random(SEED + 2)
+    for _ in range(max(1, CASES // 10)):
+        resume_text = random_text(rng)
+        jd_texts = [random_text(rng) for _ in range(rng.randint(1, 8))]
+        model = _in_memory_model()
+        batched = model.similarities(resume_text, jd_texts)
+        pairwise = [model.similarity(resume_text, jd, learn=False) for jd in jd_texts]
+        for a, b in zip(batched, pairwise):
+            assert math.isclose(a, b, abs_tol=SIMILARITY_TOLERANCE), (resume_text, jd_texts, batched, pairwise)
+
+
+def test_ats_score_matches_reference():
+    # Scored the way rank_candidates does, through a KeywordModel (here holding just the pair)
+    rng = random.Random(SEED + 3)
+    compared = 0
+    for resume_text, jd_text in _pairs(rng, CASES):
+        parsed_resume, parsed_jd = _parsed(resume_text), _parsed_jd(jd_text, rng)
+        if _vocabulary_size(resume_text, jd_text) > REFERENCE_MAX_FEATURES:
+            continue  # the documented deviation; covered by test_keyword_model_matches_two_document_tfidf
+        compared += 1
+        score, details, required = calculate_ats_score(
+            resume_text, jd_text, parsed_resume, parsed_jd, keyword_model=_in_memory_model()
+        )
+        ref_score, ref_details, ref_required = reference.calculate_ats_score(
+            resume_text, jd_text, parsed_resume, parsed_jd
+        )
+        context = (resume_text, jd_text, details, ref_details)
+        assert abs(score - ref_score) <= SCORE_TOLERANCE, context
+        assert sorted(required) == sorted(ref_required), context
+        assert sorted(details["Matched Skills"]) == sorted(ref_details["Matched Skills"]), context
+        for key in ("Skill Match", "Keyword Density", "Experience Match", "Resume Quality"):
+            assert abs(details[key] - ref_details[key]) <= SCORE_TOLERANCE, (key, context)
+    assert compared >= CASES // 2, f"only {compared} of {CASES} pairs were within the reference's feature cap"
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items()) if name.startswith("test_") and callable(fn)]
+    failed = 0
+    print(f"Differential tests: seed {SEED}, {CASES} random cases, corpus {len(corpus_texts())} texts")
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"PASS {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL {name}: {e}")
+    print(f"{len(tests) - failed}/{len(tests)} passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,89 @@
+"""
+End-to-end tests of /rank-candidates through the ASGI app, on a scratch database.
+
+Run with `python -m pytest test_rank_candidates.py`.
+"""
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from keyword_model import KeywordModel
+
+JD = (
+    "Backend Engineer. Required skills: Python, SQL, Docker, AWS and Kubernetes. "
+    "3+ years of experience building REST APIs and data pipelines."
+)
+POOL = {
+    "jane.txt": (
+        "Jane Doe\njane@example.com\n555 123 4567\n"
+        "Skills: Python, SQL, Docker, Kubernetes\n"
+        "Experience\nBackend Engineer at Acme | Jan 2018 - Present\n"
+        "Built REST APIs in Python and ran data pipelines on AWS.\n"
+        "Education\nState University, BSc Computer Science\n"
+    ),
+    "john.txt": (
+        "John Roe\njohn@example.com\n555 765 4321\n"
+        "Skills: Java, Spring, SQL, Docker\n"
+        "Experience\nSoftware Engineer at Initech | Mar 2020 - Present\n"
+        "Maintained Java services and wrote SQL reports.\n"
+        "Education\nCity College, BSc Information Systems\n"
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    # The database path is relative and main creates its tables on import
+    previous = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("rank_candidates"))
+    try:
+        import main
+        yield main
+    finally:
+        os.chdir(previous)
+
+
+def _rank(app, names, pool=POOL):
+    files = [("jd", ("jd.txt", JD.encode(), "text/plain"))]
+    files += [("resumes", (name, pool[name].encode(), "text/plain")) for name in names]
+    response = TestClient(app.app).post("/rank-candidates", files=files)
+    assert response.status_code == 200, response.text
+    return {row["candidate_name"]: row for row in response.json()}
+
+
+def _fresh_keyword_model():
+    model = KeywordModel(flush_every=10 ** 9)
+    model._loaded = True  # an empty corpus that never touches the database
+    return model
+
+
+def test_scores_do_not_depend_on_upload_order(app, monkeypatch):
+    monkeypatch.setattr(app, "keyword_model", _fresh_keyword_model())
+    forward = _rank(app, ["jane.txt", "john.txt"])
+    monkeypatch.setattr(app, "keyword_model", _fresh_keyword_model())
+    backward = _rank(app, ["john.txt", "jane.txt"])
+    assert len(forward) == 2
+    for name in POOL:
+        assert forward[name]["ats_score"] == backward[name]["ats_score"], name
+        assert forward[name]["keyword_density"] == backward[name]["keyword_density"], name
+
+
+def test_repeated_ranking_gives_the_same_scores(app, monkeypatch):
+    monkeypatch.setattr(app, "keyword_model", _fresh_keyword_model())
+    first = _rank(app, ["jane.txt", "john.txt"])
+    second = _rank(app, ["jane.txt", "john.txt"])
+    assert {n: r["ats_score"] for n, r in first.items()} == {n: r["ats_score"] for n, r in second.items()}
+
+
+def test_ranking_a_pool_again_flags_no_self_duplicates(app, monkeypatch):
+    monkeypatch.setattr(app, "keyword_model", _fresh_keyword_model())
+    pool = {**POOL, "jane_copy.txt": POOL["jane.txt"]}
+    names = ["jane.txt", "john.txt", "jane_copy.txt"]
+    for _ in range(2):
+        rows = _rank(app, names, pool)
+        assert rows["jane.txt"]["duplicate_of"] is None
+        assert rows["john.txt"]["duplicate_of"] is None
+        assert rows["jane_copy.txt"]["duplicate_of"] == "jane.txt"
+    # Ranked on its own, the copy is still a duplicate of the stored original
+    assert _rank(app, ["jane_copy.txt"], pool)["jane_copy.txt"]["duplicate_of"] == "jane.txt"
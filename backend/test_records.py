@@ -0,0 +1,83 @@
+"""
+Tests for the compact record codec (records.py).
+
+Run with `python -m pytest test_records.py`.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+import records
+from records import MatchResult, decode, encode
+
+
+def _result(**overrides):
+    fields = dict(
+        ats_score=72.5, skill_match=80.0, keyword_density=31.25, experience_match=100.0, resume_quality=90.0,
+        matched_skills=records.skill_ids(["python", "sql"]), missing_skills=records.skill_ids(["docker"]),
+        total_required=3, resume_years=4.5, required_years=3.0,
+        raw_skill=0.8, raw_keyword=0.3125, raw_quality=0.9, candidate_name="jane.txt",
+    )
+    fields.update(overrides)
+    return MatchResult(**fields)
+
+
+@pytest.mark.parametrize("n", [0, 1, 0x7F, 0x80, 0x3FFF, 0x4000, 2 ** 32, 2 ** 63 + 5])
+def test_varint_round_trip(n):
+    writer = records._Writer()
+    writer.varint(n)
+    writer.varint(7)  # the reader must stop exactly at the end of the first value
+    reader = records._Reader(bytes(writer.buf))
+    assert reader.varint() == n
+    assert reader.varint() == 7
+    assert reader.pos == len(writer.buf)
+
+
+def test_match_result_round_trip():
+    record = _result()
+    assert decode(encode(record)) == record
+
+
+def test_skills_outside_the_taxonomy_are_written_by_name():
+    record = _result(matched_skills=records.skill_ids(["python", "some in-house framework"]))
+    decoded = decode(encode(record))
+    assert records.skill_names(decoded.matched_skills) == ["python", "some in-house framework"]
+
+
+def test_long_candidate_name_round_trips():
+    record = _result(candidate_name="é" * 300)  # length needs a two-byte varint
+    assert decode(encode(record)).candidate_name == "é" * 300
+
+
+def test_other_codec_version_is_rejected():
+    data = bytearray(encode(_result()))
+    data[0] = records.CODEC_VERSION + 1
+    with pytest.raises(ValueError, match="codec version"):
+        decode(bytes(data))
+
+
+def _reloaded(version, skill_ids):
+    return SimpleNamespace(version=version, skill_ids=tuple(skill_ids))
+
+
+def test_other_taxonomy_version_is_rejected(monkeypatch):
+    data = encode(_result())
+    monkeypatch.setattr(records.taxonomy, "current", lambda: _reloaded("some-other-version", ()))
+    with pytest.raises(ValueError, match="taxonomy"):
+        decode(data)
+
+
+def test_skill_ids_follow_a_reloaded_taxonomy(monkeypatch):
+    # A hot reload that renumbers the taxonomy's skill ids must not change what a record decodes to
+    monkeypatch.setattr(records.taxonomy, "current", lambda: _reloaded("v1", ["docker", "python", "sql"]))
+    record = _result()
+    assert decode(encode(record)) == record
+    monkeypatch.setattr(records.taxonomy, "current", lambda: _reloaded("v2", ["sql", "python", "aws", "docker"]))
+    assert records.skill_names(decode(encode(record)).matched_skills) == ["python", "sql"]
+
+
+def test_unknown_tag_is_rejected():
+    data = bytearray(encode(_result()))
+    data[1] = 99
+    with pytest.raises(ValueError, match="tag"):
+        decode(bytes(data))
@@ -0,0 +1,48 @@
+"""
+Tests for resume section segmentation (sections.py).
+
+Run with `python -m pytest test_sections.py`.
+"""
+from sections import segment_resume
+
+RESUME = """Jane Doe
+jane@example.com
+Experience
+• Built data pipelines in Python
+• Leadership
+• Mentored two interns
+- Tools
+Leadership
+• Ran weekly standups
+Skills: Python, SQL
+EDUCATION
+State University
+"""
+
+
+def test_keyword_bullets_are_not_headers():
+    sections = segment_resume(RESUME)
+    experience = sections["experience"]
+    # Bulleted items, and a bare keyword line between bullets, stay in Experience
+    assert "• Leadership" in experience
+    assert "- Tools" in experience
+    assert "\nLeadership\n" in experience
+    assert "Ran weekly standups" in experience
+    assert "other" not in sections
+
+
+def test_marked_headers_are_recognised():
+    sections = segment_resume(RESUME)
+    assert sections["contact"] == "Jane Doe\njane@example.com"
+    assert sections["skills"] == "Python, SQL"
+    assert sections["education"] == "State University"
+
+
+def test_plain_header_outside_bullets():
+    sections = segment_resume("Jane Doe\nLeadership\nCaptain of the chess club\nProjects\n• Resume parser")
+    assert sections["other"] == "Captain of the chess club"
+    assert sections["projects"] == "• Resume parser"
+
+
+def test_no_headers():
+    assert segment_resume("• Leadership\n• Tools\n• Python") == {}
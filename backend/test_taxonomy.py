@@ -0,0 +1,45 @@
+"""
+Tests for the compiled skill taxonomy (taxonomy.py).
+
+Run with `python -m pytest test_taxonomy.py`.
+"""
+import json
+
+import taxonomy
+from utils import clean_text
+
+
+def _match(text):
+    return taxonomy.current().match(clean_text(text))
+
+
+def test_phrase_matches_across_a_single_space():
+    assert "apache spark" in _match("Built pipelines with Apache Spark.")
+    assert "machine learning" in _match("machine\n\nlearning")  # whitespace runs collapse to one space
+
+
+def test_phrase_does_not_span_removed_punctuation():
+    # clean_text turns "apache | spark" into "apache  spark"; the original regex never matched across that gap
+    found = _match("Tools: Apache | Spark")
+    assert "apache spark" not in found
+    assert {"apache", "spark"} <= found
+
+
+def test_skill_before_a_dot_matches():
+    assert "apache spark" in _match("Apache Spark.Kafka")
+
+
+def _write_source(path, version, skills):
+    path.write_text(json.dumps({"version": version, "skills": skills, "synonyms": {}}), encoding="utf-8")
+
+
+def test_version_changes_with_the_file_contents(tmp_path):
+    source, snapshot = tmp_path / "skills.json", tmp_path / "skills.snapshot"
+    _write_source(source, "2026.1", ["python"])
+    first = taxonomy.build_snapshot(str(source), str(snapshot)).version
+    # Edited without touching the version label
+    _write_source(source, "2026.1", ["python", "rust"])
+    second = taxonomy.build_snapshot(str(source), str(snapshot)).version
+    assert first.startswith("2026.1+") and second.startswith("2026.1+")
+    assert first != second
+    assert taxonomy.load_snapshot(str(snapshot)).version == second
@@ -1,79 +1,73 @@
 import io
 import re
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from docx import Document
-from pdfminer.high_level import extract_text_to_fp
+import threading
 from datetime import datetime
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    print("Warning: 'en_core_web_sm' not found. Downloading...")
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+import taxonomy
+from sections import segment_resume, section_text
 
-# Expanded Skill Database with Synonyms
-SKILL_DB = {
-    
-    # Programming Languages
-    "python", "java", "c++", "c", "c#", "csharp", "ruby", "php", "swift", "kotlin", "go", "golang", "rust", "typescript", "javascript", "js", "scala", "perl", "r", "matlab", "dart", "lua", "shell", "bash", "powershell", "objective-c", "vb.net", "fortran", "cobol", "haskell", "elixir", "clojure", "DSA"
-    # Web Development
-    "html", "html5", "css", "css3", "react", "reactjs", "react.js", "angular", "angularjs", "vue", "vuejs", "vue.js", "node.js", "nodejs", "express", "expressjs", "django", "flask", "fastapi", "spring", "spring boot", "springboot", "asp.net", "laravel", "ruby on rails", "rails", "jquery", "bootstrap", "tailwind", "tailwindcss", "sass", "less", "scss", "webpack", "vite", "graphql", "rest", "rest api", "restful", "soap", "ajax", "json", "xml", "nextjs", "next.js", "gatsby", "nuxt", "svelte",
-    # Data Science & AI
-    "machine learning", "ml", "deep learning", "dl", "nlp", "natural language processing", "computer vision", "cv", "tensorflow", "pytorch", "keras", "scikit-learn", "sklearn", "pandas", "numpy", "matplotlib", "seaborn", "plotly", "opencv", "hugging face", "transformers", "llm", "large language model", "generative ai", "gen ai", "data analysis", "data science", "data visualization", "big data", "spark", "apache spark", "pyspark", "hadoop", "mapreduce", "xgboost", "lightgbm", "neural networks", "cnn", "rnn", "lstm", "gpt", "bert", "reinforcement learning",
-    # Database
-    "sql", "mysql", "postgresql", "postgres", "mongodb", "mongo", "redis", "oracle", "oracle db", "sql server", "mssql", "t-sql", "sqlite", "cassandra", "dynamodb", "elasticsearch", "elastic", "firebase", "firestore", "snowflake", "databricks", "mariadb", "couchdb", "neo4j", "graph database", "nosql", "rdbms", "database design", "data modeling",
-    # DevOps & Cloud
-    "aws", "amazon web services", "azure", "microsoft azure", "google cloud", "gcp", "google cloud platform", "docker", "kubernetes", "k8s", "jenkins", "gitlab ci", "gitlab", "github actions", "circleci", "travis ci", "terraform", "ansible", "puppet", "chef", "linux", "unix", "ubuntu", "centos", "redhat", "nginx", "apache", "ci/cd", "continuous integration", "continuous deployment", "devops", "cloudformation", "ecs", "eks", "lambda", "ec2", "s3", "rds", "microservices", "serverless", "containerization",
-    # Business & Data Tools
-    "excel", "ms excel", "power bi", "powerbi", "tableau", "looker", "salesforce", "sap", "jira", "confluence", "sharepoint", "ms office", "microsoft office", "google analytics", "ga", "google tag manager", "seo", "search engine optimization", "sem", "crm", "erp", "business intelligence", "bi", "etl", "data warehousing",
-    # Tools & Version Control
-    "git", "github", "gitlab", "bitbucket", "svn", "subversion", "mercurial", "version control", "source control", "code review", "pull request", "merge request",
-    # Project Management & Methodologies
-    "trello", "slack", "teams", "microsoft teams", "asana", "monday.com", "agile", "scrum", "kanban", "waterfall", "sdlc", "software development lifecycle", "jira", "confluence", "project management", "product management", "lean", "six sigma",
-    # Testing & Quality
-    "unit testing", "integration testing", "test automation", "selenium", "cypress", "jest", "mocha", "chai", "junit", "testng", "pytest", "cucumber", "bdd", "tdd", "test-driven development", "qa", "quality assurance", "postman", "rest assured", "load testing", "performance testing", "jmeter",
-    # Mobile Development
-    "android", "ios", "react native", "flutter", "xamarin", "ionic", "swift", "kotlin", "objective-c", "mobile development", "app development",
-    # Backend & APIs
-    "api development", "microservices", "rest api", "graphql", "grpc", "websocket", "message queue", "rabbitmq", "kafka", "apache kafka", "event-driven", "serverless", "lambda functions",
-    # Security
-    "cybersecurity", "information security", "penetration testing", "ethical hacking", "owasp", "ssl", "tls", "encryption", "oauth", "jwt", "authentication", "authorization", "firewall", "vpn",
-    # Soft Skills
-    "communication", "verbal communication", "written communication", "leadership", "team leadership", "teamwork", "collaboration", "problem solving", "analytical thinking", "critical thinking", "time management", "adaptability", "flexibility", "creativity", "innovation", "mentoring", "coaching", "presentation", "public speaking", "project management", "stakeholder management", "negotiation", "conflict resolution", "decision making", "attention to detail"
-}
+# spaCy, scikit-learn, pdfminer and python-docx are imported on first use (or by
+# the startup warmup, see warmup.py) so that importing this module stays cheap
+_nlp = None
+_nlp_lock = threading.Lock()
+
+def get_nlp(download=True):
+    """The spaCy pipeline, loaded on first use. With download=False a missing model raises OSError."""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+                try:
+                    _nlp = spacy.load("en_core_web_sm")
+                except OSError:
+                    if not download:
+                        raise
+                    print("Warning: 'en_core_web_sm' not found. Downloading...")
+                    from spacy.cli import download
+                    download("en_core_web_sm")
+                    _nlp = spacy.load("en_core_web_sm")
+    return _nlp
 
-# Skill Synonyms Mapping for better matching
-SKILL_SYNONYMS = {
-    "DSA": ["dsa", "data structures", "algorithms"],
-    "javascript": ["js", "javascript", "ecmascript"],
-    "python": ["python", "py"],
-    "typescript": ["typescript", "ts"],
-    "react": ["react", "reactjs", "react.js"],
-    "angular": ["angular", "angularjs"],
-    "vue": ["vue", "vuejs", "vue.js"],
-    "node.js": ["node.js", "nodejs", "node"],
-    "c#": ["c#", "csharp", "c sharp"],
-    "c++": ["c++", "cpp", "cplusplus"],
-    "go": ["go", "golang"],
-    "postgresql": ["postgresql", "postgres"],
-    "mongodb": ["mongodb", "mongo"],
-    "sql server": ["sql server", "mssql", "microsoft sql server"],
-    "aws": ["aws", "amazon web services"],
-    "azure": ["azure", "microsoft azure"],
-    "gcp": ["gcp", "google cloud", "google cloud platform"],
-    "kubernetes": ["kubernetes", "k8s"],
-    "docker": ["docker", "containerization"],
-    "machine learning": ["machine learning", "ml"],
-    "deep learning": ["deep learning", "dl"],
-    "nlp": ["nlp", "natural language processing"],
-    "computer vision": ["computer vision", "cv"],
-    "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
-    "tensorflow": ["tensorflow", "tf"],
+_nlp_missing = False
+
+def get_ner():
+    """
+    The spaCy pipeline for request-time NER, or None when the model isn't installed.
+    Never downloads: a worker whose warmup left spaCy degraded keeps serving requests
+    with the non-NER fallbacks instead of fetching the model on a request thread.
+    """
+    global _nlp_missing
+    if _nlp is None and not _nlp_missing:
+        try:
+            return get_nlp(download=False)
+        except (ImportError, OSError) as e:
+            print(f"Warning: spaCy model unavailable ({e}); education is extracted without NER.")
+            _nlp_missing = True
+    return _nlp
+
+# The skill taxonomy (skills + synonyms) lives in taxonomy/skills.json and is
+# compiled and hot-reloaded by taxonomy.py. SKILL_DB / SKILL_SYNONYMS are still
+# importable from here and always reflect the active version.
+def __getattr__(name):
+    if name == "SKILL_DB":
+        return taxonomy.current().skills
+    if name == "SKILL_SYNONYMS":
+        return taxonomy.current().synonyms
+    if name == "nlp":
+        return get_nlp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Default scoring profile; JDs can override it (see scoring_profiles.py)
+DEFAULT_SCORING_PROFILE = {
+    "weights": {
+        "skill": 0.40,       # Skills are most critical
+        "keyword": 0.35,     # Context/Keywords important
+        "experience": 0.15,  # Experience matters
+        "quality": 0.10,     # Resume completeness
+    },
+    # (resume/required years ratio, match %) breakpoints, linearly interpolated; ratios past the last point score 100
+    "experience_curve": [[0.0, 0.0], [0.5, 60.0], [0.75, 85.0], [1.0, 100.0]],
 }
 
 def extract_text_from_bytes(file_bytes, file_type):
@@ -84,6 +78,7 @@ def extract_text_from_bytes(file_bytes, file_type):
         # PDF extraction (pdfminer works for text-based PDFs; scanned/image-only PDFs will often return empty text)
         if file_type in {"application/pdf", "application/x-pdf"} or file_type.endswith("/pdf"):
             try:
+                from pdfminer.high_level import extract_text_to_fp
                 output_string = io.StringIO()
                 extract_text_to_fp(io.BytesIO(file_bytes), output_string)
                 extracted = (output_string.getvalue() or "").strip()
@@ -106,6 +101,7 @@ def extract_text_from_bytes(file_bytes, file_type):
                 )
             
         elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+            from docx import Document
             doc = Document(io.BytesIO(file_bytes))
             return "\n".join([paragraph.text for paragraph in doc.paragraphs])
 
@@ -130,18 +126,11 @@ def clean_text(text):
 def extract_skills(text):
     """Extracts skills from text using enhanced matching with synonyms and fuzzy logic."""
     cleaned_text = clean_text(text)
-    found_skills = set()
-    
-    # Check for each skill in the DB
-    for skill in SKILL_DB:
-        # Escape special characters in skill name for regex (like c++, c#)
-        skill_escaped = re.escape(skill)
-        # Use word boundaries to avoid partial matches (e.g., "go" in "google")
-        # For skills with special chars like C++, boundaries might be tricky, so we handle them carefully
-        if re.search(r'(?:^|\s)' + skill_escaped + r'(?:$|\s|,|\.)', cleaned_text):
-            # Normalize the skill to its canonical form
-            canonical_skill = normalize_skill(skill)
-            found_skills.add(canonical_skill)
+    skills = taxonomy.current()
+    
+    # Match every taxonomy phrase at word boundaries (e.g., "go" but not "google"),
+    # already normalized to its canonical form
+    found_skills = skills.match(cleaned_text)
     
     # Additional pattern matching for common formats
     # Match patterns like "3+ years of Python", "experienced in Java"
@@ -149,22 +138,15 @@ def extract_skills(text):
     context_matches = re.findall(skill_context_pattern, cleaned_text)
     for match in context_matches:
         match_clean = match.strip()
-        if match_clean in SKILL_DB:
-            canonical_skill = normalize_skill(match_clean)
+        if match_clean in skills.skills:
+            canonical_skill = skills.normalize(match_clean)
             found_skills.add(canonical_skill)
     
     return list(found_skills)
 
 def normalize_skill(skill):
     """Normalize skill to its canonical form using synonyms mapping."""
-    skill_lower = skill.lower().strip()
-    
-    # Check if this skill is a synonym and return the canonical form
-    for canonical, synonyms in SKILL_SYNONYMS.items():
-        if skill_lower in synonyms:
-            return canonical
-    
-    return skill_lower
+    return taxonomy.current().normalize(skill)
 
 def extract_years_of_experience(text):
     """Estimates years of experience based on date ranges found in the text."""
@@ -216,40 +198,67 @@ def extract_years_of_experience(text):
     
     return round(total_months / 12, 1)
 
+_EDUCATION_LINE = re.compile(r"university|college|institute|school", re.IGNORECASE)
+
 def parse_resume(text):
-    doc = nlp(text)
+    # Each extractor only scans the sections it needs; with no recognisable
+    # headers every extractor falls back to the whole text
+    sections = segment_resume(text)
+    if sections:
+        contact_text = section_text(sections, "contact")
+        # Coursework under Education isn't counted as a skill
+        skills_text = section_text(sections, "contact", "summary", "skills", "experience", "projects", "other")
+        if "experience" in sections:
+            experience_text = section_text(sections, "summary", "experience")
+        else:
+            experience_text = skills_text
+        # Without an Education header, only lines naming an institution can yield one
+        education_text = sections.get("education") or "\n".join(
+            line for line in text.splitlines() if _EDUCATION_LINE.search(line)
+        )
+    else:
+        contact_text = skills_text = experience_text = education_text = text
     
     parsed_data = {
         "name": "N/A", "email": "N/A", "phone": "N/A",
-        "skills": [], "education": [], "experience": [], "years_of_experience": 0
+        "skills": [], "education": [], "experience": [], "years_of_experience": 0,
+        "sections": sections,
     }
     
-    # Extract Email
-    emails = re.findall(r"[a-z0-9\.\-+_]+@[a-z0-9\.\-+]+\.[a-z]+", text.lower())
+    # Extract Email (contact details are occasionally placed in a footer, so fall back to the full text)
+    emails = re.findall(r"[a-z0-9\.\-+_]+@[a-z0-9\.\-+]+\.[a-z]+", contact_text.lower()) or \
+        re.findall(r"[a-z0-9\.\-+_]+@[a-z0-9\.\-+]+\.[a-z]+", text.lower())
     if emails: parsed_data["email"] = emails[0]
     
     # Extract Phone
-    phones = re.findall(r'(?:(?:\+?(\d{1,3}))?[-. (]*(\d{3})[-. )]*(\d{3})[-. ]*(\d{4})(?: *[x/#]{1}(\d+))?)', text)
+    phone_pattern = r'(?:(?:\+?(\d{1,3}))?[-. (]*(\d{3})[-. )]*(\d{3})[-. ]*(\d{4})(?: *[x/#]{1}(\d+))?)'
+    phones = re.findall(phone_pattern, contact_text) or re.findall(phone_pattern, text)
     if phones:
         # Flatten the tuple and join valid digits
         valid_phone = "".join([p for p in phones[0] if p])
         parsed_data["phone"] = valid_phone
 
     # Extract Skills
-    parsed_data["skills"] = extract_skills(text)
-    
-    # Extract Experience Years
-    parsed_data["years_of_experience"] = extract_years_of_experience(text)
-    
-    # Extract Education (Simple Heuristic)
-    for ent in doc.ents:
-        if ent.label_ == "ORG" and any(x in ent.text.lower() for x in ["university", "college", "institute", "school"]):
-            if ent.text not in parsed_data["education"]:
-                parsed_data["education"].append(ent.text)
-        # Extract Experience Entities (Companies)
-        elif ent.label_ == "ORG" and ent.text not in parsed_data["education"]:
-             # Filter out common non-company ORGs if needed
-             pass
+    parsed_data["skills"] = extract_skills(skills_text)
+    
+    # Extract Experience Years (date ranges under Education are study periods, not experience)
+    parsed_data["years_of_experience"] = extract_years_of_experience(experience_text)
+    
+    # Extract Education (Simple Heuristic); NER only runs over the education block
+    nlp = get_ner() if education_text else None
+    if nlp is not None:
+        doc = nlp(education_text)
+        for ent in doc.ents:
+            if ent.label_ == "ORG" and any(x in ent.text.lower() for x in ["university", "college", "institute", "school"]):
+                if ent.text not in parsed_data["education"]:
+                    parsed_data["education"].append(ent.text)
+    elif education_text:
+        # No model: take the comma-separated parts of a line that name an institution
+        for line in education_text.splitlines():
+            for part in line.split(","):
+                part = part.strip()
+                if _EDUCATION_LINE.search(part) and part not in parsed_data["education"]:
+                    parsed_data["education"].append(part)
 
     return parsed_data
 
@@ -305,13 +314,55 @@ def parse_jd(text):
         "education_requirements": education_requirements
     }
 
-def calculate_ats_score(resume_text, jd_text, parsed_resume, parsed_jd):
+def experience_match_percent_for(resume_exp, required_exp, curve=None):
+    """Maps resume vs required years onto a 0-100 match using a piecewise-linear curve."""
+    if required_exp == 0:
+        return 100.0
+    curve = curve or DEFAULT_SCORING_PROFILE["experience_curve"]
+    exp_ratio = resume_exp / required_exp
+    if exp_ratio >= curve[-1][0]:
+        return 100.0
+    if exp_ratio <= curve[0][0]:
+        return float(curve[0][1])
+    for (x0, y0), (x1, y1) in zip(curve, curve[1:]):
+        if exp_ratio < x1:
+            return min(y0 + (exp_ratio - x0) * ((y1 - y0) / (x1 - x0)), 100.0)
+    return 100.0
+
+def combine_components(components, profile=None):
+    """Blends raw component scores (see calculate_ats_score) into the overall ATS score."""
+    profile = profile or DEFAULT_SCORING_PROFILE
+    weights = profile["weights"]
+    experience_match_percent = experience_match_percent_for(
+        components["resume_years"], components["required_years"], profile["experience_curve"]
+    )
+    overall_ats_score = round(
+        (components["skill"] * weights["skill"]) + 
+        (components["keyword"] * weights["keyword"]) + 
+        (experience_match_percent * weights["experience"]) +
+        (components["quality"] * weights["quality"]),
+        2
+    )
+    
+    # Ensure score is between 0-100
+    return max(0, min(overall_ats_score, 100)), experience_match_percent
+
+def calculate_ats_score(resume_text, jd_text, parsed_resume, parsed_jd, keyword_model=None, profile=None,
+                        keyword_similarity=None):
     """
     Enhanced ATS scoring with multi-factor analysis:
     1. Skill Matching (40%) - Exact + Fuzzy matching with synonyms
     2. Keyword/Context Matching (35%) - TF-IDF cosine similarity
     3. Experience Matching (15%) - Years comparison
     4. Resume Quality (10%) - Structure, completeness, formatting
+
+    If a KeywordModel is given, the keyword score uses its corpus-wide IDF
+    instead of fitting TF-IDF on just the resume and JD. `profile` overrides
+    the weights and experience curve (defaults to DEFAULT_SCORING_PROFILE).
+    `keyword_similarity` is a precomputed resume/JD cosine similarity (see
+    KeywordModel.similarities) and skips the TF-IDF step.
+    The unweighted inputs are returned in match_details["Components"] so
+    results can be re-weighted later without re-parsing.
     """
     
     # 1. SKILL MATCHING (40% weight)
@@ -334,22 +385,30 @@ def calculate_ats_score(resume_text, jd_text, parsed_resume, parsed_jd):
         
         # Bonus for extra relevant skills (capped at 10% bonus)
         extra_skills = resume_skills_normalized - required_skills_normalized
-        relevant_extra = len([s for s in extra_skills if s in SKILL_DB])
+        skill_db = taxonomy.current().skills
+        relevant_extra = len([s for s in extra_skills if s in skill_db])
         bonus = min(relevant_extra * 0.02, 0.10)  # 2% per extra skill, max 10%
         
         skill_match_percent = min((base_match + bonus) * 100, 100.0)
     
     # 2. KEYWORD/CONTEXT MATCHING (35% weight) - Enhanced TF-IDF
-    corpus = [clean_text(resume_text), clean_text(jd_text)]
-    vectorizer = TfidfVectorizer(
-        stop_words='english',
-        ngram_range=(1, 3),  # Capture unigrams, bigrams, trigrams
-        min_df=1,
-        max_features=500
-    )
     try:
-        tfidf_matrix = vectorizer.fit_transform(corpus)
-        cosine_sim = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+        if keyword_similarity is not None:
+            cosine_sim = keyword_similarity
+        elif keyword_model is not None:
+            cosine_sim = keyword_model.similarity(resume_text, jd_text)
+        else:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            from sklearn.metrics.pairwise import cosine_similarity
+            corpus = [clean_text(resume_text), clean_text(jd_text)]
+            vectorizer = TfidfVectorizer(
+                stop_words='english',
+                ngram_range=(1, 3),  # Capture unigrams, bigrams, trigrams
+                min_df=1,
+                max_features=500
+            )
+            tfidf_matrix = vectorizer.fit_transform(corpus)
+            cosine_sim = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
         keyword_density_score = cosine_sim * 100
         
         # Adjust keyword score based on resume length (penalize very short resumes)
@@ -364,25 +423,10 @@ def calculate_ats_score(resume_text, jd_text, parsed_resume, parsed_jd):
         keyword_density_score = 0.0
     
     # 3. EXPERIENCE MATCHING (15% weight)
+    # Scored from the years ratio along the profile's experience curve (see combine_components)
     resume_exp = parsed_resume.get("years_of_experience", 0)
     required_exp = parsed_jd.get("min_years_required", 0)
     
-    if required_exp == 0:
-        experience_match_percent = 100.0
-    else:
-        # More granular experience scoring
-        exp_ratio = resume_exp / required_exp
-        if exp_ratio >= 1.0:
-            experience_match_percent = 100.0
-        elif exp_ratio >= 0.75:
-            experience_match_percent = 85.0 + (exp_ratio - 0.75) * 60  # 85-100%
-        elif exp_ratio >= 0.5:
-            experience_match_percent = 60.0 + (exp_ratio - 0.5) * 100  # 60-85%
-        else:
-            experience_match_percent = exp_ratio * 120  # 0-60%
-        
-        experience_match_percent = min(experience_match_percent, 100.0)
-    
     # 4. RESUME QUALITY SCORE (10% weight)
     quality_score = 0.0
     
@@ -409,21 +453,14 @@ def calculate_ats_score(resume_text, jd_text, parsed_resume, parsed_jd):
     quality_score = min(quality_score, 100.0)
     
     # WEIGHTED SCORING
-    w_skill = 0.40          # Skills are most critical
-    w_keyword = 0.35        # Context/Keywords important
-    w_experience = 0.15     # Experience matters
-    w_quality = 0.10        # Resume completeness
-    
-    overall_ats_score = round(
-        (skill_match_percent * w_skill) + 
-        (keyword_density_score * w_keyword) + 
-        (experience_match_percent * w_experience) +
-        (quality_score * w_quality),
-        2
-    )
-    
-    # Ensure score is between 0-100
-    overall_ats_score = max(0, min(overall_ats_score, 100))
+    components = {
+        "skill": skill_match_percent,
+        "keyword": float(keyword_density_score),
+        "quality": quality_score,
+        "resume_years": resume_exp,
+        "required_years": required_exp,
+    }
+    overall_ats_score, experience_match_percent = combine_components(components, profile)
     
     match_details = {
         "Skill Match": round(skill_match_percent, 2),
@@ -434,7 +471,8 @@ def calculate_ats_score(resume_text, jd_text, parsed_resume, parsed_jd):
         "Total Matched Skills": len(matched_skills_list),
         "Total Required Skills": len(required_skills_normalized),
         "Resume Experience": f"{resume_exp} years",
-        "Required Experience": f"{required_exp}+ years"
+        "Required Experience": f"{required_exp}+ years",
+        "Components": components
     }
     
     return overall_ats_score, match_details, list(required_skills_normalized)
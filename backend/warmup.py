@@ -0,0 +1,109 @@
+"""
+Background warmup of the heavy dependencies, and readiness reporting.
+
+spaCy, scikit-learn, scipy, pdfminer and python-docx are imported on first use
+(see utils.get_nlp and KeywordModel.analyzer), so importing main is cheap and
+light routes (/login, /results, /analytics, ...) answer as soon as the worker
+is up. On startup a daemon thread loads them ahead of the first heavy request,
+one step at a time; /ready answers 503 until every step has finished, so a load
+balancer only sends scoring traffic to warm workers. A heavy request arriving
+earlier simply loads what it needs itself; the loaders are idempotent.
+
+A failing step is retried with backoff. Steps named in `optional` only speed
+up the first request, so once their retries run out they are marked degraded
+and the worker still becomes ready; a required step that keeps failing leaves
+it unready. Warmup never downloads anything: readiness must not depend on the
+network.
+"""
+import importlib
+import threading
+import time
+
+RETRIES = 3
+BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 8.0
+
+
+def import_modules(*names):
+    """A warmup step that imports the given modules."""
+    def step():
+        for name in names:
+            importlib.import_module(name)
+    return step
+
+
+class Warmup:
+    def __init__(self, steps, optional=(), retries=RETRIES, backoff=BACKOFF_SECONDS):
+        self.steps = steps  # [(name, callable)], run in order
+        self.optional = frozenset(optional)
+        self.retries = retries
+        self.backoff = backoff
+        # Step entries are replaced, never mutated, under the lock; readers get consistent copies
+        self._lock = threading.Lock()
+        self._status = {name: {"state": "pending", "seconds": None, "attempts": 0} for name, _ in steps}
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+
+    @property
+    def status(self):
+        with self._lock:
+            return {name: dict(step) for name, step in self._status.items()}
+
+    def _ready(self, status):
+        return all(
+            step["state"] == "ready" or (step["state"] == "degraded" and name in self.optional)
+            for name, step in status.items()
+        )
+
+    @property
+    def ready(self):
+        return self._ready(self.status)
+
+    def _update(self, name, **fields):
+        with self._lock:
+            self._status[name] = {**self._status[name], **fields}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def _run_step(self, name, load):
+        started = time.perf_counter()
+        delay = self.backoff
+        for attempt in range(1, self.retries + 2):
+            self._update(name, state="loading", attempts=attempt)
+            try:
+                load()
+                self._update(name, state="ready", error=None)
+                break
+            except Exception as e:
+                print(f"Warmup step {name} failed (attempt {attempt}): {e}")
+                if attempt > self.retries:
+                    # Left to the first request that needs it, which will retry and report the error
+                    self._update(name, state="degraded" if name in self.optional else "failed", error=str(e))
+                    break
+                self._update(name, state="retrying", error=str(e))
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_BACKOFF_SECONDS)
+        self._update(name, seconds=round(time.perf_counter() - started, 3))
+
+    def run(self):
+        self.started_at = time.time()
+        for name, load in self.steps:
+            self._run_step(name, load)
+        self.finished_at = time.time()
+        print(f"Warmup finished in {self.finished_at - self.started_at:.2f}s: "
+              + ", ".join(f"{name} {step['state']} ({step['seconds']}s)" for name, step in self.status.items()))
+
+    def report(self):
+        status = self.status
+        return {
+            "ready": self._ready(status),
+            "degraded": sorted(name for name, step in status.items() if step["state"] == "degraded"),
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "steps": status,
+        }
@@ -71,9 +71,12 @@ export default function RecruiterDashboard() {
           headers: { 'Content-Type': 'multipart/form-data' }
         })
         
+        const jdId = response.headers['x-jd-id']
         allRankings.push({
           jdName: jd.file.name,
-          rankings: response.data
+          jdId,
+          rankings: response.data,
+          analytics: await fetchAnalytics(jdId)
         })
       }
       
@@ -89,6 +92,17 @@ export default function RecruiterDashboard() {
     }
   }
 
+  const fetchAnalytics = async (jdId) => {
+    if (!jdId) return null
+    try {
+      const response = await axios.get(`/api/analytics/${jdId}`)
+      return response.data
+    } catch (err) {
+      // The ranking itself succeeded; the dashboard just goes without the pool summary
+      return null
+    }
+  }
+
   const getTotalCandidates = () => {
     return resumes.length
   }
@@ -99,6 +113,8 @@ export default function RecruiterDashboard() {
     return Math.max(...allScores, 0)
   }
 
+  // Built from the ranking on screen; the server export (/jobs/{id}/export) covers every
+  // result ever stored for the JD, including earlier pools and single-resume analyses
   const downloadCSV = (rankings, jdName) => {
     if (rankings.length === 0) return
 
@@ -400,6 +416,54 @@ export default function RecruiterDashboard() {
                 </div>
               </div>
 
+              {resultGroup.analytics && (
+                <div className="p-6 border-b border-black/10 dark:border-white/10">
+                  <h4 className="text-sm font-medium text-[var(--text-primary)] opacity-80 mb-4 flex items-center gap-2">
+                    <Target size={16} className="text-amber-600 dark:text-amber-400" /> Candidate Pool
+                    <span className="text-xs text-[var(--text-secondary)] font-normal">
+                      {resultGroup.analytics.candidates} candidates · average {resultGroup.analytics.average_score}%
+                    </span>
+                  </h4>
+                  <div className="grid grid-cols-1 md:grid-cols-2 gap-8">
+                    <div className="h-[200px] w-full">
+                      <ResponsiveContainer width="100%" height="100%">
+                        <BarChart data={resultGroup.analytics.score_histogram}>
+                          <CartesianGrid strokeDasharray="3 3" stroke="var(--glass-border)" vertical={false} />
+                          <XAxis 
+                            dataKey="range" 
+                            tick={{ fill: 'var(--text-secondary)', fontSize: 10 }} 
+                            axisLine={false}
+                            tickLine={false}
+                          />
+                          <YAxis 
+                            allowDecimals={false}
+                            tick={{ fill: 'var(--text-secondary)', fontSize: 12 }} 
+                            axisLine={false}
+                            tickLine={false}
+                          />
+                          <Tooltip 
+                            contentStyle={{ backgroundColor: 'var(--glass-bg)', borderColor: 'var(--glass-border)', color: 'var(--text-primary)' }}
+                            cursor={{ fill: 'var(--glass-border)' }}
+                          />
+                          <Bar dataKey="count" name="Candidates" fill="#fbbf24" radius={[4, 4, 0, 0]} />
+                        </BarChart>
+                      </ResponsiveContainer>
+                    </div>
+                    <div>
+                      <p className="text-xs font-medium text-[var(--text-secondary)] uppercase tracking-wider mb-2">Most often missing</p>
+                      <div className="flex flex-wrap gap-2">
+                        {resultGroup.analytics.skills
+                          .filter(s => s.missing > 0)
+                          .slice(0, 10)
+                          .map(s => (
+                            <Badge key={s.skill} variant="warning" size="sm">{s.skill} ({s.missing})</Badge>
+                          ))}
+                      </div>
+                    </div>
+                  </div>
+                </div>
+              )}
+
               <div className="overflow-x-auto">
                 <table className="min-w-full divide-y divide-black/10 dark:divide-white/10">
                   <thead className="bg-black/5 dark:bg-white/5">
@@ -0,0 +1,403 @@
+"""
+Load test for Resume Analyzer: /login, /analyze-resume and /rank-candidates.
+
+Synthesizes PDF/DOCX/TXT resumes and JDs from the backend's skill taxonomy and drives
+the API at a fixed concurrency (closed loop) or a Poisson arrival rate (open
+loop), then reports throughput, latency percentiles and error rates. Runs fully
+offline; with --spawn it starts its own uvicorn on a throwaway database.
+
+Examples:
+    python load_test.py --spawn --duration 60 --concurrency 16
+    python load_test.py --base-url http://127.0.0.1:8000 --rate 20 --mix login=5,analyze=3,rank=1
+"""
+import argparse
+import io
+import json
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+BACKEND_DIR = Path(__file__).parent / "backend"
+
+LOAD_USER = {
+    "name": "Load Test",
+    "email": "loadtest@test.com",
+    "password": "loadtest123",
+    "role": "recruiter"
+}
+
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "txt": "text/plain",
+}
+
+FIRST_NAMES = ["Alex", "Priya", "Chen", "Maria", "Sam", "Fatima", "Jordan", "Ravi", "Elena", "Kwame"]
+LAST_NAMES = ["Smith", "Patel", "Wang", "Garcia", "Lee", "Khan", "Brown", "Iyer", "Novak", "Mensah"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def load_skill_db():
+    """Reads the skill list from the taxonomy data file (no backend imports needed)."""
+    with open(BACKEND_DIR / "taxonomy" / "skills.json", encoding="utf-8") as f:
+        return sorted(json.load(f)["skills"])
+
+
+# ---------------------------------------------------------------------------
+# Document synthesis
+# ---------------------------------------------------------------------------
+
+def resume_lines(rng, skills):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    picked = rng.sample(skills, rng.randint(6, 18))
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}@example.com | (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        "",
+        "SUMMARY",
+        f"Engineer with {rng.randint(1, 12)} years of experience in {', '.join(picked[:3])}.",
+        "",
+        "EXPERIENCE",
+    ]
+    year = 2024
+    for _ in range(rng.randint(1, 4)):
+        start = year - rng.randint(1, 4)
+        lines.append(f"Software Engineer | Company {rng.randint(1, 500)} | {rng.choice(MONTHS)} {start} - "
+                     f"{'Present' if year == 2024 else f'{rng.choice(MONTHS)} {year}'}")
+        for _ in range(rng.randint(2, 4)):
+            lines.append(f"- Built systems using {rng.choice(picked)} and {rng.choice(picked)}, improving throughput by {rng.randint(5, 60)}%")
+        year = start
+    lines += ["", "SKILLS", ", ".join(picked), "", "EDUCATION",
+              f"Bachelor of Science in Computer Science | State University | {year - 1}"]
+    return lines
+
+
+def jd_lines(rng, skills):
+    picked = rng.sample(skills, rng.randint(5, 12))
+    return [
+        "Senior Software Engineer",
+        "",
+        "Requirements:",
+        f"- {rng.randint(1, 8)}+ years of experience in software development",
+        *[f"- Strong proficiency in {s}" for s in picked],
+        "- Bachelor's degree in Computer Science or related field",
+    ]
+
+
+def _pdf_escape(text):
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(lines):
+    """Builds a minimal single-page, text-based PDF (Helvetica) that pdfminer can extract."""
+    stream = ["BT", "/F1 10 Tf", "12 TL", "50 770 Td"]
+    for line in lines[:60]:
+        stream.append(f"({_pdf_escape(line)}) Tj T*")
+    stream.append("ET")
+    content = "\n".join(stream).encode("latin-1")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{i} 0 obj\n".encode() + obj + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def make_docx(lines):
+    from docx import Document
+
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def render(lines, fmt):
+    if fmt == "pdf":
+        return make_pdf(lines)
+    if fmt == "docx":
+        return make_docx(lines)
+    return "\n".join(lines).encode("utf-8")
+
+
+def build_corpus(n_resumes, n_jds, formats, seed):
+    """Pre-generates documents so synthesis cost doesn't count against the server."""
+    rng = random.Random(seed)
+    skills = load_skill_db()
+    resumes = []
+    for i in range(n_resumes):
+        fmt = formats[i % len(formats)]
+        resumes.append((f"resume_{i}.{fmt}", render(resume_lines(rng, skills), fmt), CONTENT_TYPES[fmt]))
+    jds = []
+    for i in range(n_jds):
+        fmt = formats[i % len(formats)]
+        jds.append((f"jd_{i}.{fmt}", render(jd_lines(rng, skills), fmt), CONTENT_TYPES[fmt]))
+    return resumes, jds
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(workers):
+    """Starts uvicorn on a free port with a throwaway working directory (and database)."""
+    workdir = tempfile.mkdtemp(prefix="resume_load_")
+    port = _free_port()
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", str(BACKEND_DIR.resolve()),
+           "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=workdir)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"uvicorn exited with code {proc.returncode}")
+        try:
+            requests.get(f"{base_url}/docs", timeout=1)
+            return proc, base_url, workdir
+        except requests.RequestException:
+            time.sleep(0.25)
+    proc.terminate()
+    raise SystemExit("uvicorn did not become ready within 120s")
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def add(self, endpoint, latency, status):
+        with self._lock:
+            if latency is not None:
+                self.latencies[endpoint].append(latency)
+            self.statuses[endpoint][status] += 1
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class LoadTest:
+    def __init__(self, base_url, resumes, jds, rank_batch, timeout, seed):
+        self.base_url = base_url
+        self.resumes = resumes
+        self.jds = jds
+        self.rank_batch = rank_batch
+        self.timeout = timeout
+        self.recorder = Recorder()
+        self._local = threading.local()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _choice(self, seq):
+        with self._rng_lock:
+            return self._rng.choice(seq)
+
+    def _sample(self, seq, k):
+        with self._rng_lock:
+            return self._rng.sample(seq, min(k, len(seq)))
+
+    def setup(self):
+        requests.post(f"{self.base_url}/register", json=LOAD_USER, timeout=self.timeout)
+
+    def login(self):
+        return self._session().post(f"{self.base_url}/login", timeout=self.timeout,
+                                    json={"email": LOAD_USER["email"], "password": LOAD_USER["password"]})
+
+    def analyze(self):
+        files = {"resume": self._choice(self.resumes), "jd": self._choice(self.jds)}
+        return self._session().post(f"{self.base_url}/analyze-resume", files=files, timeout=self.timeout)
+
+    def rank(self):
+        files = [("jd", self._choice(self.jds))]
+        files += [("resumes", r) for r in self._sample(self.resumes, self.rank_batch)]
+        return self._session().post(f"{self.base_url}/rank-candidates", files=files, timeout=self.timeout)
+
+    def fire(self, endpoint):
+        start = time.perf_counter()
+        try:
+            status = getattr(self, endpoint)().status_code
+        except requests.Timeout:
+            status = "timeout"
+        except requests.RequestException as e:
+            status = type(e).__name__
+        self.recorder.add(endpoint, time.perf_counter() - start, status)
+
+    def run_closed(self, mix, concurrency, duration):
+        """Each of `concurrency` workers sends its next request as soon as the previous finishes."""
+        deadline = time.perf_counter() + duration
+        endpoints, weights = zip(*mix.items())
+
+        def worker(seed):
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                self.fire(rng.choices(endpoints, weights)[0])
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def run_open(self, mix, rate, concurrency, duration):
+        """Poisson arrivals at `rate` req/s regardless of response times, capped at `concurrency` in flight."""
+        endpoints, weights = zip(*mix.items())
+        rng = random.Random(0)
+        in_flight = threading.BoundedSemaphore(concurrency)
+
+        def task(endpoint):
+            try:
+                self.fire(endpoint)
+            finally:
+                in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            start = time.perf_counter()
+            next_at = start
+            while next_at < start + duration:
+                time.sleep(max(0.0, next_at - time.perf_counter()))
+                endpoint = rng.choices(endpoints, weights)[0]
+                if in_flight.acquire(blocking=False):
+                    pool.submit(task, endpoint)
+                else:
+                    # Client-side saturation: count it rather than silently slowing the arrival rate
+                    self.recorder.add(endpoint, None, "client_saturated")
+                next_at += rng.expovariate(rate)
+
+
+def report(recorder, elapsed):
+    summary = {"elapsed_s": round(elapsed, 2), "endpoints": {}}
+    print("=" * 78)
+    print("LOAD TEST RESULTS")
+    print("=" * 78)
+    print(f"{'endpoint':<10}{'reqs':>7}{'rps':>8}{'err%':>7}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+    for endpoint in sorted(recorder.statuses):
+        statuses = recorder.statuses[endpoint]
+        latencies = sorted(recorder.latencies[endpoint])
+        total = sum(statuses.values())
+        errors = sum(n for status, n in statuses.items() if not (isinstance(status, int) and status < 400))
+        row = {
+            "requests": total,
+            "throughput_rps": total / elapsed if elapsed else 0.0,
+            "error_rate": errors / total if total else 0.0,
+            "statuses": {str(k): v for k, v in statuses.items()},
+            **{f"p{p}_ms": percentile(latencies, p) * 1000 for p in (50, 90, 95, 99)},
+            "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        }
+        summary["endpoints"][endpoint] = row
+        print(f"{endpoint:<10}{total:>7}{row['throughput_rps']:>8.1f}{row['error_rate'] * 100:>6.1f}%"
+              f"{row['p50_ms']:>9.0f}{row['p90_ms']:>9.0f}{row['p95_ms']:>9.0f}{row['p99_ms']:>9.0f}{row['max_ms']:>9.0f}")
+        print(f"{'':<10}statuses: {dict(row['statuses'])}")
+    return summary
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("login", "analyze", "rank"):
+            raise SystemExit(f"Unknown endpoint in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return {k: v for k, v in mix.items() if v > 0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test for the Resume Analyzer API.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="Start a local uvicorn on a throwaway database")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn workers when --spawn is used")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load")
+    parser.add_argument("--concurrency", type=int, default=8, help="Workers (closed loop) or max in flight (open loop)")
+    parser.add_argument("--rate", type=float, default=0.0, help="Arrival rate in req/s; 0 = closed loop")
+    parser.add_argument("--mix", default="login=5,analyze=3,rank=1", help="Weighted endpoint mix")
+    parser.add_argument("--rank-batch", type=int, default=20, help="Resumes per /rank-candidates request")
+    parser.add_argument("--formats", default="pdf,docx,txt", help="Document formats to synthesize")
+    parser.add_argument("--corpus-size", type=int, default=200, help="Distinct resumes to synthesize")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json-out", help="Also write the summary as JSON")
+    args = parser.parse_args(argv)
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip() in CONTENT_TYPES]
+    mix = parse_mix(args.mix)
+    print(f"Synthesizing {args.corpus_size} resumes ({', '.join(formats)})...")
+    resumes, jds = build_corpus(args.corpus_size, max(5, args.corpus_size // 20), formats, args.seed)
+
+    proc = workdir = None
+    base_url = args.base_url
+    if args.spawn:
+        proc, base_url, workdir = spawn_server(args.server_workers)
+        print(f"Started uvicorn at {base_url} (workdir {workdir})")
+
+    try:
+        test = LoadTest(base_url, resumes, jds, args.rank_batch, args.timeout, args.seed)
+        test.setup()
+        mode = f"open loop, {args.rate} req/s" if args.rate > 0 else "closed loop"
+        print(f"Running {args.duration:.0f}s, {mode}, concurrency {args.concurrency}, mix {mix}")
+        start = time.perf_counter()
+        if args.rate > 0:
+            test.run_open(mix, args.rate, args.concurrency, args.duration)
+        else:
+            test.run_closed(mix, args.concurrency, args.duration)
+        summary = report(test.recorder, time.perf_counter() - start)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=30)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()